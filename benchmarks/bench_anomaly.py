@@ -0,0 +1,132 @@
+"""
+Anomaly detection cost, end to end from profile dicts: detect_anomalies
+called per table against detect_anomalies_batch (what the pipeline runs),
+split into building the MetricFrame and scoring it. Both must return the
+same findings. --rows additionally times the masks alone on synthetic
+metric rows.
+
+    python benchmarks/bench_anomaly.py --tables 10000 --columns 100
+    python benchmarks/bench_anomaly.py --rows 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from dqa.anomaly.batch import (
+    DUP_RATE,
+    FK_BAD_RATE,
+    METRICS,
+    MetricFrame,
+    evaluate,
+    findings_from_frame,
+)
+from dqa.anomaly.detector import detect_anomalies
+
+
+def synthetic_frame(rows: int, anomaly_rate: float = 0.001, seed: int = 3) -> MetricFrame:
+    rng = np.random.default_rng(seed)
+    metric = rng.integers(0, len(METRICS), rows).astype(np.int8)
+    baseline = rng.uniform(0.001, 0.01, rows)
+    today = baseline * rng.uniform(0.95, 1.05, rows)
+    # duplicate and FK rates are healthy at zero
+    healthy_zero = (metric == DUP_RATE) | (metric == FK_BAD_RATE)
+    today[healthy_zero] = 0.0
+    bad = rng.random(rows) < anomaly_rate
+    today[bad] = np.maximum(baseline[bad] * 8.0, 0.05)
+    tables = np.asarray([f"t{i}" for i in range(rows // 50 + 1)], dtype=object)
+    return MetricFrame(
+        pair=np.arange(rows, dtype=np.int64) // 50,
+        table=tables[np.arange(rows) // 50],
+        column=np.full(rows, "c", dtype=object),
+        metric=metric,
+        baseline=baseline,
+        today=today,
+    )
+
+
+def synthetic_pairs(
+    tables: int, columns: int, anomaly_rate: float = 0.001, seed: int = 3
+) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """(today, baseline) profiles with a row count and `columns` null rates per table."""
+    rng = np.random.default_rng(seed)
+    cols = [f"c{i}" for i in range(columns)]
+    pairs = []
+    for t in range(tables):
+        base = rng.uniform(0.001, 0.01, columns)
+        today = base * rng.uniform(0.95, 1.05, columns)
+        bad = rng.random(columns) < anomaly_rate
+        today[bad] = np.maximum(base[bad] * 8.0, 0.05)
+        rows = int(rng.integers(9_000, 11_000))
+        pairs.append(
+            tuple(
+                {
+                    "table": f"t{t}",
+                    "row_count": rows,
+                    "null_rates": dict(zip(cols, v.tolist(), strict=True)),
+                }
+                for v in (today, base)
+            )
+        )
+    return pairs
+
+
+def bench_pairs(tables: int, columns: int) -> Dict[str, Any]:
+    pairs = synthetic_pairs(tables, columns)
+
+    t0 = time.perf_counter()
+    expected = [f for today, base in pairs for f in detect_anomalies(today, base)]
+    t1 = time.perf_counter()
+    frame = MetricFrame.from_pairs(pairs)
+    t2 = time.perf_counter()
+    findings = findings_from_frame(frame)
+    t3 = time.perf_counter()
+
+    return {
+        "tables": tables,
+        "metric_rows": len(frame),
+        "findings": len(findings),
+        "identical": findings == expected,
+        "loop_seconds": round(t1 - t0, 3),
+        "batch_seconds": round(t3 - t1, 3),
+        "frame_seconds": round(t2 - t1, 3),
+        "score_seconds": round(t3 - t2, 3),
+        "speedup": round((t1 - t0) / (t3 - t1), 2),
+    }
+
+
+def bench_rows(rows: int) -> Dict[str, Any]:
+    frame = synthetic_frame(rows)
+    t0 = time.perf_counter()
+    evaluate(frame)
+    t1 = time.perf_counter()
+    findings = findings_from_frame(frame)
+    elapsed = time.perf_counter() - t1
+    return {
+        "metric_rows": rows,
+        "findings": len(findings),
+        "mask_seconds": round(t1 - t0, 4),
+        "seconds": round(elapsed, 3),
+        "rows_per_s": round(rows / elapsed),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tables", type=int, default=10_000)
+    ap.add_argument("--columns", type=int, default=100, help="null rates per table")
+    ap.add_argument("--rows", type=int, default=0, help="also time the masks on N metric rows")
+    args = ap.parse_args()
+
+    out: Dict[str, Any] = {"profiles": bench_pairs(args.tables, args.columns)}
+    if args.rows:
+        out["frame"] = bench_rows(args.rows)
+    print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    main()
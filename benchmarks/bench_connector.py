@@ -0,0 +1,55 @@
+"""
+Per-query overhead of DuckDBConnector: one connection per statement versus
+the persistent mode with per-thread cursors.
+
+    python benchmarks/bench_connector.py --queries 500
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from dqa.connectors.duckdb_conn import DuckDBConnector
+
+
+def _per_query_us(con: DuckDBConnector, n: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(n):
+        con.fetchdf("SELECT count(*) AS n FROM bench WHERE id < ?;", (i,))
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--rows", type=int, default=100_000)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "bench.duckdb"
+        DuckDBConnector(db).exec(
+            f"CREATE TABLE bench AS SELECT range AS id FROM range({args.rows});"
+        )
+
+        per_statement = _per_query_us(DuckDBConnector(db), args.queries)
+        with DuckDBConnector(db, persistent=True) as con:
+            persistent = _per_query_us(con, args.queries)
+
+    print(
+        json.dumps(
+            {
+                "queries": args.queries,
+                "per_statement_connection_us": round(per_statement, 1),
+                "persistent_cursor_us": round(persistent, 1),
+                "speedup": round(per_statement / persistent, 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+dbt schema writing cost with many models: the old single-file dump versus
+per-model incremental writes (first run, unchanged rerun, one model changed).
+
+    python benchmarks/bench_dbt_schema.py --models 500 --columns 20
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import yaml
+
+from dqa.dbtgen.schema_generator import write_schema_files
+
+
+def synthetic_schema(models: int, columns: int, cap: float = 100.0) -> Dict[str, Any]:
+    return {
+        "version": 2,
+        "models": [
+            {
+                "name": f"model_{m}",
+                "description": f"Auto-generated DQ tests for model_{m}",
+                "tests": [],
+                "columns": [
+                    {
+                        "name": f"c{c}",
+                        "tests": [
+                            "not_null",
+                            {"accepted_range": {"min_value": 0, "max_value": cap}},
+                            {"relationships": {"to": "ref('dim')", "field": "id"}},
+                        ],
+                    }
+                    for c in range(columns)
+                ],
+            }
+            for m in range(models)
+        ],
+    }
+
+
+def timed(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return round(time.perf_counter() - t0, 4)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--models", type=int, default=500)
+    ap.add_argument("--columns", type=int, default=20)
+    args = ap.parse_args()
+
+    schema = synthetic_schema(args.models, args.columns)
+    changed = synthetic_schema(1, args.columns, cap=150.0)
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp)
+        single = timed(
+            lambda: (out / "single.yml").write_text(yaml.safe_dump(schema, sort_keys=False))
+        )
+        models_dir = out / "models"
+        first = timed(lambda: write_schema_files(schema, models_dir))
+        unchanged = timed(lambda: write_schema_files(schema, models_dir))
+        one = timed(lambda: write_schema_files(changed, models_dir))
+
+    print(
+        json.dumps(
+            {
+                "models": args.models,
+                "columns": args.columns,
+                "libyaml": bool(getattr(yaml, "__with_libyaml__", False)),
+                "single_file_safe_dump_s": single,
+                "per_model_first_write_s": first,
+                "per_model_unchanged_s": unchanged,
+                "per_model_one_changed_s": one,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Cold-start import time of the CLI and API entry points, measured with
+`python -X importtime` in a fresh interpreter per import (best of
+--repeat), and which heavy dependencies each one loads. Exits 1 when an
+entry point exceeds its budget or loads a dependency it should defer.
+
+    python benchmarks/bench_import.py --repeat 5
+    python benchmarks/bench_import.py --module dqa.api.main --budget-ms 800
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+from dqa.utils.config import ROOT
+
+HEAVY = ("pandas", "numpy", "duckdb", "yaml")
+
+# entry point -> (import budget in ms, heavy dependencies it must not import)
+BUDGETS: Dict[str, tuple] = {
+    # answers `/` and queues runs; the pipeline is imported by the first run
+    "dqa.api.main": (1500.0, HEAVY),
+    # cron entry points need the whole pipeline for the run itself
+    "scripts.run_dq": (2000.0, ()),
+    "scripts.run_sharded": (2000.0, ()),
+}
+
+
+def import_profile(module: str, repeat: int = 1) -> Dict[str, Any]:
+    """Best cumulative import time of `module` in ms, and the heavy modules it pulled in."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(ROOT / "src"), str(ROOT), env.get("PYTHONPATH", "")]
+    )
+    best: Optional[float] = None
+    loaded: List[str] = []
+    for _ in range(max(1, repeat)):
+        out = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        # "import time: self [us] | cumulative | imported package", one line per module
+        cumulative: Dict[str, int] = {}
+        for line in out.stderr.splitlines():
+            fields = line.removeprefix("import time:").split("|")
+            if len(fields) == 3 and fields[1].strip().isdigit():
+                cumulative[fields[2].strip()] = int(fields[1])
+        ms = cumulative[module] / 1000
+        best = ms if best is None else min(best, ms)
+        loaded = [m for m in HEAVY if m in cumulative]
+    return {"module": module, "import_ms": round(best or 0.0, 1), "heavy": loaded}
+
+
+def check(profile: Dict[str, Any], budget_ms: float, deferred: Sequence[str]) -> List[str]:
+    problems = []
+    if profile["import_ms"] > budget_ms:
+        problems.append(f"{profile['import_ms']}ms > {budget_ms}ms")
+    problems += [f"imports {m}" for m in profile["heavy"] if m in deferred]
+    return problems
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--module", action="append", help="entry point(s); default: all budgeted")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--budget-ms", type=float, default=None, help="override every budget")
+    args = ap.parse_args()
+
+    results = []
+    for module in args.module or list(BUDGETS):
+        budget, deferred = BUDGETS.get(module, (float("inf"), ()))
+        budget = args.budget_ms if args.budget_ms is not None else budget
+        prof = import_profile(module, args.repeat)
+        results.append({**prof, "budget_ms": budget, "problems": check(prof, budget, deferred)})
+
+    print(json.dumps({"python": sys.version.split()[0], "results": results}, indent=2))
+    if any(r["problems"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Per-stage pipeline benchmark at several data scales, with a regression check
+against a stored baseline run.
+
+    python benchmarks/bench_pipeline.py run --scales 0.5,5,50 --out bench.json
+    python benchmarks/bench_pipeline.py compare baseline.json bench.json
+
+Stages: seed, profile_table per table, FK checks, detect_anomalies (scalar
+and batch), generate_dbt_schema, write_markdown_report and an API round
+trip (POST /dq/run until the job succeeds). Each stage records its best
+wall time over --repeat runs, rows/s and the peak process RSS seen while it
+ran. `rows` is the input size of the stage: warehouse rows for data stages,
+profiles or findings for the in-memory ones.
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import duckdb
+
+from dqa.anomaly.batch import detect_anomalies_batch
+from dqa.anomaly.detector import detect_anomalies
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.datagen.warehouse import TABLES, seed_warehouse
+from dqa.dbtgen.schema_generator import generate_dbt_schema
+from dqa.profiling.cache import ProfileCache
+from dqa.profiling.fk_validation import validate_foreign_keys
+from dqa.profiling.profiler import E_COMMERCE_SPECS, profile_table
+from dqa.reporting.report_writer import write_markdown_report
+from dqa.utils.config import ROOT
+
+DEFAULT_SCALES = "0.5,5,50"
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        # no procfs (macOS): lifetime peak, reported in bytes there
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class _PeakRss:
+    """Polls the process RSS on a background thread while the block runs."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._poll, daemon=True)
+
+    def _poll(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _rss_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "_PeakRss":
+        self.peak = _rss_bytes()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+
+
+def measure(
+    fn: Callable[[], Any], repeat: int = 1, setup: Optional[Callable[[], None]] = None
+) -> Tuple[Any, float, int]:
+    """(last result, best wall seconds, peak RSS bytes) over `repeat` calls of `fn`."""
+    best, peak, out = float("inf"), 0, None
+    for _ in range(max(1, repeat)):
+        if setup is not None:
+            setup()
+        with _PeakRss() as rss:
+            t0 = time.perf_counter()
+            out = fn()
+            elapsed = time.perf_counter() - t0
+        best, peak = min(best, elapsed), max(peak, rss.peak)
+    return out, best, peak
+
+
+def _record(stage: str, scale: float, rows: int, seconds: float, peak: int) -> Dict[str, Any]:
+    return {
+        "stage": stage,
+        "scale": scale,
+        "rows": rows,
+        "seconds": round(seconds, 6),
+        "rows_per_s": round(rows / seconds) if seconds > 0 else None,
+        "peak_rss_mb": round(peak / 2**20, 1),
+    }
+
+
+def _api_roundtrip(con: DuckDBConnector, scale: float, timeout: float = 3600.0) -> int:
+    """POST /dq/run against `con` and poll until the job finishes; returns findings."""
+    from fastapi.testclient import TestClient
+
+    # the API imports scripts.run_dq, which resolves from the project root
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    import dqa.api.main as api
+    from dqa.api.worker import Worker
+
+    run = api.run
+    # the endpoint has no scale parameter; bind it the way the CLI --scale does
+    api.run = functools.partial(run, scale=scale)
+    try:
+        with TestClient(api.app) as client:
+            client.app.state.worker = Worker(con.db_path, con=con, cache=ProfileCache(con))
+            run_id = client.post("/dq/run?target=bad_day").json()["run_id"]
+            deadline = time.time() + timeout
+            while time.time() < deadline:
+                body = client.get(f"/dq/runs/{run_id}").json()
+                if body["status"] == "succeeded":
+                    return int(body["result"]["findings_count"])
+                if body["status"] == "failed":
+                    raise RuntimeError(f"API run failed: {body['error']}")
+                time.sleep(0.01)
+            raise TimeoutError(f"API run {run_id} did not finish in {timeout}s")
+    finally:
+        api.run = run
+
+
+def bench_scale(scale: float, repeat: int, workdir: Path) -> List[Dict[str, Any]]:
+    con = DuckDBConnector(workdir / f"bench_{scale}.duckdb")
+    specs = {s.name: s for s in E_COMMERCE_SPECS}
+    out: List[Dict[str, Any]] = []
+
+    seed_warehouse(con, "baseline", scale=scale)
+    base = {t: profile_table(con, t, specs[t]) for t in TABLES}
+
+    counts, sec, rss = measure(lambda: seed_warehouse(con, "bad_day", scale=scale), repeat)
+    out.append(_record("seed", scale, sum(counts.values()), sec, rss))
+
+    today: Dict[str, Dict[str, Any]] = {}
+    for t in TABLES:
+        # FK checks are timed as their own stage below
+        spec = replace(specs[t], fk={})
+        today[t], sec, rss = measure(functools.partial(profile_table, con, t, spec), repeat)
+        out.append(_record(f"profile_table:{t}", scale, counts[t], sec, rss))
+
+    with con.connect() as c:
+        fk, sec, rss = measure(lambda: validate_foreign_keys(c, E_COMMERCE_SPECS, counts), repeat)
+    for t, violations in fk.items():
+        today[t]["fk_violations"] = violations
+    fk_rows = sum(counts[s.name] for s in E_COMMERCE_SPECS if s.fk)
+    out.append(_record("fk_checks", scale, fk_rows, sec, rss))
+
+    pairs = [(today[t], base[t]) for t in TABLES]
+    _, sec, rss = measure(
+        lambda: [f for p in pairs for f in detect_anomalies(*p)], max(repeat, 10)
+    )
+    out.append(_record("detect_anomalies", scale, len(pairs), sec, rss))
+    findings, sec, rss = measure(lambda: detect_anomalies_batch(pairs), max(repeat, 10))
+    out.append(_record("detect_anomalies_batch", scale, len(pairs), sec, rss))
+
+    _, sec, rss = measure(lambda: generate_dbt_schema(findings), max(repeat, 10))
+    out.append(_record("generate_dbt_schema", scale, len(findings), sec, rss))
+    _, sec, rss = measure(
+        lambda: write_markdown_report("bench", "bad_day", findings, today, workdir / "reports"),
+        max(repeat, 10),
+    )
+    out.append(_record("write_markdown_report", scale, len(findings), sec, rss))
+
+    with DuckDBConnector(con.db_path, persistent=True) as api_con:
+        # a cold cache each time, so every round trip profiles the tables
+        _, sec, rss = measure(
+            lambda: _api_roundtrip(api_con, scale),
+            repeat,
+            setup=lambda: ProfileCache(api_con).clear(),
+        )
+    # the job reseeds baseline and bad_day with the same (deterministic) row counts
+    out.append(_record("api_roundtrip", scale, sum(counts.values()), sec, rss))
+    return out
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(scales: List[float], repeat: int = 3) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            results.extend(bench_scale(scale, repeat, Path(tmp)))
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "duckdb": duckdb.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": repeat,
+            "scales": scales,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    max_slowdown: float = 0.25,
+    min_seconds: float = 0.01,
+    max_rss_growth: float = 0.5,
+) -> Dict[str, Any]:
+    """
+    Match results by (stage, scale) and flag regressions: wall time more than
+    `max_slowdown` slower (and by at least `min_seconds`, to ignore timer
+    noise on tiny stages) or peak RSS more than `max_rss_growth` larger.
+    """
+    base = {(r["stage"], r["scale"]): r for r in baseline["results"]}
+    regressions: List[Dict[str, Any]] = []
+    compared = 0
+    for r in current["results"]:
+        b = base.pop((r["stage"], r["scale"]), None)
+        if b is None:
+            continue
+        compared += 1
+        ratio = r["seconds"] / b["seconds"] if b["seconds"] > 0 else float("inf")
+        rss_ratio = r["peak_rss_mb"] / b["peak_rss_mb"] if b["peak_rss_mb"] > 0 else 1.0
+        slower = ratio > 1 + max_slowdown and r["seconds"] - b["seconds"] >= min_seconds
+        if slower or rss_ratio > 1 + max_rss_growth:
+            regressions.append(
+                {
+                    "stage": r["stage"],
+                    "scale": r["scale"],
+                    "seconds": [b["seconds"], r["seconds"]],
+                    "time_ratio": round(ratio, 3),
+                    "peak_rss_mb": [b["peak_rss_mb"], r["peak_rss_mb"]],
+                    "rss_ratio": round(rss_ratio, 3),
+                }
+            )
+    return {
+        "compared": compared,
+        "regressions": regressions,
+        "missing": [{"stage": s, "scale": x} for s, x in base],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    run_ap = sub.add_parser("run", help="benchmark every stage and print/write JSON")
+    run_ap.add_argument("--scales", default=DEFAULT_SCALES, help="comma-separated seeder scales")
+    run_ap.add_argument("--repeat", type=int, default=3, help="best-of-N wall time")
+    run_ap.add_argument("--out", type=Path, default=None, help="also write the JSON here")
+
+    cmp_ap = sub.add_parser("compare", help="exit 1 if CURRENT regressed against BASELINE")
+    cmp_ap.add_argument("baseline", type=Path)
+    cmp_ap.add_argument("current", type=Path)
+    cmp_ap.add_argument("--max-slowdown", type=float, default=0.25)
+    cmp_ap.add_argument("--min-seconds", type=float, default=0.01)
+    cmp_ap.add_argument("--max-rss-growth", type=float, default=0.5)
+    args = ap.parse_args()
+
+    if args.command == "run":
+        scales = [float(x) for x in args.scales.split(",") if x.strip()]
+        out = run_suite(scales, args.repeat)
+        text = json.dumps(out, indent=2)
+        if args.out is not None:
+            args.out.parent.mkdir(parents=True, exist_ok=True)
+            args.out.write_text(text + "\n", encoding="utf-8")
+        print(text)
+        return
+
+    report = compare(
+        json.loads(args.baseline.read_text(encoding="utf-8")),
+        json.loads(args.current.read_text(encoding="utf-8")),
+        max_slowdown=args.max_slowdown,
+        min_seconds=args.min_seconds,
+        max_rss_growth=args.max_rss_growth,
+    )
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if report["regressions"] else 0)
+
+
+if __name__ == "__main__":
+    main()
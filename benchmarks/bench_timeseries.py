@@ -0,0 +1,106 @@
+"""
+History-based scoring cost per run as the number of tracked metrics grows.
+The headline is `observe_seconds`: one run end to end (load the run's
+models, score, append its points, upsert its models); load and score
+alone are reported for the breakdown.
+
+    python benchmarks/bench_timeseries.py --tables 500 --columns 25 --days 28
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+from dqa.anomaly.timeseries import MetricHistory, findings_from_scores, profile_metrics
+from dqa.connectors.duckdb_conn import DuckDBConnector
+
+
+def synthetic_profiles(
+    tables: int, columns: int, rng: np.random.Generator
+) -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    for t in range(tables):
+        cols = [f"c{i}" for i in range(columns)]
+        null = rng.uniform(0.0, 0.01, columns)
+        p99 = rng.normal(100.0, 1.0, columns)
+        out[f"t{t}"] = {
+            "table": f"t{t}",
+            "row_count": int(rng.integers(9_900, 10_100)),
+            "null_rates": dict(zip(cols, null.tolist(), strict=True)),
+            "distinct_counts": dict(
+                zip(cols, rng.integers(990, 1_010, columns).tolist(), strict=True)
+            ),
+            "numeric_stats": {
+                c: {"p99": float(p), "mean": float(p / 2)} for c, p in zip(cols, p99, strict=True)
+            },
+        }
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tables", type=int, default=500)
+    ap.add_argument("--columns", type=int, default=25)
+    ap.add_argument("--days", type=int, default=28, help="history runs before the timed run")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        history = MetricHistory(DuckDBConnector(Path(tmp) / "bench.duckdb"))
+        day0 = datetime(2026, 1, 1)
+        warm = time.perf_counter()
+        for d in range(args.days):
+            profiles = synthetic_profiles(args.tables, args.columns, rng)
+            history.observe(profiles, f"r{d}", day0 + timedelta(days=d))
+        warm = time.perf_counter() - warm
+
+        profiles = synthetic_profiles(args.tables, args.columns, rng)
+
+        points = [(t, c, m, v) for t, p in profiles.items() for c, m, v in profile_metrics(p)]
+        keys = [p[:3] for p in points]
+        t0 = time.perf_counter()
+        models = history.load(keys)
+        t_load = time.perf_counter() - t0
+
+        # scoring alone, on the loaded state
+        metric = np.asarray([p[2] for p in points], dtype=object)
+        value = np.asarray([p[3] for p in points])
+        rows = models.lookup(keys)
+        dow = np.full(len(rows), (day0 + timedelta(days=args.days)).weekday())
+        t0 = time.perf_counter()
+        models.score(rows, dow, value, metric)
+        t_score = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        scores = history.observe(profiles, "timed", day0 + timedelta(days=args.days))
+        t_observe = time.perf_counter() - t0
+        findings = findings_from_scores(scores)
+
+    print(
+        json.dumps(
+            {
+                "metrics": len(points),
+                "series": len(models),
+                "history_days": args.days,
+                "observe_seconds": round(t_observe, 4),
+                "metrics_per_s": round(len(points) / t_observe, 1),
+                "load_seconds": round(t_load, 4),
+                "score_seconds": round(t_score, 4),
+                "warmup_seconds": round(warm, 3),
+                "scored": int(np.sum(scores.method > 0)),
+                "findings": len(findings),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
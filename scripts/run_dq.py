@@ -2,67 +2,251 @@ from __future__ import annotations
 
 import argparse
 import json
-import subprocess
-import sys
 import uuid
+from contextlib import contextmanager
+from typing import Callable, Optional, Sequence
 
+from dqa.anomaly.batch import detect_anomalies_batch
+from dqa.anomaly.timeseries import MetricHistory, combine_findings
 from dqa.connectors.duckdb_conn import DuckDBConnector
-from dqa.utils.config import PATHS
-from dqa.profiling.profiler import E_COMMERCE_SPECS, profile_table
-from dqa.anomaly.detector import detect_anomalies
-from dqa.dbtgen.schema_generator import generate_dbt_schema, write_schema_yml
+from dqa.datagen.warehouse import seed_warehouse
+from dqa.dbtgen.schema_generator import generate_dbt_schema, write_schema_files
+from dqa.profiling.baseline_store import (
+    BASELINE_SNAPSHOT,
+    load_profiles,
+    save_profiles,
+    table_fingerprints,
+)
+from dqa.profiling.cache import ProfileCache, profile_tables_cached
+from dqa.profiling.parallel import ParallelConfig, profile_tables_parallel
+from dqa.profiling.registry import SpecRegistry, default_registry
+from dqa.profiling.selection import select_tables
 from dqa.reporting.report_writer import write_markdown_report
+from dqa.reporting.run_log import save_run
+from dqa.utils.config import PATHS
+from dqa.utils.tracing import Tracer, tracing
 
 
-def seed(mode: str) -> None:
-    subprocess.run([sys.executable, "scripts/seed_warehouse.py", "--mode", mode], check=True)
+def run(
+    target: str,
+    incremental: bool = False,
+    reseed: bool = True,
+    parallel: Optional[ParallelConfig] = None,
+    con: Optional[DuckDBConnector] = None,
+    baseline_window: int = 1,
+    run_id: Optional[str] = None,
+    progress: Callable[[str], None] = lambda stage: None,
+    accuracy: str = "exact",
+    cache: Optional[ProfileCache] = None,
+    scale: float = 1.0,
+    explain_slowest: int = 0,
+    detector: str = "snapshot",
+    registry: Optional[SpecRegistry] = None,
+    select: Sequence[str] = (),
+    with_parents: bool = False,
+    tracer: Optional[Tracer] = None,
+) -> dict:
+    if detector not in ("snapshot", "history"):
+        raise ValueError(f"detector must be 'snapshot' or 'history', got {detector!r}")
+    engine = "incremental" if incremental else "sql"
+    con = con or DuckDBConnector(PATHS.db_path)
+    registry = registry or default_registry(con)
+    # only the selected slice is profiled, detected, reported and written to dbt
+    selection = select_tables(registry, select, parents=with_parents)
+    specs = registry.specs(selection.tables)
+    # column selectors narrow today's profiles; baselines stay whole-table
+    targeted = [selection.narrow(s) for s in specs]
+    # incremental profiling writes sketches; plain profiling can read-only
+    profiler_con = con if incremental else con.for_profiling()
+    cache_hits: list = []
+    run_id = run_id or uuid.uuid4().hex[:10]
+    tracer = tracer or Tracer()
 
+    @contextmanager
+    def stage(name: str):
+        progress(name)
+        with tracer.span(name):
+            yield
 
-def run(target: str) -> dict:
-    # 1) baseline profiles (in-memory for now)
-    seed("baseline")
-    con = DuckDBConnector(PATHS.db_path)
-    baseline = {s.name: profile_table(con, s.name, s) for s in E_COMMERCE_SPECS}
+    def profile(specs):
+        kw = dict(engine=engine, accuracy=accuracy, referenced=registry.parents(specs))
+        if cache is None:
+            return profile_tables_parallel(profiler_con, specs, parallel, **kw)
+        profiles, seconds, hits = profile_tables_cached(profiler_con, cache, specs, parallel, **kw)
+        cache_hits.extend(hits)
+        return profiles, seconds
 
-    # 2) target data + profiles
-    seed(target)
-    con = DuckDBConnector(PATHS.db_path)
-    profiles_today = {}
-    findings = []
-    for s in E_COMMERCE_SPECS:
-        today = profile_table(con, s.name, s)
-        profiles_today[s.name] = today
-        findings.extend(detect_anomalies(today, baseline[s.name]))
-
-    # 3) write artifacts
-    schema = generate_dbt_schema(findings)
-    write_schema_yml(schema, PATHS.generated_dbt_schema)
-
-    run_id = uuid.uuid4().hex[:10]
-    report_path = write_markdown_report(
-        run_id=run_id,
-        snapshot_name=target,
-        findings=findings,
-        profiles_today=profiles_today,
-        out_dir=PATHS.generated_reports_dir,
-    )
+    with tracing(tracer), tracer.span("run", target=target):
+        # 1) baseline profiles: reuse stored versions matching the current schema
+        with stage("baseline"):
+            fingerprints = table_fingerprints(con, specs)
+            baseline = load_profiles(
+                con, BASELINE_SNAPSHOT, fingerprints, window=baseline_window
+            )
+            stale = [s for s in specs if s.name not in baseline]
+            if stale and reseed and target != BASELINE_SNAPSHOT:
+                with tracer.span("seed", mode=BASELINE_SNAPSHOT):
+                    seed_warehouse(con, "baseline", scale=scale)
+                with tracer.span("profile"):
+                    built, _ = profile(stale)
+                save_profiles(con, BASELINE_SNAPSHOT, built, table_fingerprints(con, stale))
+                baseline.update(built)
+
+        # 2) target data + profiles; a reseed drops the incremental partition sketches
+        if reseed:
+            with stage("seed"):
+                seed_warehouse(con, target, scale=scale)
+        with stage("profile"):
+            profiles_today, profile_seconds = profile(targeted)
+        for s in stale:
+            baseline.setdefault(s.name, profiles_today[s.name])
+
+        with stage("detect"):
+            findings = detect_anomalies_batch(
+                [(profiles_today[s.name], baseline[s.name]) for s in specs]
+            )
+            # every run extends the metric history, whichever detector reports, and
+            # that stores its profiles: a baseline run is its own baseline and
+            # extends the rolling window; narrowed profiles keep their own fingerprint
+            with tracer.span("history"):
+                scores = MetricHistory(con).observe(
+                    profiles_today,
+                    run_id,
+                    snapshot_name=target,
+                    fingerprints=table_fingerprints(con, targeted),
+                )
+            if detector == "history":
+                findings = combine_findings(findings, scores)
+
+        # 3) write artifacts
+        with stage("artifacts"):
+            with tracer.span("dbt_schema"):
+                schema = generate_dbt_schema(findings, registry)
+                dbt_written = write_schema_files(schema, PATHS.generated_dbt_models_dir)
+            with tracer.span("report"):
+                # timings up to here; the full trace is kept in dq_runs
+                report_path = write_markdown_report(
+                    run_id=run_id,
+                    snapshot_name=target,
+                    findings=findings,
+                    profiles_today=profiles_today,
+                    out_dir=PATHS.generated_reports_dir,
+                    trace=tracer.summary(),
+                    selection=selection.to_dict() if select else None,
+                )
+
+    if explain_slowest > 0:
+        with con.connect() as c:
+            tracer.explain_slowest(c, explain_slowest)
 
     summary = {
         "run_id": run_id,
         "target": target,
+        "accuracy": accuracy,
+        "detector": detector,
         "findings_count": len(findings),
-        "dbt_schema_path": str(PATHS.generated_dbt_schema),
+        "history": {"metrics": len(scores), "scored": int((scores.method > 0).sum())},
+        "baseline_rebuilt": [s.name for s in stale],
+        "profile_seconds": profile_seconds,
+        "dbt_models_dir": str(PATHS.generated_dbt_models_dir),
+        "dbt_models_written": [p.name for p in dbt_written],
         "report_path": str(report_path),
     }
+    if select:
+        summary["selection"] = selection.to_dict()
+    if cache is not None:
+        summary["profile_cache"] = {"served": cache_hits, **cache.stats.to_dict()}
+    # the full trace (spans, slow query SQL) is kept in dq_runs and the report
+    trace = tracer.summary()
+    summary["stage_seconds"] = {name: st["seconds"] for name, st in trace["stages"].items()}
+    save_run(con, run_id, target, {**summary, "trace": trace})
     return summary
 
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--target", choices=["baseline", "bad_day"], required=True)
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="profile only day partitions newer than the stored watermark "
+        "(with --no-seed; a reseed replaces every partition)",
+    )
+    ap.add_argument(
+        "--no-seed",
+        action="store_true",
+        help="profile the warehouse as it is instead of regenerating the target data",
+    )
+    ap.add_argument(
+        "--baseline-window",
+        type=int,
+        default=1,
+        help="median of the last N stored baseline versions",
+    )
+    ap.add_argument(
+        "--accuracy",
+        choices=["exact", "approximate"],
+        default="exact",
+        help="approximate: sketch-based distinct counts, quantiles and top-k",
+    )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="re-profile every table even if its content fingerprint is unchanged",
+    )
+    ap.add_argument(
+        "--scale", type=float, default=1.0, help="synthetic data size multiplier (see seeder)"
+    )
+    ap.add_argument(
+        "--explain-slowest",
+        type=int,
+        default=0,
+        help="capture EXPLAIN ANALYZE plans for the N slowest queries",
+    )
+    ap.add_argument(
+        "--detector",
+        choices=["snapshot", "history"],
+        default="snapshot",
+        help="history: score metrics against their day-of-week/EWMA models once warmed up; "
+        "every run updates the history either way, so it is warm when switched on",
+    )
+    ap.add_argument(
+        "--select",
+        nargs="+",
+        default=[],
+        metavar="SELECTOR",
+        help="only these tables/columns: fact_*, tag:finance, fact_orders.amount, "
+        "tag:finance.tag:money",
+    )
+    ap.add_argument(
+        "--with-parents",
+        action="store_true",
+        help="also profile the FK parents of the selected tables",
+    )
+    ap.add_argument("--workers", type=int, default=ParallelConfig.max_workers)
+    ap.add_argument("--memory-budget-mb", type=int, default=None)
     args = ap.parse_args()
 
-    out = run(args.target)
+    parallel = ParallelConfig(
+        max_workers=args.workers,
+        memory_budget_bytes=args.memory_budget_mb * 1024 * 1024 if args.memory_budget_mb else None,
+    )
+    con = DuckDBConnector(PATHS.db_path)
+    out = run(
+        args.target,
+        con=con,
+        cache=None if args.no_cache else ProfileCache(con),
+        incremental=args.incremental,
+        reseed=not args.no_seed,
+        parallel=parallel,
+        baseline_window=args.baseline_window,
+        accuracy=args.accuracy,
+        scale=args.scale,
+        explain_slowest=args.explain_slowest,
+        detector=args.detector,
+        select=args.select,
+        with_parents=args.with_parents,
+    )
     print(json.dumps(out, indent=2))
 
 
@@ -0,0 +1,208 @@
+"""
+Nightly profiling of an already loaded warehouse, sharded over processes.
+
+    python scripts/run_sharded.py --snapshot bad_day --shards 8 --workers 4
+    python scripts/run_sharded.py --snapshot bad_day --run-id 3f2a9c01e4   # resume
+    python scripts/run_sharded.py --estimate --shards 8 --sla-minutes 90
+
+Tables are split into shards of similar estimated cost (rows x columns from
+catalog statistics) and each shard is profiled by its own process over a
+read-only connection. Finished shards are checkpointed under
+generated/shards/<run_id>, so rerunning with the same --run-id only redoes
+the shards that failed. Detection, history and artifacts run once, in this
+process, on the merged profiles.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import uuid
+from typing import Optional, Sequence
+
+from dqa.anomaly.batch import detect_anomalies_batch
+from dqa.anomaly.timeseries import MetricHistory, combine_findings
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.dbtgen.schema_generator import generate_dbt_schema, write_schema_files
+from dqa.profiling.baseline_store import (
+    BASELINE_SNAPSHOT,
+    load_profiles,
+    table_fingerprints,
+)
+from dqa.profiling.profiler import TableSpec
+from dqa.profiling.registry import SpecRegistry, default_registry
+from dqa.profiling.sharding import (
+    calibrated_throughput,
+    estimate_costs,
+    estimate_sla,
+    profile_tables_sharded,
+)
+from dqa.reporting.report_writer import write_markdown_report
+from dqa.reporting.run_log import save_run
+from dqa.utils.config import PATHS
+from dqa.utils.tracing import Tracer, tracing
+
+
+def estimate(
+    con: DuckDBConnector,
+    shards: int,
+    workers: Optional[int] = None,
+    sla_seconds: Optional[float] = None,
+    specs: Optional[Sequence[TableSpec]] = None,
+) -> dict:
+    """SLA estimate for a sharded run, without profiling anything."""
+    specs = default_registry(con).specs() if specs is None else specs
+    with con.connect() as c:
+        costs = estimate_costs(c, specs)
+    return estimate_sla(
+        costs, shards, workers or shards, calibrated_throughput(con), sla_seconds
+    )
+
+
+def run_sharded(
+    snapshot: str,
+    con: Optional[DuckDBConnector] = None,
+    shards: int = 4,
+    workers: Optional[int] = None,
+    retries: int = 1,
+    run_id: Optional[str] = None,
+    accuracy: str = "exact",
+    detector: str = "snapshot",
+    sla_seconds: Optional[float] = None,
+    registry: Optional[SpecRegistry] = None,
+) -> dict:
+    if detector not in ("snapshot", "history"):
+        raise ValueError(f"detector must be 'snapshot' or 'history', got {detector!r}")
+    con = con or DuckDBConnector(PATHS.db_path)
+    registry = registry or default_registry(con)
+    specs = registry.specs()
+    run_id = run_id or uuid.uuid4().hex[:10]
+    checkpoint_dir = PATHS.generated_shards_dir / run_id
+    tracer = Tracer()
+
+    with tracing(tracer), tracer.span("run", target=snapshot, sharded=True):
+        with tracer.span("baseline"):
+            fingerprints = table_fingerprints(con, specs)
+            baseline = load_profiles(con, BASELINE_SNAPSHOT, fingerprints)
+            sla = estimate(con, shards, workers, sla_seconds, specs)
+
+        with tracer.span("profile", shards=shards):
+            sharded = profile_tables_sharded(
+                con,
+                specs,
+                shards=shards,
+                workers=workers,
+                accuracy=accuracy,
+                retries=retries,
+                checkpoint_dir=checkpoint_dir,
+            )
+            profiles_today = sharded.profiles
+        # tables without a stored baseline are compared with themselves
+        missing = [s.name for s in specs if s.name not in baseline]
+        for name in missing:
+            baseline[name] = profiles_today[name]
+
+        with tracer.span("detect"):
+            findings = detect_anomalies_batch(
+                [(profiles_today[s.name], baseline[s.name]) for s in specs]
+            )
+            with tracer.span("history"):
+                # also stores today's profiles under `snapshot`
+                scores = MetricHistory(con).observe(
+                    profiles_today, run_id, snapshot_name=snapshot, fingerprints=fingerprints
+                )
+            if detector == "history":
+                findings = combine_findings(findings, scores)
+
+        with tracer.span("artifacts"):
+            dbt_written = write_schema_files(
+                generate_dbt_schema(findings, registry), PATHS.generated_dbt_models_dir
+            )
+            report_path = write_markdown_report(
+                run_id=run_id,
+                snapshot_name=snapshot,
+                findings=findings,
+                profiles_today=profiles_today,
+                out_dir=PATHS.generated_reports_dir,
+                trace=tracer.summary(),
+            )
+
+    summary = {
+        "run_id": run_id,
+        "target": snapshot,
+        "accuracy": accuracy,
+        "detector": detector,
+        "findings_count": len(findings),
+        "history": {"metrics": len(scores), "scored": int((scores.method > 0).sum())},
+        "baseline_missing": missing,
+        "profile_seconds": sharded.timings,
+        "sharding": {
+            "shards": sharded.shards,
+            "cells_per_second": sharded.cells_per_second(),
+            "estimate": sla,
+        },
+        "dbt_models_dir": str(PATHS.generated_dbt_models_dir),
+        "dbt_models_written": [p.name for p in dbt_written],
+        "report_path": str(report_path),
+    }
+    # the full trace (spans, slow query SQL) is kept in dq_runs and the report
+    trace = tracer.summary()
+    summary["stage_seconds"] = {name: st["seconds"] for name, st in trace["stages"].items()}
+    save_run(con, run_id, snapshot, {**summary, "trace": trace})
+    # the run is recorded; its checkpoints are no longer needed to resume
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    return summary
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument(
+        "--snapshot", default="nightly", help="snapshot name the profiles are saved under"
+    )
+    ap.add_argument("--shards", type=int, default=4)
+    ap.add_argument(
+        "--workers", type=int, default=None, help="concurrent shard processes (default: shards)"
+    )
+    ap.add_argument("--retries", type=int, default=1, help="retries per failed shard")
+    ap.add_argument("--run-id", default=None, help="resume this run from its shard checkpoints")
+    ap.add_argument("--accuracy", choices=["exact", "approximate"], default="exact")
+    ap.add_argument(
+        "--detector",
+        choices=["snapshot", "history"],
+        default="snapshot",
+        help="as in run_dq.py; the metric history is updated with either detector",
+    )
+    ap.add_argument(
+        "--estimate",
+        action="store_true",
+        help="only print the cost-model runtime estimate for --shards/--workers",
+    )
+    ap.add_argument(
+        "--sla-minutes",
+        type=float,
+        default=None,
+        help="nightly deadline; the estimate reports whether it fits and the shards needed",
+    )
+    args = ap.parse_args()
+
+    con = DuckDBConnector(PATHS.db_path)
+    sla_seconds = args.sla_minutes * 60 if args.sla_minutes is not None else None
+    if args.estimate:
+        out = estimate(con, args.shards, args.workers, sla_seconds)
+    else:
+        out = run_sharded(
+            args.snapshot,
+            con=con,
+            shards=args.shards,
+            workers=args.workers,
+            retries=args.retries,
+            run_id=args.run_id,
+            accuracy=args.accuracy,
+            detector=args.detector,
+            sla_seconds=sla_seconds,
+        )
+    print(json.dumps(out, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from dqa.anomaly.detector import Finding, null_rate_interval, p99_interval
+
+# Metric codes; their order is also the order detect_anomalies emits findings in.
+ROW_COUNT, DUP_RATE, NULL_RATE, P99, FK_BAD_RATE = range(5)
+METRICS = ("row_count", "dup_rate", "null_rate", "p99", "fk_bad_rate")
+
+
+@dataclass
+class MetricFrame:
+    """
+    Columnar layout of (today, baseline) metric pairs: one row per
+    (pair, table, column, metric). `pair` indexes the input profile pair so
+    many tables and snapshots can be scored in one pass. `baseline` is NaN
+    where the baseline has no value. `extra` carries the FK info dict that
+    FK findings echo in their details. `today_low`/`baseline_high` are the
+    error-bound edges of approximate or sampled metrics (the values
+    themselves if exact).
+    """
+
+    pair: np.ndarray
+    table: np.ndarray
+    column: np.ndarray
+    metric: np.ndarray
+    baseline: np.ndarray
+    today: np.ndarray
+    extra: Optional[np.ndarray] = None
+    today_low: Optional[np.ndarray] = None
+    baseline_high: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.metric)
+
+    @classmethod
+    def from_pairs(cls, pairs: Sequence[Tuple[Dict[str, Any], Dict[str, Any]]]) -> "MetricFrame":
+        """
+        Lay out the pairs section by section: each profile section adds its
+        columns and values with one list extend, and pair, table and metric
+        are expanded from per-section counts with np.repeat. Error bounds
+        and FK/key info only exist for a few rows and are patched in by
+        position afterwards.
+        """
+        sec_pair: List[int] = []
+        sec_table: List[str] = []
+        sec_metric: List[int] = []
+        sec_len: List[int] = []
+        column: List[str] = []
+        base: List[float] = []
+        today_v: List[float] = []
+        extra: Dict[int, Any] = {}
+        low: Dict[int, float] = {}
+        high: Dict[int, float] = {}
+
+        def section(i: int, t: str, m: int, n: int) -> int:
+            sec_pair.append(i)
+            sec_table.append(t)
+            sec_metric.append(m)
+            sec_len.append(n)
+            return len(column)
+
+        nan = float("nan")
+        for i, (today, b) in enumerate(pairs):
+            t = today["table"]
+            section(i, t, ROW_COUNT, 1)
+            column.append("")
+            base.append(int(b.get("row_count", 0)))
+            today_v.append(int(today.get("row_count", 0)))
+
+            dup = today.get("key_duplicate_rates", {})
+            if dup:
+                at = section(i, t, DUP_RATE, len(dup))
+                column.extend(dup)
+                base.extend([nan] * len(dup))
+                today_v.extend(dup.values())
+                key_info = today.get("key_duplicates", {})
+                extra.update((at + j, key_info.get(c)) for j, c in enumerate(dup))
+
+            nr = today.get("null_rates", {})
+            if nr:
+                at = section(i, t, NULL_RATE, len(nr))
+                nr_b = b.get("null_rates", {})
+                column.extend(nr)
+                base.extend([nr_b.get(c, 0.0) for c in nr])
+                today_v.extend(nr.values())
+                # bounds of sampled profiles (see null_rate_interval)
+                bounds_t = today.get("accuracy", {}).get("null_rate_bounds")
+                if bounds_t or b.get("accuracy", {}).get("null_rate_bounds"):
+                    for j, c in enumerate(nr):
+                        low[at + j] = null_rate_interval(today, c)[0]
+                        high[at + j] = null_rate_interval(b, c)[1]
+
+            ns, ns_b = today.get("numeric_stats", {}), b.get("numeric_stats", {})
+            p99 = [c for c, st in ns.items() if c in ns_b and "p99" in st and "p99" in ns_b[c]]
+            if p99:
+                at = section(i, t, P99, len(p99))
+                column.extend(p99)
+                base.extend([ns_b[c]["p99"] for c in p99])
+                today_v.extend([ns[c]["p99"] for c in p99])
+                for j, c in enumerate(p99):
+                    low[at + j] = p99_interval(today, c)[0]
+                    high[at + j] = p99_interval(b, c)[1]
+
+            fk = today.get("fk_violations", {})
+            if fk:
+                at = section(i, t, FK_BAD_RATE, len(fk))
+                column.extend(fk)
+                base.extend([nan] * len(fk))
+                today_v.extend([info.get("bad_rate", 0.0) for info in fk.values()])
+                extra.update((at + j, info) for j, info in enumerate(fk.values()))
+
+        counts = np.asarray(sec_len, dtype=np.int64)
+        today_arr = np.asarray(today_v, dtype=np.float64)
+        base_arr = np.asarray(base, dtype=np.float64)
+        today_low = today_arr.copy()
+        baseline_high = base_arr.copy()
+        if low:
+            today_low[list(low)] = list(low.values())
+            baseline_high[list(high)] = list(high.values())
+        extra_arr = np.full(len(column), None, dtype=object)
+        for j, x in extra.items():
+            extra_arr[j] = x
+        return cls(
+            pair=np.repeat(np.asarray(sec_pair, dtype=np.int64), counts),
+            table=np.repeat(np.asarray(sec_table, dtype=object), counts),
+            column=np.asarray(column, dtype=object),
+            metric=np.repeat(np.asarray(sec_metric, dtype=np.int8), counts),
+            baseline=base_arr,
+            today=today_arr,
+            extra=extra_arr,
+            today_low=today_low,
+            baseline_high=baseline_high,
+        )
+
+
+def evaluate(frame: MetricFrame) -> np.ndarray:
+    """Boolean mask of rows that trip a rule (same thresholds as detect_anomalies)."""
+    m, b, t = frame.metric, frame.baseline, frame.today
+    lo = t if frame.today_low is None else frame.today_low
+    hi = b if frame.baseline_high is None else frame.baseline_high
+    with np.errstate(divide="ignore", invalid="ignore"):
+        row_drift = (m == ROW_COUNT) & (b != 0) & (np.abs(t - b) / b > 0.30)
+        dup = (m == DUP_RATE) & (t > 0.0)
+        hi0 = np.nan_to_num(hi, nan=0.0)
+        null_spike = (
+            (m == NULL_RATE) & (lo >= 0.02) & ((hi0 == 0.0) | (lo / np.maximum(hi0, 1e-9) >= 5.0))
+        )
+        p99_jump = (m == P99) & (hi > 0) & (lo / hi >= 5.0)
+        fk = (m == FK_BAD_RATE) & (t > 0.0)
+    return row_drift | dup | null_spike | p99_jump | fk
+
+
+def _finding(frame: MetricFrame, i: int) -> Finding:
+    t, c, m = str(frame.table[i]), str(frame.column[i]), int(frame.metric[i])
+    b, v = float(frame.baseline[i]), float(frame.today[i])
+    if m == ROW_COUNT:
+        rc_b, rc_t = int(b), int(v)
+        return Finding(
+            severity="WARN",
+            table=t,
+            kind="ROW_COUNT_DRIFT",
+            message=f"Row count drift: baseline={rc_b}, today={rc_t}",
+            details={"baseline": rc_b, "today": rc_t},
+        )
+    if m == DUP_RATE:
+        info = frame.extra[i] if frame.extra is not None else None
+        return Finding(
+            severity="CRITICAL",
+            table=t,
+            kind="DUPLICATE_KEY",
+            message=f"Duplicate rate for key '{c}' is {v:.4f}",
+            details={"column": c, **(info or {}), "duplicate_rate": v},
+        )
+    if m == NULL_RATE:
+        return Finding(
+            severity="CRITICAL",
+            table=t,
+            kind="NULL_SPIKE",
+            message=f"Null spike on '{c}': baseline={b:.4f}, today={v:.4f}",
+            details={"column": c, "baseline_null": b, "today_null": v},
+        )
+    if m == P99:
+        return Finding(
+            severity="CRITICAL",
+            table=t,
+            kind="P99_JUMP",
+            message=f"p99 jump on '{c}': baseline={b:.2f}, today={v:.2f}",
+            details={"column": c, "baseline_p99": b, "today_p99": v},
+        )
+    info = frame.extra[i] if frame.extra is not None else None
+    return Finding(
+        severity="CRITICAL",
+        table=t,
+        kind="FK_VIOLATION",
+        message=f"FK violation on '{c}': bad_rate={v:.4f}",
+        details={"column": c, **(info or {"bad_rate": v})},
+    )
+
+
+def findings_from_frame(frame: MetricFrame) -> List[Finding]:
+    """Findings for flagged rows, ordered by pair, then rule, then input order."""
+    hits = np.flatnonzero(evaluate(frame))
+    order = np.lexsort((hits, frame.metric[hits], frame.pair[hits]))
+    return [_finding(frame, int(i)) for i in hits[order]]
+
+
+def detect_anomalies_batch(
+    pairs: Sequence[Tuple[Dict[str, Any], Dict[str, Any]]],
+) -> List[Finding]:
+    """Vectorized equivalent of calling detect_anomalies(today, base) for every pair."""
+    return findings_from_frame(MetricFrame.from_pairs(pairs))
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 
 @dataclass(frozen=True)
@@ -13,6 +13,30 @@ class Finding:
     details: Dict[str, Any]
 
 
+def p99_interval(profile: Dict[str, Any], column: str) -> Tuple[float, float]:
+    """
+    (low, high) bounds of a column's p99. Approximate profiles record them
+    under accuracy.p99_bounds; exact profiles collapse to the point value.
+    """
+    p99 = float(profile["numeric_stats"][column]["p99"])
+    bounds = profile.get("accuracy", {}).get("p99_bounds", {}).get(column)
+    if not bounds:
+        return p99, p99
+    return min(p99, float(bounds[0])), max(p99, float(bounds[1]))
+
+
+def null_rate_interval(profile: Dict[str, Any], column: str) -> Tuple[float, float]:
+    """
+    (low, high) bounds of a column's null rate. Sampled profiles record
+    them under accuracy.null_rate_bounds; otherwise the rate is exact.
+    """
+    rate = float(profile.get("null_rates", {}).get(column, 0.0))
+    bounds = profile.get("accuracy", {}).get("null_rate_bounds", {}).get(column)
+    if not bounds:
+        return rate, rate
+    return min(rate, float(bounds[0])), max(rate, float(bounds[1]))
+
+
 def detect_anomalies(today: Dict[str, Any], base: Dict[str, Any]) -> List[Finding]:
     findings: List[Finding] = []
     t = today["table"]
@@ -32,6 +56,7 @@ def detect_anomalies(today: Dict[str, Any], base: Dict[str, Any]) -> List[Findin
         )
 
     # 2) Duplicate keys (critical)
+    key_info = today.get("key_duplicates", {})
     for k, dup_rate in today.get("key_duplicate_rates", {}).items():
         if float(dup_rate) > 0.0:
             findings.append(
@@ -40,18 +65,21 @@ def detect_anomalies(today: Dict[str, Any], base: Dict[str, Any]) -> List[Findin
                     table=t,
                     kind="DUPLICATE_KEY",
                     message=f"Duplicate rate for key '{k}' is {float(dup_rate):.4f}",
-                    details={"column": k, "duplicate_rate": float(dup_rate)},
+                    details={"column": k, **key_info.get(k, {}), "duplicate_rate": float(dup_rate)},
                 )
             )
 
     # 3) Null spikes (critical)
+    # Sampled rates must spike even at the edges of their confidence intervals.
     nr_t = today.get("null_rates", {})
     nr_b = base.get("null_rates", {})
     for c, v in nr_t.items():
         b = float(nr_b.get(c, 0.0))
         v = float(v)
+        low_t, _ = null_rate_interval(today, c)
+        _, high_b = null_rate_interval(base, c)
         # Trigger if null rate >=2% and increased >=5x vs baseline (or baseline ~0)
-        if v >= 0.02 and (b == 0.0 or v / max(b, 1e-9) >= 5.0):
+        if low_t >= 0.02 and (high_b == 0.0 or low_t / max(high_b, 1e-9) >= 5.0):
             findings.append(
                 Finding(
                     severity="CRITICAL",
@@ -63,13 +91,16 @@ def detect_anomalies(today: Dict[str, Any], base: Dict[str, Any]) -> List[Findin
             )
 
     # 4) Numeric drift (p99 jump) (critical)
+    # Approximate profiles must jump even at the edges of their error bounds.
     ns_t = today.get("numeric_stats", {})
     ns_b = base.get("numeric_stats", {})
     for c, s in ns_t.items():
         if c in ns_b and "p99" in s and "p99" in ns_b[c]:
             p99_t = float(s["p99"])
             p99_b = float(ns_b[c]["p99"])
-            if p99_b > 0 and p99_t / p99_b >= 5.0:
+            low_t, _ = p99_interval(today, c)
+            _, high_b = p99_interval(base, c)
+            if high_b > 0 and low_t / high_b >= 5.0:
                 findings.append(
                     Finding(
                         severity="CRITICAL",
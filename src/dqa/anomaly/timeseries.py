@@ -0,0 +1,429 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from dqa.anomaly.detector import Finding
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.profiling.baseline_store import ensure_profile_store, save_profiles
+
+# Same-weekday values kept per series for the seasonal median/MAD.
+SEASON_SLOTS = 8
+EWMA_ALPHA = 0.3
+# History needed before a series is scored (seasonal first, EWMA as fallback).
+MIN_SEASON_POINTS = 3
+MIN_EWMA_POINTS = 5
+Z_THRESHOLD = 5.0
+# Spread floors, so flat histories do not turn noise into huge z-scores.
+REL_FLOOR = 0.05
+ABS_FLOOR = {"row_count": 1.0, "null_rate": 0.005}
+_MAD_TO_SIGMA = 1.4826
+
+# Metrics scored against history; the rest are stored for reference only.
+DRIFT_METRICS = ("row_count", "null_rate", "p99", "mean", "distinct_count")
+_SEVERITY = {"null_rate": "CRITICAL", "p99": "CRITICAL"}
+# Only increases are anomalous for these.
+_UPWARD_ONLY = ("null_rate",)
+# Snapshot findings a ready history model supersedes, by kind.
+_SNAPSHOT_KINDS = {"ROW_COUNT_DRIFT": "row_count", "NULL_SPIKE": "null_rate", "P99_JUMP": "p99"}
+
+SEASONAL, EWMA = 1, 2
+_METHODS = {SEASONAL: "seasonal", EWMA: "ewma"}
+
+# Profile leaf (metric, field) of each history metric; the column is the profile's.
+POINT_LEAVES = {
+    "row_count": ("row_count", ""),
+    "null_rate": ("null_rates", ""),
+    "distinct_count": ("distinct_counts", ""),
+    "p99": ("numeric_stats", "p99"),
+    "mean": ("numeric_stats", "mean"),
+    "dup_rate": ("key_duplicate_rates", ""),
+    "fk_bad_rate": ("fk_violations", "bad_rate"),
+}
+# Snapshot a run's profiles are stored under when the caller names none.
+HISTORY_SNAPSHOT = "history"
+
+_LEAVES_SQL = "(VALUES " + ", ".join(
+    f"('{m}', '{leaf}', '{field}')" for m, (leaf, field) in POINT_LEAVES.items()
+) + ") AS l(metric, leaf, field)"
+
+# The points are not stored twice: dq_metric_points reads the leaves of the
+# profiles each run saved in dq_profile_metrics.
+HISTORY_SQL = f"""
+CREATE OR REPLACE VIEW dq_metric_points AS
+SELECT p.table_name, p.column_name, l.metric, p.created_at AS ts, p.value, p.run_id
+FROM dq_profile_metrics p JOIN {_LEAVES_SQL} ON p.metric = l.leaf AND p.field = l.field
+WHERE p.run_id IS NOT NULL;
+CREATE TABLE IF NOT EXISTS dq_metric_models (
+  table_name VARCHAR,
+  column_name VARCHAR,
+  metric VARCHAR,
+  n BIGINT,
+  last_ts TIMESTAMP,
+  ewma DOUBLE,
+  ewvar DOUBLE,
+  ring BLOB,
+  ring_pos BLOB
+);
+"""
+
+Key = Tuple[str, str, str]
+_KEY_COLUMNS = ("table_name", "column_name", "metric")
+
+
+def ensure_history(c: duckdb.DuckDBPyConnection) -> None:
+    """Create the history view and model table."""
+    ensure_profile_store(c)
+    c.execute(HISTORY_SQL)
+
+
+def profile_metrics(profile: Dict[str, Any]) -> List[Tuple[str, str, float]]:
+    """(column, metric, value) points of one profile; table-level metrics use column ''."""
+    out: List[Tuple[str, str, float]] = [("", "row_count", float(profile.get("row_count", 0)))]
+    for c, v in profile.get("null_rates", {}).items():
+        out.append((c, "null_rate", float(v)))
+    for c, v in profile.get("distinct_counts", {}).items():
+        out.append((c, "distinct_count", float(v)))
+    for c, s in profile.get("numeric_stats", {}).items():
+        for m in ("p99", "mean"):
+            if m in s:
+                out.append((c, m, float(s[m])))
+    for c, v in profile.get("key_duplicate_rates", {}).items():
+        out.append((c, "dup_rate", float(v)))
+    for c, info in profile.get("fk_violations", {}).items():
+        out.append((c, "fk_bad_rate", float(info.get("bad_rate", 0.0))))
+    return out
+
+
+def _row_median(a: np.ndarray, have: np.ndarray) -> np.ndarray:
+    """Median of each row's first-sorted `have` values (NaN sorts last); NaN when empty."""
+    srt = np.sort(a, axis=1)
+    n = np.maximum(have, 1)
+    lo = np.take_along_axis(srt, ((n - 1) // 2)[:, None], 1)[:, 0]
+    hi = np.take_along_axis(srt, (n // 2)[:, None], 1)[:, 0]
+    mid = (lo + hi) / 2
+    return np.where(have > 0, mid, np.nan)
+
+
+class SeriesModels:
+    """
+    Per-series model state as columnar arrays: an EWMA mean/variance and a
+    ring of the last SEASON_SLOTS values per weekday. Scoring and updating
+    a batch of points are vectorized and O(1) per point, whatever the
+    length of the history.
+    """
+
+    def __init__(self, keys: Sequence[Key] = ()):
+        self.keys: List[Key] = []
+        self.index: Dict[Key, int] = {}
+        self.n = np.zeros(0, dtype=np.int64)
+        self.last_ts = np.zeros(0, dtype="datetime64[us]")
+        self.ewma = np.zeros(0)
+        self.ewvar = np.zeros(0)
+        self.ring = np.zeros((0, 7, SEASON_SLOTS))
+        self.ring_pos = np.zeros((0, 7), dtype=np.int32)
+        self.lookup(keys)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, keys: Sequence[Key]) -> np.ndarray:
+        """Row of each key, adding empty series for unseen keys."""
+        new = [k for k in dict.fromkeys(keys) if k not in self.index]
+        if new:
+            for k in new:
+                self.index[k] = len(self.keys)
+                self.keys.append(k)
+            m = len(new)
+            self.n = np.concatenate([self.n, np.zeros(m, dtype=np.int64)])
+            self.last_ts = np.concatenate(
+                [self.last_ts, np.full(m, np.datetime64("NaT"), dtype="datetime64[us]")]
+            )
+            self.ewma = np.concatenate([self.ewma, np.zeros(m)])
+            self.ewvar = np.concatenate([self.ewvar, np.zeros(m)])
+            self.ring = np.concatenate([self.ring, np.full((m, 7, SEASON_SLOTS), np.nan)])
+            self.ring_pos = np.concatenate([self.ring_pos, np.zeros((m, 7), dtype=np.int32)])
+        return np.fromiter((self.index[k] for k in keys), dtype=np.int64, count=len(keys))
+
+    def _floor(self, metrics: np.ndarray, level: np.ndarray) -> np.ndarray:
+        floor = np.full(len(metrics), 1e-9)
+        for m, f in ABS_FLOOR.items():
+            floor[metrics == m] = f
+        return np.maximum(floor, REL_FLOOR * np.abs(level))
+
+    def score(
+        self, rows: np.ndarray, dow: np.ndarray, values: np.ndarray, metrics: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (z-score, expected value, sigma, method) per point against the current
+        state. Seasonal median/MAD is used once the weekday has
+        MIN_SEASON_POINTS values, else the EWMA after MIN_EWMA_POINTS
+        points; method is 0 (and z NaN) while a series is still warming up.
+        """
+        season = self.ring[rows, dow]
+        have = np.sum(~np.isnan(season), axis=1)
+        med = _row_median(season, have)
+        mad = _row_median(np.abs(season - med[:, None]), have)
+        sigma_s = np.maximum(_MAD_TO_SIGMA * np.nan_to_num(mad), self._floor(metrics, med))
+        sigma_e = np.maximum(np.sqrt(self.ewvar[rows]), self._floor(metrics, self.ewma[rows]))
+
+        use_season = have >= MIN_SEASON_POINTS
+        use_ewma = ~use_season & (self.n[rows] >= MIN_EWMA_POINTS)
+        expected = np.where(use_season, med, np.where(use_ewma, self.ewma[rows], np.nan))
+        sigma = np.where(use_season, sigma_s, sigma_e)
+        z = np.where(use_season | use_ewma, (values - expected) / sigma, np.nan)
+        method = np.where(use_season, SEASONAL, np.where(use_ewma, EWMA, 0)).astype(np.int8)
+        return z, expected, sigma, method
+
+    def update(
+        self,
+        rows: np.ndarray,
+        dow: np.ndarray,
+        values: np.ndarray,
+        ts: np.ndarray,
+        clip: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    ) -> None:
+        """
+        Fold one point per row into the state. `clip` (low, high) winsorizes
+        values first, so a single outlier cannot drag the baseline with it.
+        """
+        x = values if clip is None else np.clip(values, clip[0], clip[1])
+        first = self.n[rows] == 0
+        delta = x - self.ewma[rows]
+        ewvar = (1 - EWMA_ALPHA) * (self.ewvar[rows] + EWMA_ALPHA * delta * delta)
+        self.ewma[rows] = np.where(first, x, self.ewma[rows] + EWMA_ALPHA * delta)
+        self.ewvar[rows] = np.where(first, 0.0, ewvar)
+        self.n[rows] += 1
+        self.last_ts[rows] = ts
+        pos = self.ring_pos[rows, dow]
+        self.ring[rows, dow, pos] = x
+        self.ring_pos[rows, dow] = (pos + 1) % SEASON_SLOTS
+
+
+@dataclass
+class HistoryScores:
+    """Scored points of one run, columnar like MetricFrame."""
+
+    table: np.ndarray
+    column: np.ndarray
+    metric: np.ndarray
+    value: np.ndarray
+    expected: np.ndarray
+    z: np.ndarray
+    method: np.ndarray
+    history: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    def flagged(self, threshold: float = Z_THRESHOLD) -> np.ndarray:
+        drift = np.isin(self.metric, DRIFT_METRICS)
+        with np.errstate(invalid="ignore"):
+            up = np.isin(self.metric, _UPWARD_ONLY)
+            out = np.where(up, self.z >= threshold, np.abs(self.z) >= threshold)
+        return drift & (self.method > 0) & out
+
+    def ready(self) -> set:
+        """(table, column, metric) of the points that were scored against a model."""
+        hits = np.flatnonzero(self.method > 0)
+        return {(self.table[i], self.column[i], self.metric[i]) for i in hits}
+
+
+def findings_from_scores(scores: HistoryScores, threshold: float = Z_THRESHOLD) -> List[Finding]:
+    out: List[Finding] = []
+    for i in np.flatnonzero(scores.flagged(threshold)):
+        t, c, m = str(scores.table[i]), str(scores.column[i]), str(scores.metric[i])
+        v, e, z = float(scores.value[i]), float(scores.expected[i]), float(scores.z[i])
+        method = _METHODS[int(scores.method[i])]
+        where = f"'{c}'" if c else "table"
+        out.append(
+            Finding(
+                severity=_SEVERITY.get(m, "WARN"),
+                table=t,
+                kind=f"{m.upper()}_ANOMALY",
+                message=f"{m} on {where}: expected={e:.4g} ({method}), today={v:.4g}, z={z:.1f}",
+                details={
+                    "column": c,
+                    "metric": m,
+                    "today": v,
+                    "expected": e,
+                    "z": z,
+                    "method": method,
+                    "history_points": int(scores.history[i]),
+                },
+            )
+        )
+    return out
+
+
+def combine_findings(
+    snapshot: Sequence[Finding], scores: HistoryScores, threshold: float = Z_THRESHOLD
+) -> List[Finding]:
+    """
+    Snapshot findings, minus the fixed-ratio drift rules for metrics whose
+    history model is ready, plus the history-based findings. Hard rules
+    (duplicate keys, FK violations) always come from the snapshot.
+    """
+    ready = scores.ready()
+    kept = [
+        f
+        for f in snapshot
+        if f.kind not in _SNAPSHOT_KINDS
+        or (f.table, f.details.get("column", ""), _SNAPSHOT_KINDS[f.kind]) not in ready
+    ]
+    return kept + findings_from_scores(scores, threshold)
+
+
+class MetricHistory:
+    """
+    Per-metric time series in the warehouse. A run's points are the
+    leaves of its stored profiles (see `save_profiles`), read through the
+    dq_metric_points view, so each metric is stored once. Model state
+    lives in dq_metric_models, one row per series with the weekday rings
+    packed as float64 blobs so it loads as a few flat arrays; it can
+    always be rebuilt from the points. `observe` scores a run against the
+    state of its series, then folds it in; only those series are read and
+    written back.
+    """
+
+    def __init__(self, con: DuckDBConnector):
+        self.con = con
+
+    def load(self, keys: Optional[Sequence[Key]] = None) -> SeriesModels:
+        """
+        Stored state of the `keys` series (default: all); series without one
+        are left out. With no state stored at all, it is rebuilt.
+        """
+        models = SeriesModels()
+        sql = (
+            "SELECT table_name, column_name, metric, n, last_ts, ewma, ewvar, ring, ring_pos "
+            "FROM dq_metric_models"
+        )
+        with self.con.connect() as c:
+            ensure_history(c)
+            if c.execute("SELECT 1 FROM dq_metric_models LIMIT 1;").fetchone() is None:
+                return self.rebuild()
+            if keys is None:
+                res = c.execute(sql + ";").fetchnumpy()
+            else:
+                c.register("_dq_keys", pd.DataFrame(keys, columns=list(_KEY_COLUMNS)))
+                try:
+                    using = ", ".join(_KEY_COLUMNS)
+                    res = c.execute(f"{sql} JOIN _dq_keys USING ({using});").fetchnumpy()
+                finally:
+                    c.unregister("_dq_keys")
+        keys = list(zip(res["table_name"], res["column_name"], res["metric"], strict=True))
+        models.lookup(keys)
+        models.n[:] = res["n"]
+        models.last_ts[:] = res["last_ts"].astype("datetime64[us]")
+        models.ewma[:] = res["ewma"]
+        models.ewvar[:] = res["ewvar"]
+        ring = np.frombuffer(b"".join(res["ring"]), dtype=np.float64)
+        models.ring[:] = ring.reshape(len(keys), 7, SEASON_SLOTS)
+        ring_pos = np.frombuffer(b"".join(res["ring_pos"]), dtype=np.int32)
+        models.ring_pos[:] = ring_pos.reshape(len(keys), 7)
+        return models
+
+    def rebuild(self) -> SeriesModels:
+        """Replay dq_metric_points run by run (used when no model state is stored)."""
+        models = SeriesModels()
+        with self.con.connect() as c:
+            ensure_history(c)
+            df = c.execute(
+                "SELECT table_name, column_name, metric, ts, value FROM dq_metric_points "
+                "ORDER BY ts, run_id;"
+            ).fetchdf()
+        for ts, g in df.groupby("ts", sort=True):
+            keys = list(zip(g["table_name"], g["column_name"], g["metric"], strict=True))
+            rows = models.lookup(keys)
+            values = g["value"].to_numpy(dtype=np.float64)
+            self._fold(models, rows, values, np.datetime64(ts, "us"), g["metric"].to_numpy())
+        return models
+
+    def save(self, models: SeriesModels) -> None:
+        """Upsert the state of the series in `models`; other stored series are kept."""
+        k = len(models)
+        df = pd.DataFrame(
+            {
+                "table_name": [key[0] for key in models.keys],
+                "column_name": [key[1] for key in models.keys],
+                "metric": [key[2] for key in models.keys],
+                "n": models.n,
+                "last_ts": models.last_ts,
+                "ewma": models.ewma,
+                "ewvar": models.ewvar,
+                "ring": [r.tobytes() for r in models.ring.reshape(k, -1)],
+                "ring_pos": [r.tobytes() for r in models.ring_pos.reshape(k, -1)],
+            }
+        )
+        with self.con.connect() as c:
+            ensure_history(c)
+            c.register("_dq_models", df)
+            try:
+                match = " AND ".join(f"m.{x} = d.{x}" for x in _KEY_COLUMNS)
+                c.begin()
+                try:
+                    c.execute(f"DELETE FROM dq_metric_models m USING _dq_models d WHERE {match};")
+                    c.execute("INSERT INTO dq_metric_models SELECT * FROM _dq_models;")
+                    c.commit()
+                except Exception:
+                    c.rollback()
+                    raise
+            finally:
+                c.unregister("_dq_models")
+
+    @staticmethod
+    def _fold(
+        models: SeriesModels,
+        rows: np.ndarray,
+        values: np.ndarray,
+        ts: np.datetime64,
+        metrics: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        dow = np.full(len(rows), pd.Timestamp(ts).dayofweek, dtype=np.int64)
+        z, expected, sigma, method = models.score(rows, dow, values, metrics)
+        # winsorize scored points at the threshold before they join the baseline
+        scored = method > 0
+        lo = np.where(scored, expected - Z_THRESHOLD * sigma, -np.inf)
+        hi = np.where(scored, expected + Z_THRESHOLD * sigma, np.inf)
+        models.update(rows, dow, values, ts, clip=(lo, hi))
+        return z, expected, method
+
+    def observe(
+        self,
+        profiles: Dict[str, Dict[str, Any]],
+        run_id: str,
+        ts: Optional[datetime] = None,
+        snapshot_name: str = HISTORY_SNAPSHOT,
+        fingerprints: Optional[Dict[str, str]] = None,
+    ) -> HistoryScores:
+        """
+        Score this run's points against the state and update it, and store
+        the run's profiles under `snapshot_name` (with `fingerprints`, as in
+        `save_profiles`); the pipeline keeps no other copy of them.
+        """
+        ts = ts or datetime.now()
+        points = [
+            (t, c, m, v) for t, prof in profiles.items() for c, m, v in profile_metrics(prof)
+        ]
+        table = np.asarray([p[0] for p in points], dtype=object)
+        column = np.asarray([p[1] for p in points], dtype=object)
+        metric = np.asarray([p[2] for p in points], dtype=object)
+        value = np.asarray([p[3] for p in points], dtype=np.float64)
+
+        keys = list(zip(table, column, metric, strict=True))
+        models = self.load(keys)
+        rows = models.lookup(keys)
+        history = models.n[rows].copy()
+        z, expected, method = self._fold(models, rows, value, np.datetime64(ts, "us"), metric)
+
+        save_profiles(
+            self.con, snapshot_name, profiles, fingerprints or {}, run_id=run_id, created_at=ts
+        )
+        self.save(models)
+        return HistoryScores(table, column, metric, value, expected, z, method, history)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import threading
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Finished jobs kept for status lookups; oldest are forgotten first.
+MAX_FINISHED_JOBS = 1000
+
+
+class JobQueueFull(RuntimeError):
+    pass
+
+
+@dataclass
+class Job:
+    run_id: str
+    key: Hashable
+    params: Dict[str, Any]
+    status: str = "queued"  # queued | running | succeeded | failed
+    stage: Optional[str] = None
+    submitted_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "stage": self.stage,
+            "params": self.params,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    Bounded background executor for pipeline runs.
+
+    Identical in-flight submissions (same `key`) share one job. Jobs that
+    target the same warehouse run one at a time under a per-warehouse lock,
+    so concurrent runs never reseed the same DuckDB file under each other.
+    `fn` receives `run_id` and a `progress(stage)` callback as keywords.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 32):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dq-job")
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._inflight: Dict[Hashable, str] = {}
+        self._warehouse_locks: Dict[str, threading.Lock] = {}
+
+    def _warehouse_lock(self, warehouse: str) -> threading.Lock:
+        with self._lock:
+            return self._warehouse_locks.setdefault(warehouse, threading.Lock())
+
+    def submit(
+        self,
+        key: Hashable,
+        warehouse: str,
+        fn: Callable[..., Dict[str, Any]],
+        params: Dict[str, Any],
+    ) -> tuple[Job, bool]:
+        """Queue `fn(**params)`; returns (job, deduplicated)."""
+        with self._lock:
+            existing = self._inflight.get(key)
+            if existing is not None:
+                return self._jobs[existing], True
+            if len(self._inflight) >= self.max_pending:
+                raise JobQueueFull(f"{len(self._inflight)} runs already pending")
+            job = Job(run_id=uuid.uuid4().hex[:10], key=key, params=dict(params))
+            self._jobs[job.run_id] = job
+            self._inflight[key] = job.run_id
+            self._evict_finished()
+        self._executor.submit(self._execute, job, warehouse, fn)
+        return job, False
+
+    def _execute(self, job: Job, warehouse: str, fn: Callable[..., Dict[str, Any]]) -> None:
+        def progress(stage: str) -> None:
+            job.stage = stage
+
+        try:
+            with self._warehouse_lock(warehouse):
+                job.status = "running"
+                job.started_at = datetime.now().isoformat(timespec="seconds")
+                job.result = fn(run_id=job.run_id, progress=progress, **job.params)
+            job.status = "succeeded"
+        except Exception as e:  # surfaced through GET /dq/runs/{id}
+            job.error = f"{type(e).__name__}: {e}"
+            job.result = {"traceback": traceback.format_exc(limit=5)}
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.now().isoformat(timespec="seconds")
+            with self._lock:
+                self._inflight.pop(job.key, None)
+
+    def _evict_finished(self) -> None:
+        finished = [rid for rid, j in self._jobs.items() if j.done]
+        for rid in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[rid]
+
+    def get(self, run_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(run_id)
+
+    def status_counts(self) -> Dict[str, int]:
+        with self._lock:
+            out = {s: 0 for s in ("queued", "running", "succeeded", "failed")}
+            for j in self._jobs.values():
+                out[j.status] = out.get(j.status, 0) + 1
+            return out
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -1,31 +1,247 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
+import os
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from dqa.api.jobs import JobManager, JobQueueFull
+from dqa.api.metrics import RunMetrics
+from dqa.api.worker import Worker
+from dqa.reporting.report_reader import (
+    RECORD_TYPES,
+    etag,
+    iter_chunks,
+    iter_ndjson,
+    iter_records,
+    page_findings,
+    read_header,
+)
+from dqa.reporting.report_writer import records_path
 from dqa.utils.config import PATHS
 
-# Import run() from scripts (simple for POC)
-from scripts.run_dq import run  # noqa: E402
 
-app = FastAPI(title="DataQualityAgent", version="0.1.0")
+def run(**kwargs: Any) -> Dict[str, Any]:
+    """scripts.run_dq.run, imported on the first run: it pulls in pandas, numpy and duckdb."""
+    from scripts.run_dq import run as run_pipeline
+
+    return run_pipeline(**kwargs)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # one long-lived warehouse connection per worker, opened on first use;
+    # unchanged tables (typically dimensions) are served from dq_profile_cache
+    app.state.worker = Worker(
+        PATHS.db_path, cache_entries=int(os.environ.get("DQA_PROFILE_CACHE_ENTRIES", "256"))
+    )
+    if os.environ.get("DQA_PREWARM") == "1":
+        # load the pipeline, connection and specs before accepting requests
+        import scripts.run_dq  # noqa: F401
+
+        app.state.worker.warm()
+    app.state.metrics = RunMetrics()
+    app.state.jobs = JobManager(
+        max_workers=int(os.environ.get("DQA_JOB_WORKERS", "2")),
+        max_pending=int(os.environ.get("DQA_JOB_MAX_PENDING", "32")),
+    )
+    yield
+    app.state.jobs.shutdown()
+    app.state.worker.close()
+
+
+app = FastAPI(title="DataQualityAgent", version="0.1.0", lifespan=lifespan)
+# reports compress well; streamed responses are compressed chunk by chunk
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+SEVERITIES = ("CRITICAL", "WARN")
 
 
-@app.post("/dq/run")
-def run_dq(target: str = "bad_day"):
+@app.post("/dq/run", status_code=202)
+def run_dq(
+    request: Request,
+    target: str = "bad_day",
+    incremental: bool = False,
+    reseed: bool = True,
+    baseline_window: int = 1,
+    accuracy: str = "exact",
+    select: Optional[List[str]] = Query(None),
+    with_parents: bool = False,
+):
+    """
+    Queue a run. `select` limits it to tables and columns, e.g.
+    `?select=fact_payments&with_parents=true` or `?select=tag:finance.amount`.
+    `reseed=false` profiles the warehouse as it is, so `incremental` can skip
+    the day partitions it has already sketched.
+    """
     if target not in ("baseline", "bad_day"):
         raise HTTPException(status_code=400, detail="target must be baseline or bad_day")
+    if accuracy not in ("exact", "approximate"):
+        raise HTTPException(status_code=400, detail="accuracy must be exact or approximate")
 
-    result = run(target)
-    return result
+    params = {
+        "target": target,
+        "incremental": incremental,
+        "baseline_window": baseline_window,
+        "accuracy": accuracy,
+    }
+    if not reseed:
+        params["reseed"] = False
+    if select:
+        from dqa.profiling.selection import parse_selector
 
+        try:
+            for s in select:
+                parse_selector(s)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+        params["select"] = select
+        params["with_parents"] = with_parents
+    worker = request.app.state.worker
+    metrics = request.app.state.metrics
 
-@app.get("/dq/report/{run_id}")
-def get_report(run_id: str):
+    def execute(**kw: Any) -> Dict[str, Any]:
+        from dqa.utils.tracing import Tracer
+
+        # resources are created in the job thread, not while answering the POST
+        tracer = Tracer()
+        summary = run(
+            con=worker.con, cache=worker.cache, registry=worker.registry, tracer=tracer, **kw
+        )
+        # the summary only carries stage seconds; metrics want query totals too
+        return metrics.observe(summary, tracer.summary())
+
+    try:
+        job, deduplicated = request.app.state.jobs.submit(
+            key=(str(worker.db_path), tuple((k, repr(v)) for k, v in sorted(params.items()))),
+            warehouse=str(worker.db_path),
+            fn=execute,
+            params=params,
+        )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e)) from e
+    return {"run_id": job.run_id, "status": job.status, "deduplicated": deduplicated}
+
+
+@app.get("/dq/runs/{run_id}")
+def get_run(request: Request, run_id: str):
+    job = request.app.state.jobs.get(run_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="run not found")
+    return job.to_dict()
+
+
+@app.get("/dq/cache")
+def get_cache_stats(request: Request):
+    """Profile cache counters; null until a run has used the cache."""
+    return request.app.state.worker.cache_stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics(request: Request):
+    state = request.app.state
+    return PlainTextResponse(
+        state.metrics.render(jobs=state.jobs.status_counts(), cache=state.worker.cache_stats()),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+def _report_file(run_id: str, suffix: str) -> Path:
     fp = PATHS.generated_reports_dir / f"run_{run_id}.md"
+    fp = fp if suffix == ".md" else records_path(fp)
     if not fp.exists():
         raise HTTPException(status_code=404, detail="report not found")
-    return {"run_id": run_id, "report_markdown": fp.read_text(encoding="utf-8")}
+    return fp
+
+
+def _not_modified(request: Request, tag: str) -> bool:
+    return tag in request.headers.get("if-none-match", "")
+
+
+def _check(values: Optional[List[str]], allowed: tuple, name: str) -> None:
+    bad = sorted(set(values or []) - set(allowed))
+    if bad:
+        raise HTTPException(status_code=400, detail=f"{name} must be in {allowed}, got {bad}")
+
+
+@app.get("/dq/report/{run_id}")
+def get_report(request: Request, run_id: str):
+    """The Markdown report, streamed from disk."""
+    fp = _report_file(run_id, ".md")
+    tag = etag(fp)
+    if _not_modified(request, tag):
+        return Response(status_code=304, headers={"ETag": tag})
+    return StreamingResponse(
+        iter_chunks(fp), media_type="text/markdown; charset=utf-8", headers={"ETag": tag}
+    )
+
+
+@app.get("/dq/report/{run_id}/records")
+def get_report_records(
+    request: Request,
+    run_id: str,
+    type: Optional[List[str]] = Query(None),
+    table: Optional[List[str]] = Query(None),
+    severity: Optional[List[str]] = Query(None),
+):
+    """Report records as NDJSON, optionally filtered by type, table and severity."""
+    _check(type, RECORD_TYPES, "type")
+    _check(severity, SEVERITIES, "severity")
+    fp = _report_file(run_id, ".ndjson")
+    tag = etag(fp)
+    if _not_modified(request, tag):
+        return Response(status_code=304, headers={"ETag": tag})
+    if type or table or severity:
+        body = iter_ndjson(iter_records(fp, type, table, severity))
+    else:
+        body = iter_chunks(fp)
+    return StreamingResponse(body, media_type="application/x-ndjson", headers={"ETag": tag})
+
+
+@app.get("/dq/report/{run_id}/findings")
+def get_report_findings(
+    request: Request,
+    response: Response,
+    run_id: str,
+    table: Optional[List[str]] = Query(None),
+    severity: Optional[List[str]] = Query(None),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """One page of findings, e.g. `?severity=CRITICAL`; follow `next_offset`."""
+    _check(severity, SEVERITIES, "severity")
+    fp = _report_file(run_id, ".ndjson")
+    tag = etag(fp)
+    if _not_modified(request, tag):
+        return Response(status_code=304, headers={"ETag": tag})
+    items, next_offset = page_findings(fp, table, severity, offset, limit)
+    response.headers["ETag"] = tag
+    return {
+        "run_id": run_id,
+        "summary": read_header(fp),
+        "items": items,
+        "offset": offset,
+        "limit": limit,
+        "next_offset": next_offset,
+    }
+
 
 @app.get("/")
 def root():
-    return {"status": "ok", "docs": "/docs", "endpoints": ["/dq/run", "/dq/report/{run_id}"]}
+    return {
+        "status": "ok",
+        "docs": "/docs",
+        "endpoints": [
+            "/dq/run",
+            "/dq/runs/{run_id}",
+            "/dq/report/{run_id}",
+            "/dq/report/{run_id}/records",
+            "/dq/report/{run_id}/findings",
+            "/dq/cache",
+            "/metrics",
+        ],
+    }
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _num(value: float) -> str:
+    """Full-precision sample value; `:g` would round counters past 10^6."""
+    value = float(value)
+    return str(int(value)) if value.is_integer() and abs(value) < 2**53 else repr(value)
+
+
+def _family(
+    name: str, kind: str, help_text: str, samples: Iterable[Tuple[Labels, float]]
+) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{_labels(labels)} {_num(value)}" for labels, value in samples)
+    return lines
+
+
+class RunMetrics:
+    """
+    Aggregates finished run summaries for the /metrics endpoint: stage
+    wall time and query totals across runs, plus the last run's stages.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.runs: Dict[str, int] = {}
+        self.findings: Dict[str, int] = {}
+        self.stage_seconds: Dict[str, float] = {}
+        self.stage_count: Dict[str, int] = {}
+        self.stage_queries: Dict[str, int] = {}
+        self.query_seconds = 0.0
+        self.queries = 0
+        self.query_rows = 0
+        self.last_stages: Dict[str, float] = {}
+
+    def observe(
+        self, summary: Dict[str, Any], trace: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Fold one run summary and its trace (`Tracer.summary()`, default: the
+        summary's own "trace") into the totals; returns the summary unchanged.
+        """
+        trace = trace if trace is not None else summary.get("trace") or {}
+        target = str(summary.get("target", "unknown"))
+        with self._lock:
+            self.runs[target] = self.runs.get(target, 0) + 1
+            self.findings[target] = self.findings.get(target, 0) + int(
+                summary.get("findings_count", 0)
+            )
+            stages = trace.get("stages", {})
+            for name, st in stages.items():
+                self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + st["seconds"]
+                self.stage_count[name] = self.stage_count.get(name, 0) + st["count"]
+                self.stage_queries[name] = self.stage_queries.get(name, 0) + st["queries"]
+            q = trace.get("queries", {})
+            self.queries += int(q.get("count", 0))
+            self.query_seconds += float(q.get("seconds", 0.0))
+            self.query_rows += int(q.get("rows", 0))
+            if stages:
+                self.last_stages = {name: st["seconds"] for name, st in stages.items()}
+        return summary
+
+    def render(
+        self,
+        jobs: Optional[Dict[str, int]] = None,
+        cache: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            lines: List[str] = []
+            lines += _family(
+                "dqa_runs_total",
+                "counter",
+                "Completed DQ runs.",
+                [((("target", t),), n) for t, n in sorted(self.runs.items())],
+            )
+            lines += _family(
+                "dqa_findings_total",
+                "counter",
+                "Findings reported by completed runs.",
+                [((("target", t),), n) for t, n in sorted(self.findings.items())],
+            )
+            lines += [
+                "# HELP dqa_stage_seconds Wall time spent in pipeline stages across runs.",
+                "# TYPE dqa_stage_seconds summary",
+            ]
+            for name in sorted(self.stage_seconds):
+                label = _labels((("stage", name),))
+                lines.append(f"dqa_stage_seconds_sum{label} {_num(self.stage_seconds[name])}")
+                lines.append(f"dqa_stage_seconds_count{label} {_num(self.stage_count[name])}")
+            lines += _family(
+                "dqa_stage_queries_total",
+                "counter",
+                "Warehouse queries issued per stage.",
+                [((("stage", n),), c) for n, c in sorted(self.stage_queries.items())],
+            )
+            lines += _family(
+                "dqa_last_run_stage_seconds",
+                "gauge",
+                "Wall time per stage in the most recent completed run.",
+                [((("stage", n),), s) for n, s in sorted(self.last_stages.items())],
+            )
+            lines += _family(
+                "dqa_queries_total", "counter", "Warehouse queries issued.", [((), self.queries)]
+            )
+            lines += _family(
+                "dqa_query_seconds_total",
+                "counter",
+                "Time spent executing and fetching warehouse queries.",
+                [((), self.query_seconds)],
+            )
+            lines += _family(
+                "dqa_query_rows_total",
+                "counter",
+                "Rows fetched from the warehouse.",
+                [((), self.query_rows)],
+            )
+        if jobs is not None:
+            lines += _family(
+                "dqa_jobs",
+                "gauge",
+                "Tracked jobs by status.",
+                [((("status", s),), n) for s, n in sorted(jobs.items())],
+            )
+        if cache is not None:
+            for key in ("hits", "misses", "evictions"):
+                lines += _family(
+                    f"dqa_profile_cache_{key}_total",
+                    "counter",
+                    f"Profile cache {key}.",
+                    [((), cache.get(key, 0))],
+                )
+        return "\n".join(lines) + "\n"
+
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from dqa.utils.config import PATHS
+
+if TYPE_CHECKING:
+    from dqa.connectors.duckdb_conn import DuckDBConnector
+    from dqa.profiling.cache import ProfileCache
+    from dqa.profiling.registry import SpecRegistry
+
+
+class Worker:
+    """
+    Warehouse resources of one API process: a persistent connection, the
+    profile cache and the table registry, kept between runs.
+
+    Each is created on first use, so importing the app and answering `/`
+    load neither duckdb nor pandas; `warm()` creates them all up front.
+    The registry is reloaded when its YAML file changes.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        con: Optional["DuckDBConnector"] = None,
+        cache: Optional["ProfileCache"] = None,
+        cache_entries: int = 256,
+    ):
+        self.db_path = db_path
+        self.cache_entries = cache_entries
+        self._con = con
+        self._cache = cache
+        self._registry: Optional["SpecRegistry"] = None
+        self._registry_mtime: Optional[int] = None
+        self._lock = threading.RLock()
+
+    @property
+    def con(self) -> "DuckDBConnector":
+        with self._lock:
+            if self._con is None:
+                from dqa.connectors.duckdb_conn import DuckDBConnector, DuckDBSettings
+
+                self._con = DuckDBConnector(
+                    self.db_path, persistent=True, settings=DuckDBSettings.from_env()
+                )
+            return self._con
+
+    @property
+    def cache(self) -> "ProfileCache":
+        with self._lock:
+            if self._cache is None:
+                from dqa.profiling.cache import ProfileCache
+
+                self._cache = ProfileCache(self.con, max_entries=self.cache_entries)
+            return self._cache
+
+    @property
+    def registry(self) -> "SpecRegistry":
+        path = PATHS.table_registry
+        mtime = path.stat().st_mtime_ns if path.exists() else None
+        with self._lock:
+            if self._registry is None or mtime != self._registry_mtime:
+                from dqa.profiling.registry import default_registry
+
+                self._registry, self._registry_mtime = default_registry(self.con), mtime
+            return self._registry
+
+    def ensure_cache(self) -> None:
+        """Create the profile cache (and dq_profile_cache) if no run has yet."""
+        _ = self.cache
+
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Profile cache counters, or None before the cache is first used."""
+        return self._cache.stats.to_dict() if self._cache is not None else None
+
+    def warm(self) -> None:
+        """Open the connection and build every table spec now instead of on the first run."""
+        with self.con.connect() as c:
+            c.execute("SELECT 1;").fetchone()
+        self.ensure_cache()
+        self.registry.specs()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._con is not None:
+                self._con.close()
@@ -1,23 +1,140 @@
 from __future__ import annotations
 
+import os
+import threading
+import weakref
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import duckdb
 
+from dqa.utils.tracing import traced
+
+
+@dataclass(frozen=True)
+class DuckDBSettings:
+    threads: Optional[int] = None
+    memory_limit: Optional[str] = None  # e.g. "4GB"
+    temp_directory: Optional[str] = None
+
+    def as_config(self) -> Dict[str, str]:
+        out: Dict[str, str] = {}
+        if self.threads is not None:
+            out["threads"] = str(self.threads)
+        if self.memory_limit is not None:
+            out["memory_limit"] = self.memory_limit
+        if self.temp_directory is not None:
+            out["temp_directory"] = self.temp_directory
+        return out
+
+    @classmethod
+    def from_env(cls) -> "DuckDBSettings":
+        threads = os.environ.get("DQA_DUCKDB_THREADS")
+        return cls(
+            threads=int(threads) if threads else None,
+            memory_limit=os.environ.get("DQA_DUCKDB_MEMORY_LIMIT") or None,
+            temp_directory=os.environ.get("DQA_DUCKDB_TEMP_DIRECTORY") or None,
+        )
+
 
 class DuckDBConnector:
-    def __init__(self, db_path: Path):
+    """
+    Thin DuckDB access layer.
+
+    By default every statement opens and closes its own connection. With
+    `persistent=True` one database connection is kept open and `exec` /
+    `fetchdf` run on a cursor cached per thread (dropped with the thread);
+    `connect()` then hands out a fresh cursor the caller may close. `close()`
+    releases everything (the connection is reopened lazily on next use),
+    which also frees the file lock for other processes.
+
+    While a `dqa.utils.tracing` tracer is active, connections and cursors
+    come back wrapped so every statement's timing and row count is recorded.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        read_only: bool = False,
+        persistent: bool = False,
+        settings: Optional[DuckDBSettings] = None,
+    ):
         self.db_path = db_path
+        self.read_only = read_only
+        self.persistent = persistent
+        self.settings = settings or DuckDBSettings()
+        self._lock = threading.Lock()
+        self._root: Optional[duckdb.DuckDBPyConnection] = None
+        # (generation, cursor) per live thread
+        self._cursors: weakref.WeakKeyDictionary[
+            threading.Thread, Tuple[int, duckdb.DuckDBPyConnection]
+        ] = weakref.WeakKeyDictionary()
+        self._generation = 0
+
+    def _open(self) -> duckdb.DuckDBPyConnection:
+        if not self.read_only:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        return duckdb.connect(
+            str(self.db_path), read_only=self.read_only, config=self.settings.as_config()
+        )
+
+    def _root_connection(self) -> duckdb.DuckDBPyConnection:
+        with self._lock:
+            if self._root is None:
+                self._root = self._open()
+                self._generation += 1
+            return self._root
 
     def connect(self) -> duckdb.DuckDBPyConnection:
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        return duckdb.connect(str(self.db_path))
+        if self.persistent:
+            return traced(self._root_connection().cursor())
+        return traced(self._open())
+
+    def cursor(self) -> duckdb.DuckDBPyConnection:
+        """Per-thread cursor on the persistent connection."""
+        root = self._root_connection()
+        thread = threading.current_thread()
+        with self._lock:
+            generation, cur = self._cursors.get(thread, (None, None))
+            if cur is None or generation != self._generation:
+                cur = root.cursor()
+                self._cursors[thread] = (self._generation, cur)
+        return traced(cur)
 
     def exec(self, sql: str, params: Optional[tuple[Any, ...]] = None) -> None:
+        if self.persistent:
+            self.cursor().execute(sql, params or ())
+            return
         with self.connect() as con:
             con.execute(sql, params or ())
 
     def fetchdf(self, sql: str, params: Optional[tuple[Any, ...]] = None):
+        if self.persistent:
+            return self.cursor().execute(sql, params or ()).fetchdf()
         with self.connect() as con:
             return con.execute(sql, params or ()).fetchdf()
+
+    def for_profiling(self) -> "DuckDBConnector":
+        """
+        Connector for read-only profiling. DuckDB allows one configuration per
+        database file per process, so an already persistent connector is reused.
+        """
+        if self.read_only or self.persistent:
+            return self
+        return DuckDBConnector(self.db_path, read_only=True, settings=self.settings)
+
+    def close(self) -> None:
+        with self._lock:
+            for _, cur in list(self._cursors.values()):
+                cur.close()
+            self._cursors.clear()
+            if self._root is not None:
+                self._root.close()
+                self._root = None
+
+    def __enter__(self) -> "DuckDBConnector":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
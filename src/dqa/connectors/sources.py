@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Optional, Sequence
+
+import duckdb
+
+if TYPE_CHECKING:
+    from dqa.profiling.profiler import TableSpec
+
+SOURCE_KINDS = ("duckdb", "parquet", "csv")
+
+
+def _ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+@dataclass(frozen=True)
+class TableSource:
+    """
+    Where a spec's rows live when they are not a table of the warehouse.
+
+    "parquet" / "csv": a file or glob scanned in place with read_parquet /
+    read_csv, so DuckDB pushes projections and filters into the scan;
+    hive-style `key=value` directories become columns and filters on them
+    prune whole partitions. "duckdb": `table` (default: the spec name) of
+    another DuckDB file, ATTACHed read-only. `where` is an optional SQL
+    filter applied to the scan, e.g. to profile only recent partitions.
+    Nothing is copied into the warehouse.
+    """
+
+    kind: str
+    path: str
+    table: Optional[str] = None
+    hive_partitioning: bool = True
+    where: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.kind not in SOURCE_KINDS:
+            raise ValueError(f"kind must be one of {SOURCE_KINDS}, got {self.kind!r}")
+        if self.table is not None and self.kind != "duckdb":
+            raise ValueError("table is only used by duckdb sources")
+
+    @property
+    def alias(self) -> str:
+        """Catalog name an attached database is mounted under (stable per file)."""
+        digest = hashlib.sha1(os.path.abspath(self.path).encode("utf-8")).hexdigest()[:10]
+        return f"dq_src_{digest}"
+
+    def relation(self, name: str) -> str:
+        """SQL usable as a FROM item (no alias) reading this source."""
+        hive = "true" if self.hive_partitioning else "false"
+        if self.kind == "parquet":
+            scan = f"read_parquet({_literal(self.path)}, hive_partitioning = {hive})"
+        elif self.kind == "csv":
+            scan = f"read_csv({_literal(self.path)}, hive_partitioning = {hive})"
+        else:
+            scan = f"{_ident(self.alias)}.{_ident(self.table or name)}"
+        if self.where:
+            return f"(SELECT * FROM {scan} WHERE {self.where})"
+        return scan
+
+
+def attach_source(c: duckdb.DuckDBPyConnection, source: TableSource) -> None:
+    """ATTACH a duckdb source read-only; attachments are shared by every cursor."""
+    c.execute(
+        f"ATTACH IF NOT EXISTS {_literal(source.path)} AS {_ident(source.alias)} (READ_ONLY);"
+    )
+
+
+def relation_sql(c: duckdb.DuckDBPyConnection, table: str, spec: Optional["TableSpec"]) -> str:
+    """
+    FROM item for `table`: the scan of its spec's source (attaching the
+    source database first if needed), else the warehouse table itself.
+    """
+    source = spec.source if spec is not None else None
+    if source is None:
+        return table
+    if source.kind == "duckdb":
+        attach_source(c, source)
+    return source.relation(table)
+
+
+def spec_relations(
+    c: duckdb.DuckDBPyConnection, specs: Sequence["TableSpec"]
+) -> Dict[str, str]:
+    """relation_sql of every spec, by table name."""
+    return {s.name: relation_sql(c, s.name, s) for s in specs}
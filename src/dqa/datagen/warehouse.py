@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import duckdb
+
+from dqa.connectors.duckdb_conn import DuckDBConnector
+
+TABLES = ["dim_customers", "fact_orders", "fact_payments"]
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS dim_customers (
+  customer_id VARCHAR,
+  email_hash VARCHAR,
+  country VARCHAR,
+  created_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS fact_orders (
+  order_id VARCHAR,
+  customer_id VARCHAR,
+  order_ts TIMESTAMP,
+  status VARCHAR,
+  amount DOUBLE,
+  currency VARCHAR,
+  channel VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS fact_payments (
+  payment_id VARCHAR,
+  order_id VARCHAR,
+  payment_ts TIMESTAMP,
+  amount DOUBLE,
+  method VARCHAR,
+  status VARCHAR
+);
+
+CREATE TABLE IF NOT EXISTS dq_profiles (
+  snapshot_name VARCHAR,
+  table_name VARCHAR,
+  profile_json VARCHAR,
+  created_at TIMESTAMP,
+  schema_fingerprint VARCHAR,
+  version INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS dq_runs (
+  run_id VARCHAR,
+  snapshot_name VARCHAR,
+  created_at TIMESTAMP,
+  summary_json VARCHAR
+);
+"""
+
+# Rows per INSERT; each chunk is an independent slice of the order id range.
+DEFAULT_CHUNK_ROWS = 10_000_000
+
+# At scale 1: 2k customers and 8k orders (about 6k payments).
+CUSTOMERS_PER_SCALE = 2_000
+ORDERS_PER_SCALE = 8_000
+
+# Bad-day anomalies as per-row rates, so the mix is the same at any scale.
+BAD_DAY_RATES = {
+    "duplicate_orders": 30 / 8000,
+    "null_customer": 120 / 8030,
+    "usd_outlier": 25 / 8030,
+    "fk_break": 40 / 8030,
+    "orphan_payment": 10 / 6000,
+}
+
+
+@dataclass(frozen=True)
+class SeedConfig:
+    mode: str = "baseline"  # baseline | bad_day
+    scale: float = 1.0
+    seed: int = 7
+    chunk_rows: int = DEFAULT_CHUNK_ROWS
+
+    @property
+    def n_customers(self) -> int:
+        return max(1, int(round(CUSTOMERS_PER_SCALE * self.scale)))
+
+    @property
+    def n_orders(self) -> int:
+        return max(1, int(round(ORDERS_PER_SCALE * self.scale)))
+
+
+def _id_width(n: int, minimum: int) -> int:
+    # wide enough that the all-nines id used for FK breaks never exists
+    return max(minimum, len(str(n + 1)))
+
+
+def _u(i: str, salt: str, seed: int) -> str:
+    """Deterministic uniform [0, 1) per (row, salt, seed), from the top 53 bits of a hash."""
+    # an integer salt hashes about 2.5x faster than a VARCHAR one
+    key = zlib.crc32(f"{salt}:{seed}".encode())
+    return f"((hash({i}, {key}) >> 11)::DOUBLE / 9007199254740992.0)"
+
+
+def _normal(i: str, salt: str, seed: int) -> str:
+    """Standard normal via Box-Muller over two deterministic uniforms."""
+    u1 = _u(i, salt + "_1", seed)
+    u2 = _u(i, salt + "_2", seed)
+    return f"(sqrt(-2 * ln(1 - {u1})) * cos(2 * pi() * {u2}))"
+
+
+def _choice(u: str, values: List[str], p: List[float]) -> str:
+    arms: List[str] = []
+    acc = 0.0
+    for v, w in zip(values[:-1], p[:-1], strict=True):
+        acc += w
+        arms.append(f"WHEN {u} < {acc!r} THEN '{v}'")
+    return f"(CASE {' '.join(arms)} ELSE '{values[-1]}' END)"
+
+
+def _customers_sql(cfg: SeedConfig, lo: int, hi: int) -> str:
+    s = cfg.seed
+    w = _id_width(cfg.n_customers, 5)
+    country = _choice(
+        _u("i", "country", s), ["IN", "US", "SG", "AE", "UK"], [0.5, 0.2, 0.1, 0.1, 0.1]
+    )
+    return f"""
+    SELECT 'C' || lpad(i::VARCHAR, {w}, '0') AS customer_id,
+           'hash_' || i AS email_hash,
+           {country} AS country,
+           TIMESTAMP '2026-01-10 10:00:00'
+             - to_days((1 + floor({_u("i", "created", s)} * 59))::INTEGER) AS created_at
+    FROM range({lo}, {hi}) r(i)
+    """
+
+
+def _orders_base_sql(cfg: SeedConfig, lo: int, hi: int) -> str:
+    """Baseline orders with the order index `_i` kept for deriving payments and anomalies."""
+    s = cfg.seed
+    cw = _id_width(cfg.n_customers, 5)
+    ow = _id_width(cfg.n_orders, 6)
+    z = _normal("i", "amount", s)
+    status = _choice(
+        _u("i", "status", s),
+        ["PLACED", "PAID", "CANCELLED", "REFUNDED"],
+        [0.1, 0.75, 0.1, 0.05],
+    )
+    return f"""
+    SELECT i AS _i,
+           'O' || lpad(i::VARCHAR, {ow}, '0') AS order_id,
+           'C' || lpad((1 + floor({_u("i", "customer", s)} * {cfg.n_customers}))::BIGINT::VARCHAR,
+                       {cw}, '0') AS customer_id,
+           TIMESTAMP '2026-01-10 10:00:00'
+             + to_minutes(floor({_u("i", "order_ts", s)} * 1440)::BIGINT) AS order_ts,
+           {status} AS status,
+           CASE WHEN {_u("i", "currency", s)} < 0.7
+                THEN least(greatest(1500 + 700 * {z}, 50), 15000)
+                ELSE least(greatest(40 + 25 * {z}, 1), 500) END AS amount,
+           CASE WHEN {_u("i", "currency", s)} < 0.7 THEN 'INR' ELSE 'USD' END AS currency,
+           {_choice(_u("i", "channel", s), ["shopify", "amazon"], [0.65, 0.35])} AS channel
+    FROM range({lo}, {hi}) r(i)
+    """
+
+
+def _orders_sql(cfg: SeedConfig, lo: int, hi: int) -> str:
+    base = _orders_base_sql(cfg, lo, hi)
+    if cfg.mode != "bad_day":
+        return (
+            f"SELECT order_id, customer_id, order_ts, status, amount, currency, channel "
+            f"FROM ({base})"
+        )
+    s, r = cfg.seed, BAD_DAY_RATES
+    missing = "C" + "9" * _id_width(cfg.n_customers, 5)
+    outlier = f"{_u('_i', 'outlier', s)} < {r['usd_outlier']!r}"
+    # duplicated rows go through the same per-row rules as their originals
+    return f"""
+    SELECT order_id,
+           CASE WHEN {_u("_i", "fk", s)} < {r["fk_break"]!r} THEN '{missing}'
+                WHEN {_u("_i", "null", s)} < {r["null_customer"]!r} THEN NULL
+                ELSE customer_id END AS customer_id,
+           order_ts,
+           status,
+           CASE WHEN {outlier} THEN amount * 300 ELSE amount END AS amount,
+           CASE WHEN {outlier} THEN 'USD' ELSE currency END AS currency,
+           channel
+    FROM (
+      SELECT *,
+             unnest(CASE WHEN {_u("_i", "dup", s)} < {r["duplicate_orders"]!r}
+                         THEN [0, 1] ELSE [0] END) AS _copy
+      FROM ({base})
+    )
+    """
+
+
+def _payments_sql(cfg: SeedConfig, lo: int, hi: int) -> str:
+    s = cfg.seed
+    pw = _id_width(cfg.n_orders, 7)
+    method = _choice(
+        _u("_i", "method", s), ["card", "upi", "netbanking", "wallet"], [0.55, 0.25, 0.12, 0.08]
+    )
+    pay_status = _choice(_u("_i", "pay_status", s), ["SUCCESS", "FAILED"], [0.98, 0.02])
+    order_id = "order_id"
+    copies = "[0]"
+    if cfg.mode == "bad_day":
+        orphan = f"{_u('_i', 'orphan', s)} < {BAD_DAY_RATES['orphan_payment']!r}"
+        missing = "O" + "9" * _id_width(cfg.n_orders, 6)
+        # an orphan is an extra copy of a payment pointing at a missing order
+        copies = f"CASE WHEN {orphan} THEN [0, 1] ELSE [0] END"
+        order_id = f"CASE WHEN _copy = 1 THEN '{missing}' ELSE order_id END"
+    return f"""
+    SELECT 'P' || lpad(_i::VARCHAR, {pw}, '0') AS payment_id,
+           {order_id} AS order_id,
+           order_ts + to_minutes((1 + floor({_u("_i", "pay_ts", s)} * 19))::BIGINT) AS payment_ts,
+           amount,
+           {method} AS method,
+           {pay_status} AS status
+    FROM (
+      SELECT *, unnest({copies}) AS _copy
+      FROM ({_orders_base_sql(cfg, lo, hi)})
+      WHERE status IN ('PAID', 'REFUNDED') AND {_u("_i", "paid", s)} < 0.95
+    )
+    """
+
+
+def _chunks(lo: int, hi: int, size: int) -> List[Tuple[int, int]]:
+    size = max(1, int(size))
+    return [(a, min(a + size, hi)) for a in range(lo, hi, size)]
+
+
+def reset_tables(c: duckdb.DuckDBPyConnection) -> None:
+    for t in TABLES:
+        c.execute(f"DROP TABLE IF EXISTS {t};")
+    # dq_profile*, dq_runs and dq_metric_* are kept: stored baselines (keyed by schema
+    # fingerprint), run history and metric time series outlive reseeds
+    # incremental sketches describe the data being replaced
+    c.execute("DROP TABLE IF EXISTS dq_partition_stats;")
+    c.execute("DROP TABLE IF EXISTS dq_watermarks;")
+    c.execute(SCHEMA_SQL)
+
+
+def seed_warehouse(
+    con: DuckDBConnector,
+    mode: str = "baseline",
+    scale: float = 1.0,
+    seed: int = 7,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    progress: Optional[Callable[[int, int, float], None]] = None,
+) -> Dict[str, int]:
+    """
+    Regenerate the e-commerce tables in place, vectorized inside DuckDB.
+
+    Every value is a pure function of (row index, column, seed), so output
+    is deterministic for a given DuckDB version and identical however the
+    order range is chunked. "bad_day" applies the BAD_DAY_RATES anomalies
+    on top of the same baseline rows. Chunks are committed one by one so
+    100M+ row tables never sit in a single transaction. `progress` gets
+    (orders done, orders total, chunk seconds). Returns row counts per table.
+    """
+    if mode not in ("baseline", "bad_day"):
+        raise ValueError(f"mode must be baseline or bad_day, got {mode!r}")
+    cfg = SeedConfig(mode=mode, scale=scale, seed=seed, chunk_rows=chunk_rows)
+    with con.connect() as c:
+        reset_tables(c)
+        for lo, hi in _chunks(1, cfg.n_customers + 1, cfg.chunk_rows):
+            c.execute(f"INSERT INTO dim_customers {_customers_sql(cfg, lo, hi)};")
+        for lo, hi in _chunks(1, cfg.n_orders + 1, cfg.chunk_rows):
+            t0 = time.perf_counter()
+            c.execute(f"INSERT INTO fact_orders {_orders_sql(cfg, lo, hi)};")
+            c.execute(f"INSERT INTO fact_payments {_payments_sql(cfg, lo, hi)};")
+            if progress is not None:
+                progress(hi - 1, cfg.n_orders, time.perf_counter() - t0)
+        return {
+            t: int(c.execute(f"SELECT count(*) FROM {t};").fetchone()[0]) for t in TABLES
+        }
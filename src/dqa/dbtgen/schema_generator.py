@@ -1,24 +1,61 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
 import yaml
 
 from dqa.anomaly.detector import Finding
 from dqa.profiling.profiler import E_COMMERCE_SPECS
 
+if TYPE_CHECKING:
+    from dqa.profiling.registry import SpecRegistry
+
+# libyaml's loader/dumper are several times faster than the pure-Python ones
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_Dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# single-file schema written before per-model files; migrated on first write
+LEGACY_SCHEMA = "schema.yml"
+# per-model hashes of the last generated model and written file
+STATE_FILE = ".dq_schema_state.json"
+
+# Arguments that tell two instances of a test apart. A new accepted_range
+# replaces the column's old one instead of stacking a second range.
+_IDENTITY_ARGS: Dict[str, Tuple[str, ...]] = {
+    "accepted_range": (),
+    "relationships": ("to", "field"),
+    "dbt_utils.unique_combination_of_columns": ("combination_of_columns",),
+}
 
-def _spec_for_table(table: str):
-    for s in E_COMMERCE_SPECS:
-        if s.name == table:
-            return s
-    return None
+
+_BUILTIN_SPECS = {s.name: s for s in E_COMMERCE_SPECS}
+
+
+def _add_key_test(
+    key: List[str], columns_map: Dict[str, List[Any]], table_tests: List[Any]
+) -> None:
+    """`unique` on a single-column key, a dbt_utils combination test on a composite one."""
+    if len(key) == 1:
+        columns_map.setdefault(key[0], []).append("unique")
+    else:
+        table_tests.append(
+            {"dbt_utils.unique_combination_of_columns": {"combination_of_columns": key}}
+        )
 
 
-def generate_dbt_schema(findings: List[Finding]) -> Dict[str, Any]:
+def generate_dbt_schema(
+    findings: List[Finding], registry: Optional["SpecRegistry"] = None
+) -> Dict[str, Any]:
     """
     Turn anomaly findings into a dbt schema.yml structure.
     This is intentionally practical for a POC: minimal, readable tests.
+    Specs are looked up in `registry` (default: the built-in e-commerce specs).
     """
+    lookup = registry.get if registry is not None else _BUILTIN_SPECS.get
     grouped: Dict[str, List[Finding]] = {}
     for f in findings:
         grouped.setdefault(f.table, []).append(f)
@@ -26,20 +63,17 @@ def generate_dbt_schema(findings: List[Finding]) -> Dict[str, Any]:
     models = []
 
     for table, flist in grouped.items():
-        spec = _spec_for_table(table)
+        spec = lookup(table)
 
-        # Table-level tests
+        # Key tests: `unique` on single-column keys, one dbt_utils
+        # combination test per composite key
         table_tests: List[Any] = []
-        if spec:
-            # Use dbt_utils if available in real projects; okay for POC visibility.
-            for k in spec.key_columns:
-                table_tests.append(
-                    {"dbt_utils.unique_combination_of_columns": {"combination_of_columns": [k]}}
-                )
-
-        # Column-level tests
         columns_map: Dict[str, List[Any]] = {}
 
+        if spec:
+            for k in spec.keys:
+                _add_key_test(list(k), columns_map, table_tests)
+
         for f in flist:
             if f.kind == "NULL_SPIKE":
                 col = f.details["column"]
@@ -62,17 +96,16 @@ def generate_dbt_schema(findings: List[Finding]) -> Dict[str, Any]:
                 )
 
             if f.kind == "DUPLICATE_KEY":
-                # if duplicates detected, also add per-column unique to be explicit
-                col = f.details["column"]
-                columns_map.setdefault(col, []).append("unique")
+                key = list(f.details.get("columns") or [f.details["column"]])
+                _add_key_test(key, columns_map, table_tests)
 
-        columns = [{"name": c, "tests": tests} for c, tests in columns_map.items()]
+        columns = [{"name": c, "tests": _dedupe(tests)} for c, tests in columns_map.items()]
 
         models.append(
             {
                 "name": table,
                 "description": f"Auto-generated DQ tests for {table}",
-                "tests": table_tests,
+                "tests": _dedupe(table_tests),
                 "columns": columns,
             }
         )
@@ -80,7 +113,114 @@ def generate_dbt_schema(findings: List[Finding]) -> Dict[str, Any]:
     return {"version": 2, "models": models}
 
 
-def write_schema_yml(schema: Dict[str, Any], out_path) -> None:
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(out_path, "w", encoding="utf-8") as f:
-        yaml.safe_dump(schema, f, sort_keys=False, allow_unicode=True)
+def _test_key(test: Any) -> str:
+    if isinstance(test, str):
+        return test
+    name, args = next(iter(test.items()))
+    fields = _IDENTITY_ARGS.get(name)
+    if fields is not None and isinstance(args, dict):
+        args = {k: args.get(k) for k in fields}
+    return json.dumps([name, args], sort_keys=True, default=str)
+
+
+def _dedupe(tests: List[Any]) -> List[Any]:
+    return _merge_tests([], tests)
+
+
+def _merge_tests(existing: List[Any], new: List[Any]) -> List[Any]:
+    """Existing tests in order; a new test replaces its equal, others are appended."""
+    out = list(existing)
+    index = {_test_key(t): i for i, t in enumerate(out)}
+    for t in new:
+        key = _test_key(t)
+        if key in index:
+            out[index[key]] = t
+        else:
+            index[key] = len(out)
+            out.append(t)
+    return out
+
+
+def merge_model(existing: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge a generated model into its stored version: tests and columns
+    already there are kept (hand-written ones included), new ones added.
+    """
+    out = dict(existing)
+    out.setdefault("description", new.get("description"))
+    out["tests"] = _merge_tests(existing.get("tests") or [], new.get("tests") or [])
+    columns = [dict(c) for c in existing.get("columns") or []]
+    by_name = {c["name"]: c for c in columns}
+    for col in new.get("columns") or []:
+        if col["name"] in by_name:
+            old = by_name[col["name"]]
+            old["tests"] = _merge_tests(old.get("tests") or [], col.get("tests") or [])
+        else:
+            columns.append(dict(col))
+    out["columns"] = columns
+    return out
+
+
+def _dump(doc: Dict[str, Any]) -> str:
+    return yaml.dump(doc, Dumper=_Dumper, sort_keys=False, allow_unicode=True)
+
+
+def _load(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        return yaml.load(f, Loader=_Loader)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def write_schema_files(schema: Dict[str, Any], models_dir: Path) -> List[Path]:
+    """
+    Merge `schema` into one `<model>.yml` per model under `models_dir`.
+
+    Only models in `schema` are touched. A small state file keeps, per
+    model, the hash of the last generated model and of the file written;
+    when both still match, the file is skipped without parsing it, and a
+    merged file is only rewritten when its content hash changed. Models
+    from a legacy single `schema.yml` are moved into their own files first
+    (dbt rejects a model defined twice). Returns the paths written.
+    """
+    models_dir.mkdir(parents=True, exist_ok=True)
+    state_path = models_dir / STATE_FILE
+    state: Dict[str, Dict[str, str]] = (
+        json.loads(state_path.read_text(encoding="utf-8")) if state_path.exists() else {}
+    )
+    legacy_path = models_dir / LEGACY_SCHEMA
+    legacy = {m["name"]: m for m in (_load(legacy_path) or {}).get("models") or []}
+    generated = {m["name"]: m for m in schema.get("models") or []}
+
+    written: List[Path] = []
+    for name in list(legacy) + [n for n in generated if n not in legacy]:
+        path = models_dir / f"{name}.yml"
+        current = path.read_text(encoding="utf-8") if path.exists() else None
+        file_hash = _digest(current) if current is not None else None
+        gen_hash = _digest(json.dumps(generated.get(name), sort_keys=True, default=str))
+        seen = state.get(name, {})
+        if name not in legacy and seen == {"generated": gen_hash, "file": file_hash}:
+            continue
+
+        stored = yaml.load(current, Loader=_Loader) if current else None
+        model = (stored.get("models") or [{}])[0] if stored else {}
+        for source in (legacy, generated):
+            if name in source:
+                model = merge_model(model, source[name]) if model else source[name]
+        text = _dump({"version": schema.get("version", 2), "models": [model]})
+        state[name] = {"generated": gen_hash, "file": _digest(text)}
+        if state[name]["file"] == file_hash:
+            continue
+        tmp = path.with_suffix(".yml.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+        written.append(path)
+
+    state_path.write_text(json.dumps(state, indent=1, sort_keys=True), encoding="utf-8")
+    if legacy_path.exists():
+        legacy_path.unlink()
+    return written
@@ -0,0 +1,386 @@
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import statistics
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.connectors.sources import relation_sql
+from dqa.profiling.sql_profiler import describe_columns
+
+if TYPE_CHECKING:
+    from dqa.profiling.profiler import TableSpec
+
+# Bump when the profile dict layout changes so old baselines stop matching.
+PROFILE_FORMAT_VERSION = 1
+
+BASELINE_SNAPSHOT = "baseline"
+
+# dq_profiles indexes the stored versions; their values live in dq_profile_metrics,
+# one row per profile leaf (profile_json is only set on rows from older releases).
+# `run_id` marks the profiles of a pipeline run, which the metric history reads.
+PROFILE_STORE_SQL = """
+CREATE TABLE IF NOT EXISTS dq_profiles (
+  snapshot_name VARCHAR,
+  table_name VARCHAR,
+  profile_json VARCHAR,
+  created_at TIMESTAMP,
+  schema_fingerprint VARCHAR,
+  version INTEGER
+);
+ALTER TABLE dq_profiles ADD COLUMN IF NOT EXISTS schema_fingerprint VARCHAR;
+ALTER TABLE dq_profiles ADD COLUMN IF NOT EXISTS version INTEGER;
+ALTER TABLE dq_profiles ADD COLUMN IF NOT EXISTS run_id VARCHAR;
+CREATE TABLE IF NOT EXISTS dq_profile_metrics (
+  snapshot_name VARCHAR,
+  table_name VARCHAR,
+  version INTEGER,
+  created_at TIMESTAMP,
+  ordinal INTEGER,
+  metric VARCHAR,
+  column_name VARCHAR,
+  field VARCHAR,
+  value DOUBLE,
+  dtype VARCHAR,
+  value_json VARCHAR
+);
+ALTER TABLE dq_profile_metrics ADD COLUMN IF NOT EXISTS run_id VARCHAR;
+"""
+
+_METRIC_COLUMNS = (
+    "snapshot_name",
+    "table_name",
+    "version",
+    "created_at",
+    "ordinal",
+    "metric",
+    "column_name",
+    "field",
+    "value",
+    "dtype",
+    "value_json",
+    "run_id",
+)
+
+# (metric, column, field, value, dtype, value_json)
+Leaf = Tuple[str, str, str, Optional[float], str, Optional[str]]
+
+
+def ensure_profile_store(c: duckdb.DuckDBPyConnection) -> None:
+    c.execute(PROFILE_STORE_SQL)
+    if c.execute("SELECT count(*) FROM dq_profiles WHERE profile_json IS NOT NULL;").fetchone()[0]:
+        _migrate_json_profiles(c)
+
+
+def _leaf(metric: str, column: str, field: str, v: Any) -> Leaf:
+    if isinstance(v, bool) or not isinstance(v, (int, float)):
+        return metric, column, field, None, "json", json.dumps(v, ensure_ascii=False)
+    return metric, column, field, float(v), "int" if isinstance(v, int) else "float", None
+
+
+def flatten_profile(profile: Dict[str, Any]) -> List[Leaf]:
+    """
+    Long-format rows of a profile: `metric` is the top-level key (e.g.
+    null_rates), `column_name` the second level (usually a column) and
+    `field` the third (e.g. p99). Numbers go to `value`; anything else, or
+    nested deeper, is kept as JSON in `value_json`.
+    """
+    out: List[Leaf] = []
+    for metric, v in profile.items():
+        if not isinstance(v, dict) or not v:
+            out.append(_leaf(metric, "", "", v))
+            continue
+        for column, x in v.items():
+            if not isinstance(x, dict) or not x:
+                out.append(_leaf(metric, column, "", x))
+                continue
+            out.extend(_leaf(metric, column, field, y) for field, y in x.items())
+    return out
+
+
+def _unflatten(rows: Sequence[Tuple[str, str, str, Any, str, Any]]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for metric, column, field, value, dtype, value_json in rows:
+        if dtype == "json":
+            v = json.loads(value_json)
+        elif dtype == "int":
+            v = int(value)
+        else:
+            # DuckDB stores NaN from pandas as NULL
+            v = float("nan") if value is None or value != value else float(value)
+        if not column:
+            out[metric] = v
+        elif not field:
+            out.setdefault(metric, {})[column] = v
+        else:
+            out.setdefault(metric, {}).setdefault(column, {})[field] = v
+    return out
+
+
+def _insert_metrics(c: duckdb.DuckDBPyConnection, cols: Dict[str, Any]) -> None:
+    """
+    Bulk-append long-format rows through an Arrow table when pyarrow is
+    installed (a pandas frame otherwise); DuckDB scans either without a
+    per-row round trip.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        frame: Any = pd.DataFrame(cols)
+    else:
+        frame = pa.table(cols)
+    c.register("_dq_profile_rows", frame)
+    try:
+        c.execute(
+            f"INSERT INTO dq_profile_metrics ({', '.join(_METRIC_COLUMNS)}) "
+            f"SELECT {', '.join(_METRIC_COLUMNS)} FROM _dq_profile_rows;"
+        )
+    finally:
+        c.unregister("_dq_profile_rows")
+
+
+def _metric_columns(
+    entries: Sequence[Tuple[str, str, int, Any, Dict[str, Any]]],
+    run_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Columnar rows for (snapshot, table, version, created_at, profile) entries."""
+    cols: Dict[str, List[Any]] = {k: [] for k in _METRIC_COLUMNS}
+    for snapshot_name, table, version, created_at, prof in entries:
+        leaves = flatten_profile(prof)
+        n = len(leaves)
+        cols["snapshot_name"] += [snapshot_name] * n
+        cols["table_name"] += [table] * n
+        cols["version"] += [version] * n
+        cols["created_at"] += [created_at] * n
+        cols["ordinal"] += range(n)
+        fields = zip(*leaves, strict=True) if leaves else [()] * 6
+        for name, values in zip(_METRIC_COLUMNS[5:-1], fields, strict=True):
+            cols[name] += values
+        cols["run_id"] += [run_id] * n
+    out: Dict[str, Any] = dict(cols)
+    out["version"] = np.asarray(cols["version"], dtype=np.int32)
+    out["ordinal"] = np.asarray(cols["ordinal"], dtype=np.int32)
+    out["value"] = np.asarray(
+        [np.nan if v is None else v for v in cols["value"]], dtype=np.float64
+    )
+    out["created_at"] = pd.to_datetime(pd.Series(cols["created_at"], dtype=object)).to_numpy(
+        dtype="datetime64[us]"
+    )
+    return out
+
+
+def _migrate_json_profiles(c: duckdb.DuckDBPyConnection) -> None:
+    """Move profile_json rows written by older releases into dq_profile_metrics."""
+    rows = c.execute(
+        "SELECT rowid, snapshot_name, table_name, created_at, version, profile_json "
+        "FROM dq_profiles ORDER BY snapshot_name, table_name, version NULLS FIRST, created_at;"
+    ).fetchall()
+    latest: Dict[Tuple[str, str], int] = {}
+    entries, updates = [], []
+    for rowid, snapshot_name, table, created_at, version, payload in rows:
+        key = (snapshot_name, table)
+        version = version if version is not None else latest.get(key, 0) + 1
+        latest[key] = max(latest.get(key, 0), version)
+        if payload is not None:
+            entries.append((snapshot_name, table, version, created_at, json.loads(payload)))
+            updates.append((version, rowid))
+    _insert_metrics(c, _metric_columns(entries))
+    c.executemany(
+        "UPDATE dq_profiles SET profile_json = NULL, version = ? WHERE rowid = ?;", updates
+    )
+
+
+def schema_fingerprint(c: duckdb.DuckDBPyConnection, spec: "TableSpec") -> str:
+    """Hash of the table's column names/types, its spec and the profile format."""
+    payload = {
+        "format": PROFILE_FORMAT_VERSION,
+        "columns": sorted(describe_columns(c, relation_sql(c, spec.name, spec)).items()),
+        "keys": list(spec.key_columns),
+        "ts": list(spec.ts_columns),
+        "fk": sorted((k, list(v)) for k, v in spec.fk.items()),
+    }
+    # only when set, so fingerprints of plain specs (and their baselines) stay valid
+    if spec.column_policies or spec.default_policy != "full":
+        payload["policies"] = [spec.default_policy, sorted(spec.column_policies.items())]
+    if spec.sampling is not None:
+        payload["sampling"] = dataclasses.asdict(spec.sampling)
+    if spec.source is not None:
+        payload["source"] = dataclasses.asdict(spec.source)
+    if spec.composite_keys:
+        payload["composite_keys"] = [list(k) for k in spec.composite_keys]
+    raw = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:16]
+
+
+def table_fingerprints(con: DuckDBConnector, specs: Sequence["TableSpec"]) -> Dict[str, str]:
+    """Fingerprints of the spec tables that currently exist (sources are assumed to)."""
+    out: Dict[str, str] = {}
+    with con.connect() as c:
+        existing = {r[0] for r in c.execute("SELECT table_name FROM duckdb_tables();").fetchall()}
+        for s in specs:
+            if s.name in existing or s.source is not None:
+                out[s.name] = schema_fingerprint(c, s)
+    return out
+
+
+def save_profiles(
+    con: DuckDBConnector,
+    snapshot_name: str,
+    profiles: Dict[str, Dict[str, Any]],
+    fingerprints: Dict[str, str],
+    run_id: Optional[str] = None,
+    created_at: Optional[datetime] = None,
+) -> None:
+    """
+    Append a new version of each table's profile under `snapshot_name`,
+    created now unless `created_at` is given. Profiles saved with a
+    `run_id` are that run's points in the metric history.
+    """
+    if not profiles:
+        return
+    with con.connect() as c:
+        ensure_profile_store(c)
+        current = dict(
+            c.execute(
+                "SELECT table_name, max(version) FROM dq_profiles "
+                "WHERE snapshot_name = ? GROUP BY table_name;",
+                (snapshot_name,),
+            ).fetchall()
+        )
+        if created_at is None:
+            created_at = c.execute("SELECT NOW()::TIMESTAMP;").fetchone()[0]
+        versions = {t: int(current.get(t) or 0) + 1 for t in profiles}
+        c.executemany(
+            "INSERT INTO dq_profiles "
+            "(snapshot_name, table_name, created_at, schema_fingerprint, version, run_id) "
+            "VALUES (?, ?, ?, ?, ?, ?);",
+            [
+                (snapshot_name, t, created_at, fingerprints.get(t), versions[t], run_id)
+                for t in profiles
+            ],
+        )
+        _insert_metrics(
+            c,
+            _metric_columns(
+                [(snapshot_name, t, versions[t], created_at, p) for t, p in profiles.items()],
+                run_id,
+            ),
+        )
+
+
+def load_profiles(
+    con: DuckDBConnector,
+    snapshot_name: str,
+    fingerprints: Dict[str, str] | None = None,
+    window: int = 1,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the latest profile per table in one query. With `fingerprints`,
+    only versions matching the table's current schema fingerprint count.
+    With `window > 1` the last `window` versions are combined into a
+    rolling median (see `median_profile`).
+    """
+    with con.connect() as c:
+        ensure_profile_store(c)
+        sql = "WITH picked AS (SELECT table_name, version FROM dq_profiles WHERE snapshot_name = ? "
+        params: List[Any] = [snapshot_name]
+        if fingerprints is not None:
+            if not fingerprints:
+                return {}
+            sql += "AND (table_name, schema_fingerprint) IN (SELECT * FROM (VALUES "
+            sql += ", ".join("(?, ?)" for _ in fingerprints) + ")) "
+            for table, fp in fingerprints.items():
+                params += [table, fp]
+        sql += (
+            "QUALIFY row_number() OVER (PARTITION BY table_name "
+            "ORDER BY version DESC NULLS LAST, created_at DESC) <= ?) "
+            "SELECT m.table_name, m.version, m.metric, m.column_name, m.field, m.value, "
+            "m.dtype, m.value_json FROM dq_profile_metrics m JOIN picked p "
+            "ON m.table_name = p.table_name AND m.version = p.version "
+            "WHERE m.snapshot_name = ? ORDER BY m.table_name, m.version DESC, m.ordinal;"
+        )
+        params += [max(1, int(window)), snapshot_name]
+        rows = c.execute(sql, params).fetchall()
+
+    history: Dict[str, List[Dict[str, Any]]] = {}
+    start = 0
+    for i in range(1, len(rows) + 1):
+        if i == len(rows) or rows[i][:2] != rows[start][:2]:
+            table = str(rows[start][0])
+            history.setdefault(table, []).append(_unflatten([r[2:] for r in rows[start:i]]))
+            start = i
+    return {t: (h[0] if len(h) == 1 else median_profile(h)) for t, h in history.items()}
+
+
+def load_metric_history(
+    con: DuckDBConnector,
+    table: str,
+    metric: str,
+    column: str = "",
+    field: str = "",
+    snapshot_name: Optional[str] = None,
+    days: int = 90,
+) -> pd.DataFrame:
+    """
+    Stored values of one profile leaf (e.g. numeric_stats/amount/p99) over
+    the last `days` days, oldest first, in one query.
+    """
+    sql = (
+        "SELECT snapshot_name, version, created_at, value FROM dq_profile_metrics "
+        "WHERE table_name = ? AND metric = ? AND column_name = ? AND field = ? "
+        "AND created_at >= NOW()::TIMESTAMP - to_days(CAST(? AS INTEGER)) "
+    )
+    params: List[Any] = [table, metric, column, field, days]
+    if snapshot_name is not None:
+        sql += "AND snapshot_name = ? "
+        params.append(snapshot_name)
+    with con.connect() as c:
+        ensure_profile_store(c)
+        return c.execute(sql + "ORDER BY created_at, version;", params).fetchdf()
+
+
+def export_profiles_parquet(
+    con: DuckDBConnector, out_dir: Path, snapshot_name: Optional[str] = None
+) -> Path:
+    """
+    Write dq_profile_metrics to `out_dir` as Parquet, hive-partitioned by
+    profile_date=YYYY-MM-DD; existing partition files are overwritten.
+    """
+    where = ""
+    if snapshot_name is not None:
+        where = "WHERE snapshot_name = '" + snapshot_name.replace("'", "''") + "' "
+    target = str(out_dir).replace("'", "''")
+    with con.connect() as c:
+        ensure_profile_store(c)
+        c.execute(
+            "COPY (SELECT *, CAST(created_at AS DATE) AS profile_date FROM dq_profile_metrics "
+            f"{where}ORDER BY created_at, table_name, ordinal) "
+            f"TO '{target}' (FORMAT PARQUET, PARTITION_BY (profile_date), OVERWRITE_OR_IGNORE);"
+        )
+    return out_dir
+
+
+def median_profile(profiles: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine profiles newest-first: numeric leaves become the median across
+    profiles that have them, everything else is taken from the newest.
+    """
+    latest = profiles[0]
+    if isinstance(latest, dict):
+        out: Dict[str, Any] = {}
+        for k in latest:
+            out[k] = median_profile([p[k] for p in profiles if isinstance(p, dict) and k in p])
+        return out
+    if isinstance(latest, (int, float)) and not isinstance(latest, bool):
+        nums = [p for p in profiles if isinstance(p, (int, float)) and not isinstance(p, bool)]
+        med = statistics.median(nums)
+        return int(med) if isinstance(latest, int) and float(med).is_integer() else float(med)
+    return latest
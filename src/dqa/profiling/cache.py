@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+import duckdb
+
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.connectors.sources import spec_relations
+from dqa.profiling.baseline_store import schema_fingerprint
+from dqa.profiling.parallel import ParallelConfig, profile_tables_parallel
+from dqa.profiling.sql_profiler import _q, describe_columns
+from dqa.utils.tracing import span
+
+if TYPE_CHECKING:
+    from dqa.profiling.profiler import TableSpec
+
+# Tables up to this many rows get a full-content checksum; larger ones a
+# checksum over a block sample, which reads about CHECKSUM_SAMPLE_PERCENT of them.
+FULL_CHECKSUM_ROWS = 1_000_000
+CHECKSUM_SAMPLE_PERCENT = 1
+_SAMPLE_SEED = 42
+
+PROFILE_CACHE_SQL = """
+CREATE TABLE IF NOT EXISTS dq_profile_cache (
+  cache_key VARCHAR PRIMARY KEY,
+  table_name VARCHAR,
+  profile_json VARCHAR,
+  created_at TIMESTAMP,
+  last_hit_at TIMESTAMP,
+  hits INTEGER
+);
+"""
+
+
+def content_fingerprint(
+    c: duckdb.DuckDBPyConnection, table: str, ts_columns: Sequence[str] = ()
+) -> Dict[str, Any]:
+    """
+    Cheap description of a table's contents: row count, max of each ts
+    column and a checksum of row hashes (sampled for large tables).
+    """
+    columns = list(describe_columns(c, table))
+    ts = [x for x in ts_columns if x in columns]
+    row = c.execute(
+        f"SELECT count(*){''.join(f', max({_q(x)})::VARCHAR' for x in ts)} FROM {table};"
+    ).fetchone()
+    rows = int(row[0])
+    checksum = f"sum(hash({', '.join(_q(x) for x in columns)}))::VARCHAR"
+    sql = f"SELECT {checksum} FROM {table}"
+    if rows > FULL_CHECKSUM_ROWS:
+        sql += f" USING SAMPLE {CHECKSUM_SAMPLE_PERCENT} PERCENT (system, {_SAMPLE_SEED})"
+    return {
+        "rows": rows,
+        "max_ts": dict(zip(ts, row[1:], strict=True)),
+        "checksum": c.execute(sql + ";").fetchone()[0],
+        "sampled": rows > FULL_CHECKSUM_ROWS,
+    }
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    lookup_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+            "lookup_seconds": round(self.lookup_seconds, 4),
+        }
+
+
+class ProfileCache:
+    """
+    Profile cache stored in the warehouse (dq_profile_cache).
+
+    Entries are keyed by the table's schema fingerprint (spec and profile
+    format included), the profiling engine/accuracy, and the content
+    fingerprints of the table and of every table its FKs reference, so a
+    changed dimension also invalidates its facts. Entries older than
+    `ttl_seconds` are dropped; beyond `max_entries` the least recently hit
+    go first. Hit/miss counters accumulate in `stats`.
+    """
+
+    def __init__(
+        self,
+        con: DuckDBConnector,
+        max_entries: int = 256,
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+    ):
+        self.con = con
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def keys(
+        self, specs: Sequence["TableSpec"], engine: str = "sql", accuracy: str = "exact"
+    ) -> Dict[str, str]:
+        """Cache key per spec table, fingerprinting each involved table once."""
+        ts_columns = {s.name: s.ts_columns for s in specs}
+        with self.con.connect() as c:
+            tables = c.execute("SELECT table_name FROM duckdb_tables();").fetchall()
+            relations = {r[0]: r[0] for r in tables}
+            # sourced specs are read where they live (and shadow same-named tables)
+            relations.update(spec_relations(c, [s for s in specs if s.source is not None]))
+            existing = set(relations)
+            content: Dict[str, Dict[str, Any]] = {}
+            for s in specs:
+                for name in [s.name, *(rt for rt, _ in s.fk.values())]:
+                    if name in existing and name not in content:
+                        content[name] = content_fingerprint(
+                            c, relations[name], ts_columns.get(name, ())
+                        )
+            out: Dict[str, str] = {}
+            for s in specs:
+                if s.name not in existing:
+                    continue
+                payload = {
+                    "schema": schema_fingerprint(c, s),
+                    "engine": engine,
+                    "accuracy": accuracy,
+                    "content": content[s.name],
+                    "refs": {rt: content.get(rt) for rt, _ in s.fk.values()},
+                }
+                raw = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+                out[s.name] = hashlib.sha256(raw).hexdigest()
+        return out
+
+    def get_many(self, keys: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Cached profiles for the tables whose key is present; counts hits and misses."""
+        if not keys:
+            return {}
+        marks = ", ".join("?" for _ in keys)
+        with self._lock, self.con.connect() as c:
+            c.execute(PROFILE_CACHE_SQL)
+            self._expire(c)
+            rows = c.execute(
+                "SELECT cache_key, profile_json FROM dq_profile_cache "
+                f"WHERE cache_key IN ({marks});",
+                list(keys.values()),
+            ).fetchall()
+            c.execute(
+                "UPDATE dq_profile_cache SET last_hit_at = NOW(), hits = hits + 1 "
+                f"WHERE cache_key IN ({marks});",
+                list(keys.values()),
+            )
+        found = dict(rows)
+        out = {t: json.loads(found[k]) for t, k in keys.items() if k in found}
+        self.stats.hits += len(out)
+        self.stats.misses += len(keys) - len(out)
+        return out
+
+    def put_many(self, keys: Dict[str, str], profiles: Dict[str, Dict[str, Any]]) -> None:
+        entries = [
+            (keys[t], t, json.dumps(p, ensure_ascii=False))
+            for t, p in profiles.items()
+            if t in keys
+        ]
+        if not entries:
+            return
+        with self._lock, self.con.connect() as c:
+            c.execute(PROFILE_CACHE_SQL)
+            c.executemany(
+                "INSERT OR REPLACE INTO dq_profile_cache VALUES (?, ?, ?, NOW(), NOW(), 0);",
+                entries,
+            )
+            self._evict(c)
+
+    def _expire(self, c: duckdb.DuckDBPyConnection) -> None:
+        if self.ttl_seconds is None:
+            return
+        self.stats.evictions += int(
+            c.execute(
+                "DELETE FROM dq_profile_cache WHERE created_at < NOW() - to_seconds(?::DOUBLE);",
+                (float(self.ttl_seconds),),
+            ).fetchone()[0]
+        )
+
+    def _evict(self, c: duckdb.DuckDBPyConnection) -> None:
+        self.stats.evictions += int(
+            c.execute(
+                "DELETE FROM dq_profile_cache WHERE cache_key IN ("
+                "SELECT cache_key FROM dq_profile_cache "
+                "ORDER BY last_hit_at DESC, created_at DESC OFFSET ?);",
+                (max(0, int(self.max_entries)),),
+            ).fetchone()[0]
+        )
+
+    def clear(self) -> None:
+        with self._lock, self.con.connect() as c:
+            c.execute(PROFILE_CACHE_SQL)
+            c.execute("DELETE FROM dq_profile_cache;")
+
+
+def profile_tables_cached(
+    con: DuckDBConnector,
+    cache: ProfileCache,
+    specs: Sequence["TableSpec"],
+    config: Optional[ParallelConfig] = None,
+    engine: str = "sql",
+    accuracy: str = "exact",
+    referenced: Sequence["TableSpec"] = (),
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, float], List[str]]:
+    """
+    `profile_tables_parallel` through `cache`: unchanged tables are served
+    from it, the rest are profiled on `con` and stored. Returns (profiles,
+    wall seconds by profiled table, names served from the cache).
+    `referenced` are the specs of FK parents outside `specs`.
+    """
+    t0 = time.perf_counter()
+    with span("profile_cache_lookup"):
+        keys = cache.keys(specs, engine, accuracy)
+        cached = cache.get_many(keys)
+    cache.stats.lookup_seconds += time.perf_counter() - t0
+
+    missing = [s for s in specs if s.name not in cached]
+    profiled: Dict[str, Dict[str, Any]] = {}
+    timings: Dict[str, float] = {}
+    if missing:
+        # cached specs can still be the FK parents of the profiled ones
+        parents = [*referenced, *(s for s in specs if s.name in cached)]
+        profiled, timings = profile_tables_parallel(
+            con, missing, config, engine=engine, accuracy=accuracy, referenced=parents
+        )
+        cache.put_many(keys, profiled)
+    profiles = {s.name: cached.get(s.name) or profiled[s.name] for s in specs}
+    return profiles, timings, [s.name for s in specs if s.name in cached]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence, Tuple
+
+import duckdb
+
+from dqa.connectors.sources import spec_relations
+from dqa.profiling.sql_profiler import (
+    FK_SAMPLE_KEYS,
+    FkCheck,
+    describe_columns,
+    run_fk_checks,
+)
+
+if TYPE_CHECKING:
+    from dqa.profiling.profiler import TableSpec
+
+
+def fk_graph(specs: Sequence["TableSpec"]) -> Dict[Tuple[str, str], List[Tuple[str, str]]]:
+    """Referenced (table, column) -> the (table, column) pairs referencing it, in spec order."""
+    graph: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+    for s in specs:
+        for col, (rt, rc) in s.fk.items():
+            graph.setdefault((rt, rc), []).append((s.name, col))
+    return graph
+
+
+def validate_foreign_keys(
+    c: duckdb.DuckDBPyConnection,
+    specs: Sequence["TableSpec"],
+    row_counts: Dict[str, int],
+    sample_keys: int = FK_SAMPLE_KEYS,
+    referenced: Sequence["TableSpec"] = (),
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    FK validation stage for a whole spec set. Works out the FK graph, builds
+    each referenced key set once and anti-joins every referencing column
+    against it in a single query. Returns `fk_violations` dicts per
+    referencing table (columns in spec order); tables that are empty or
+    missing from `row_counts` are skipped, as in per-table profiling.
+    Spec tables with a `source` are read from it in place, as are the
+    `referenced` specs: FK parents checked here but not profiled.
+    """
+    relations = spec_relations(c, [*referenced, *specs])
+    columns = {
+        s.name: describe_columns(c, relations[s.name]) for s in specs if row_counts.get(s.name)
+    }
+    checks: List[FkCheck] = [
+        (t, col, rt, rc)
+        for (rt, rc), refs in fk_graph(specs).items()
+        for t, col in refs
+        if col in columns.get(t, {})
+    ]
+    found = run_fk_checks(c, checks, row_counts, sample_keys, relations)
+    return {
+        s.name: {col: found[(s.name, col)] for col in s.fk if (s.name, col) in found}
+        for s in specs
+        if s.name in columns
+    }
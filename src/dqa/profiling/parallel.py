@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import duckdb
+
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.connectors.sources import relation_sql
+from dqa.profiling.fk_validation import validate_foreign_keys
+from dqa.profiling.incremental import ensure_incremental_tables, profile_relation_incremental
+from dqa.profiling.sql_profiler import describe_columns, profile_relation
+from dqa.utils.tracing import propagate, span
+
+if TYPE_CHECKING:
+    from dqa.profiling.profiler import TableSpec
+
+# Rough working-set estimate per (row, column) for hash aggregates.
+_BYTES_PER_CELL = 16
+
+
+@dataclass(frozen=True)
+class ParallelConfig:
+    max_workers: int = min(8, os.cpu_count() or 1)
+    # Caps DuckDB's memory_limit and admission of concurrent tasks; None = unlimited.
+    memory_budget_bytes: Optional[int] = None
+    # Tables wider than this are profiled as several column groups.
+    column_group_size: int = 64
+
+
+class _MemoryBudget:
+    """Blocks tasks until their estimated working set fits in the budget."""
+
+    def __init__(self, limit: Optional[int]):
+        self.limit = limit
+        self.used = 0
+        self._cv = threading.Condition()
+
+    def acquire(self, n: int) -> int:
+        if self.limit is None:
+            return 0
+        # a task larger than the whole budget runs alone
+        n = min(n, self.limit)
+        with self._cv:
+            self._cv.wait_for(lambda: self.used + n <= self.limit)
+            self.used += n
+        return n
+
+    def release(self, n: int) -> None:
+        if self.limit is None:
+            return
+        with self._cv:
+            self.used -= n
+            self._cv.notify_all()
+
+
+def _estimated_rows(c: duckdb.DuckDBPyConnection, table: str) -> int:
+    row = c.execute(
+        "SELECT estimated_size FROM duckdb_tables() WHERE table_name = ?;", (table,)
+    ).fetchone()
+    return int(row[0]) if row and row[0] else 0
+
+
+@contextmanager
+def _memory_limit(
+    c: duckdb.DuckDBPyConnection, con: DuckDBConnector, limit_bytes: Optional[int]
+) -> Iterator[None]:
+    """
+    DuckDB's memory_limit capped to `limit_bytes` for the block. The setting
+    is per database, so on a persistent connector it would outlive the call;
+    it goes back to the connector's configured limit (or the default).
+    """
+    if limit_bytes is None:
+        yield
+        return
+    c.execute(f"SET memory_limit = '{int(limit_bytes)}B';")
+    try:
+        yield
+    finally:
+        if con.settings.memory_limit is not None:
+            c.execute(f"SET memory_limit = '{con.settings.memory_limit}';")
+        else:
+            c.execute("RESET memory_limit;")
+
+
+def _merge_group_profiles(parts: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"table": parts[0]["table"], "row_count": parts[0]["row_count"]}
+    for key in (
+        "null_rates",
+        "distinct_counts",
+        "key_duplicate_rates",
+        "key_duplicates",
+        "numeric_stats",
+        "categorical_top",
+        "freshness",
+        "fk_violations",
+    ):
+        out[key] = {}
+        for p in parts:
+            out[key].update(p.get(key, {}))
+    # approximate profiles: per-column bounds and sketches sit one level deeper
+    for key in ("accuracy", "sketches"):
+        if key in parts[0]:
+            out[key] = {}
+            for p in parts:
+                for k, v in p[key].items():
+                    if isinstance(v, dict):
+                        out[key].setdefault(k, {}).update(v)
+                    else:
+                        out[key][k] = max(out[key].get(k, v), v) if isinstance(v, float) else v
+    return out
+
+
+def profile_tables_parallel(
+    con: DuckDBConnector,
+    specs: Sequence["TableSpec"],
+    config: Optional[ParallelConfig] = None,
+    engine: str = "sql",
+    accuracy: str = "exact",
+    referenced: Sequence["TableSpec"] = (),
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, float]]:
+    """
+    Profile many tables concurrently over one shared DuckDB connection.
+
+    Every task runs on its own cursor. Wide tables are split into column
+    groups (sql engine only) that run as separate tasks and are merged back.
+    `accuracy` is passed to the sql engine (see `profile_relation`). FK
+    checks are left out of the tasks and run afterwards as one batched
+    stage (see `validate_foreign_keys`), so shared key sets are built once;
+    `referenced` are the specs of FK parents outside `specs`.
+    Returns (profiles by table, wall seconds by table) in `specs` order.
+    """
+    if engine not in ("sql", "incremental"):
+        raise ValueError(f"parallel profiling supports sql/incremental, got {engine!r}")
+    config = config or ParallelConfig()
+
+    budget = _MemoryBudget(config.memory_budget_bytes)
+    with con.connect() as shared, _memory_limit(shared, con, config.memory_budget_bytes):
+        if engine == "incremental":
+            ensure_incremental_tables(shared)
+
+        tasks: List[Tuple["TableSpec", Optional[List[str]], int]] = []
+        for s in [replace(spec, fk={}) for spec in specs]:
+            columns = list(describe_columns(shared, relation_sql(shared, s.name, s)))
+            # file and attached sources have no cheap row estimate
+            rows = _estimated_rows(shared, s.name) if s.source is None else 0
+            size = config.column_group_size
+            if engine == "sql" and len(columns) > size:
+                for i in range(0, len(columns), size):
+                    group = columns[i : i + size]
+                    tasks.append((s, group, rows * len(group) * _BYTES_PER_CELL))
+            else:
+                tasks.append((s, None, rows * len(columns) * _BYTES_PER_CELL))
+
+        spans: Dict[str, List[float]] = {}
+        lock = threading.Lock()
+
+        def work(task: Tuple["TableSpec", Optional[List[str]], int]) -> Dict[str, Any]:
+            spec, group, est = task
+            held = budget.acquire(est)
+            cur = shared.cursor()
+            try:
+                t0 = time.perf_counter()
+                with span("profile_relation", table=spec.name, columns=len(group or [])):
+                    if engine == "incremental":
+                        prof = profile_relation_incremental(cur, spec.name, spec)
+                    else:
+                        prof = profile_relation(
+                            cur, spec.name, spec, columns=group, accuracy=accuracy
+                        )
+                t1 = time.perf_counter()
+            finally:
+                cur.close()
+                budget.release(held)
+            with lock:
+                window = spans.setdefault(spec.name, [t0, t1])
+                window[0], window[1] = min(window[0], t0), max(window[1], t1)
+            return prof
+
+        with ThreadPoolExecutor(max_workers=max(1, config.max_workers)) as pool:
+            # each task runs in a copy of this context so its spans nest under ours
+            futures = [pool.submit(propagate(work), t) for t in tasks]
+            results = [f.result() for f in futures]
+
+        row_counts = {
+            t[0].name: int(prof["row_count"]) for t, prof in zip(tasks, results, strict=True)
+        }
+        with span("fk_validation"):
+            fk_violations = validate_foreign_keys(
+                shared, specs, row_counts, referenced=referenced
+            )
+
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for (spec, _, _), prof in zip(tasks, results, strict=True):
+        grouped.setdefault(spec.name, []).append(prof)
+
+    profiles = {
+        s.name: (g[0] if len(g) == 1 else _merge_group_profiles(g))
+        for s in specs
+        for g in [grouped[s.name]]
+    }
+    for name, found in fk_violations.items():
+        profiles[name]["fk_violations"] = found
+    timings = {s.name: round(spans[s.name][1] - spans[s.name][0], 4) for s in specs}
+    return profiles, timings
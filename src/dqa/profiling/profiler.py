@@ -1,12 +1,24 @@
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
-from typing import Any, Dict, List
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import pandas as pd
 
 from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.connectors.sources import TableSource, relation_sql, spec_relations
+from dqa.profiling.baseline_store import load_profiles, save_profiles
+from dqa.profiling.incremental import profile_table_incremental
+from dqa.profiling.sampling import SamplingSpec
+from dqa.profiling.sql_profiler import (
+    ACCURACY_MODES,
+    FK_SAMPLE_KEYS,
+    KEY_SAMPLE_KEYS,
+    key_label,
+    profile_table_sql,
+)
+from dqa.profiling.streaming import profile_table_streaming
+from dqa.utils.tracing import span
 
 
 @dataclass(frozen=True)
@@ -15,6 +27,21 @@ class TableSpec:
     key_columns: List[str]
     ts_columns: List[str]
     fk: Dict[str, tuple[str, str]]  # col -> (ref_table, ref_col)
+    # sql engine only: col -> "skip" | "nulls" | "full"; others get default_policy
+    column_policies: Dict[str, str] = field(default_factory=dict)
+    default_policy: str = "full"
+    # profile column metrics on a sample of large tables (see SamplingSpec)
+    sampling: Optional[SamplingSpec] = None
+    # Parquet/CSV glob or attached DuckDB table instead of a warehouse table
+    source: Optional[TableSource] = None
+    # multi-column grain, e.g. [("order_id", "line_no")]; checked like key_columns
+    composite_keys: List[Tuple[str, ...]] = field(default_factory=list)
+
+    @property
+    def keys(self) -> List[Tuple[str, ...]]:
+        """Every uniqueness key: single key_columns first, then composite_keys."""
+        out = [(k,) for k in self.key_columns] + [tuple(k) for k in self.composite_keys]
+        return list(dict.fromkeys(out))
 
 
 E_COMMERCE_SPECS = [
@@ -47,19 +74,72 @@ def _col_type_map(df: pd.DataFrame) -> Dict[str, str]:
     return out
 
 
-def profile_table(con: DuckDBConnector, table: str, spec: TableSpec) -> Dict[str, Any]:
-    df = con.fetchdf(f"SELECT * FROM {table};")
+PROFILE_ENGINES = ("sql", "pandas", "incremental", "streaming")
+
+
+def profile_table(
+    con: DuckDBConnector,
+    table: str,
+    spec: TableSpec,
+    engine: str = "sql",
+    accuracy: str = "exact",
+    referenced: Sequence[TableSpec] = (),
+) -> Dict[str, Any]:
+    """
+    Profile one table. The default "sql" engine pushes every metric down to
+    DuckDB; "pandas" materializes the table and is kept as the reference path;
+    "incremental" only profiles day partitions newer than the stored watermark;
+    "streaming" reads fixed-size batches for row-level checks in bounded memory.
+
+    `accuracy` ("exact" | "approximate") selects sketch-based distinct counts,
+    quantiles and top-k for the sql engine. The incremental and streaming
+    engines are always sketch-based and the pandas engine always exact.
+
+    `referenced` are the specs of FK parents read from a `source`, so FK
+    checks scan them in place; other parents are warehouse tables.
+    """
+    if accuracy not in ACCURACY_MODES:
+        raise ValueError(f"accuracy must be one of {ACCURACY_MODES}, got {accuracy!r}")
+    if engine not in PROFILE_ENGINES:
+        raise ValueError(f"engine must be one of {PROFILE_ENGINES}, got {engine!r}")
+    with span("profile_table", table=table, engine=engine):
+        if engine == "sql":
+            return profile_table_sql(con, table, spec, accuracy, referenced)
+        if engine == "incremental":
+            return profile_table_incremental(con, table, spec, referenced)
+        if engine == "streaming":
+            return profile_table_streaming(con, table, spec, referenced=referenced)
+        return profile_table_pandas(con, table, spec, referenced)
+
+
+def profile_table_pandas(
+    con: DuckDBConnector, table: str, spec: TableSpec, referenced: Sequence[TableSpec] = ()
+) -> Dict[str, Any]:
+    with con.connect() as c:
+        df = c.execute(f"SELECT * FROM {relation_sql(c, table, spec)};").fetchdf()
     row_count = int(len(df))
     col_types = _col_type_map(df)
 
     null_rates = {c: (float(df[c].isna().mean()) if row_count else 0.0) for c in df.columns}
     distinct_counts = {c: int(df[c].nunique(dropna=True)) for c in df.columns}
 
-    key_dupes: Dict[str, float] = {}
-    for k in spec.key_columns:
-        if k in df.columns and row_count:
-            dup_rate = float((df[k].duplicated(keep=False)).mean())
-            key_dupes[k] = dup_rate
+    key_info: Dict[str, Dict[str, Any]] = {}
+    for k in spec.keys:
+        if set(k) <= set(df.columns) and row_count:
+            sizes = df.groupby(list(k), dropna=False).size()
+            dup = sizes[sizes > 1].sort_values(ascending=False, kind="stable")
+            samples = [
+                [None if pd.isna(v) else str(v) for v in (idx if len(k) > 1 else (idx,))]
+                for idx in dup.index[:KEY_SAMPLE_KEYS]
+            ]
+            key_info[key_label(k)] = {
+                "columns": list(k),
+                "duplicate_rows": int(dup.sum()),
+                "duplicate_groups": int(len(dup)),
+                "duplicate_rate": float(dup.sum()) / row_count,
+                "sample_keys": [v[0] if len(k) == 1 else v for v in samples],
+            }
+    key_dupes = {label: info["duplicate_rate"] for label, info in key_info.items()}
 
     numeric_stats: Dict[str, Dict[str, float]] = {}
     for c, t in col_types.items():
@@ -88,22 +168,23 @@ def profile_table(con: DuckDBConnector, table: str, spec: TableSpec) -> Dict[str
             mx = df[ts].dropna().max()
             freshness[ts] = str(mx) if pd.notna(mx) else None
 
-    fk_violations: Dict[str, Dict[str, float]] = {}
-    for col, (rt, rc) in spec.fk.items():
-        if col in df.columns and row_count:
-            q = f"""
-            SELECT COUNT(*) AS bad
-            FROM {table} t
-            LEFT JOIN {rt} r
-              ON t.{col} = r.{rc}
-            WHERE t.{col} IS NOT NULL
-              AND r.{rc} IS NULL;
-            """
-            bad = int(con.fetchdf(q)["bad"].iloc[0])
-            fk_violations[col] = {
-                "bad_rows": bad,
-                "bad_rate": (bad / row_count if row_count else 0.0),
-            }
+    # computed in pandas from the parent keys, independently of the SQL anti-join
+    fk_violations: Dict[str, Dict[str, Any]] = {}
+    if row_count:
+        with con.connect() as c:
+            relations = spec_relations(c, referenced)
+            for col, (rt, rc) in spec.fk.items():
+                if col not in df.columns:
+                    continue
+                ref = c.execute(f'SELECT DISTINCT "{rc}" FROM {relations.get(rt, rt)};')
+                values = df[col].dropna()
+                bad = values[~values.isin(ref.fetchdf()[rc].dropna())].astype(str)
+                counts = sorted(bad.value_counts().items(), key=lambda kv: (-kv[1], kv[0]))
+                fk_violations[col] = {
+                    "bad_rows": int(len(bad)),
+                    "bad_rate": len(bad) / row_count,
+                    "sample_keys": [k for k, _ in counts[:FK_SAMPLE_KEYS]],
+                }
 
     return {
         "table": table,
@@ -111,6 +192,7 @@ def profile_table(con: DuckDBConnector, table: str, spec: TableSpec) -> Dict[str
         "null_rates": null_rates,
         "distinct_counts": distinct_counts,
         "key_duplicate_rates": key_dupes,
+        "key_duplicates": key_info,
         "numeric_stats": numeric_stats,
         "categorical_top": categorical_top,
         "freshness": freshness,
@@ -119,19 +201,8 @@ def profile_table(con: DuckDBConnector, table: str, spec: TableSpec) -> Dict[str
 
 
 def save_profile_snapshot(con: DuckDBConnector, snapshot_name: str, table: str, profile: Dict[str, Any]) -> None:
-    payload = json.dumps(profile, ensure_ascii=False)
-    con.exec(
-        "INSERT INTO dq_profiles VALUES (?, ?, ?, NOW());",
-        (snapshot_name, table, payload),
-    )
+    save_profiles(con, snapshot_name, {table: profile}, {})
 
 
 def load_profile_snapshot(con: DuckDBConnector, snapshot_name: str) -> Dict[str, Dict[str, Any]]:
-    df = con.fetchdf(
-        "SELECT table_name, profile_json FROM dq_profiles WHERE snapshot_name = ?;",
-        (snapshot_name,),
-    )
-    out: Dict[str, Dict[str, Any]] = {}
-    for _, r in df.iterrows():
-        out[str(r["table_name"])] = json.loads(r["profile_json"])
-    return out
+    return load_profiles(con, snapshot_name)
@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import dataclasses
+import fnmatch
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import duckdb
+import yaml
+
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.connectors.sources import TableSource
+from dqa.profiling.profiler import E_COMMERCE_SPECS, TableSpec
+from dqa.profiling.sampling import SamplingSpec
+from dqa.profiling.sql_profiler import duckdb_kind
+from dqa.utils.config import PATHS
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# the profiler's own tables are never discovered
+INTERNAL_TABLES = ("dq_*",)
+# table name prefixes dropped before matching `<entity>_id` columns
+_ENTITY_PREFIXES = ("dim_", "fact_", "stg_", "int_")
+
+DISCOVERY_SQL = """
+CREATE TABLE IF NOT EXISTS dq_spec_discovery (
+  table_name VARCHAR,
+  catalog_version VARCHAR,
+  spec_json VARCHAR,
+  discovered_at TIMESTAMP
+);
+"""
+
+
+def spec_from_dict(name: str, d: Dict[str, Any]) -> TableSpec:
+    """TableSpec from its YAML / JSON form (the fields of TableSpec, all optional)."""
+    return TableSpec(
+        name,
+        key_columns=list(d.get("key_columns") or []),
+        ts_columns=list(d.get("ts_columns") or []),
+        fk={col: (ref[0], ref[1]) for col, ref in (d.get("fk") or {}).items()},
+        column_policies=dict(d.get("column_policies") or {}),
+        default_policy=d.get("default_policy", "full"),
+        sampling=SamplingSpec(**d["sampling"]) if d.get("sampling") else None,
+        source=TableSource(**d["source"]) if d.get("source") else None,
+        composite_keys=[tuple(k) for k in d.get("composite_keys") or []],
+    )
+
+
+def spec_to_dict(spec: TableSpec) -> Dict[str, Any]:
+    out: Dict[str, Any] = {
+        "key_columns": list(spec.key_columns),
+        "ts_columns": list(spec.ts_columns),
+        "fk": {col: list(ref) for col, ref in spec.fk.items()},
+    }
+    if spec.composite_keys:
+        out["composite_keys"] = [list(k) for k in spec.composite_keys]
+    if spec.column_policies or spec.default_policy != "full":
+        out["column_policies"] = dict(spec.column_policies)
+        out["default_policy"] = spec.default_policy
+    if spec.sampling is not None:
+        out["sampling"] = dataclasses.asdict(spec.sampling)
+    if spec.source is not None:
+        out["source"] = dataclasses.asdict(spec.source)
+    return out
+
+
+def _entity(table: str) -> str:
+    """dim_customers -> customer, fact_orders -> order."""
+    for p in _ENTITY_PREFIXES:
+        if table.startswith(p):
+            table = table[len(p) :]
+            break
+    return table[:-1] if table.endswith("s") and not table.endswith("ss") else table
+
+
+def catalog_versions(
+    c: duckdb.DuckDBPyConnection, tables: Sequence[str]
+) -> Dict[str, str]:
+    """Hash of each existing table's definition (columns, types, constraints)."""
+    if not tables:
+        return {}
+    rows = c.execute(
+        "SELECT table_name, sql FROM duckdb_tables() "
+        "WHERE database_name = current_database() AND schema_name = current_schema() "
+        "AND table_name IN (SELECT unnest(?));",
+        (list(tables),),
+    ).fetchall()
+    return {t: hashlib.sha256(str(sql).encode("utf-8")).hexdigest()[:16] for t, sql in rows}
+
+
+def discover_spec(c: duckdb.DuckDBPyConnection, table: str) -> Dict[str, Any]:
+    """
+    Spec candidates for a warehouse table from the catalog only (no data is
+    read): keys from PRIMARY KEY / UNIQUE constraints, else the `id` or
+    `<entity>_id` column (fact_orders -> order_id); timestamp and date
+    columns as freshness columns; FKs from FOREIGN KEY constraints, else
+    `<entity>_id` columns of another table whose entity matches.
+    """
+    columns = c.execute(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = ? ORDER BY ordinal_position;",
+        (table,),
+    ).fetchall()
+    names = [col for col, _ in columns]
+    constraints = c.execute(
+        "SELECT constraint_type, constraint_column_names, referenced_table, "
+        "referenced_column_names FROM duckdb_constraints() "
+        "WHERE database_name = current_database() AND schema_name = current_schema() "
+        "AND table_name = ? ORDER BY constraint_index;",
+        (table,),
+    ).fetchall()
+
+    keys: List[List[str]] = []
+    fk: Dict[str, List[str]] = {}
+    for kind, cols, ref_table, ref_cols in constraints:
+        if kind in ("PRIMARY KEY", "UNIQUE") and list(cols) not in keys:
+            keys.append(list(cols))
+        elif kind == "FOREIGN KEY" and len(cols) == 1:
+            fk[cols[0]] = [ref_table, ref_cols[0]]
+    if not keys:
+        own = f"{_entity(table)}_id"
+        keys = [[x] for x in ("id", own) if x in names][:1]
+
+    key_cols = {x for k in keys for x in k}
+    candidates = {
+        col[: -len("_id")]: col
+        for col in names
+        if col.endswith("_id") and col not in key_cols and col not in fk
+    }
+    if candidates:
+        others = c.execute(
+            "SELECT table_name, column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name <> ? "
+            "AND column_name IN (SELECT unnest(?)) ORDER BY table_name;",
+            (table, list(candidates.values())),
+        ).fetchall()
+        for ref_table, col in others:
+            if col not in fk and _entity(ref_table) == col[: -len("_id")]:
+                fk[col] = [ref_table, col]
+
+    return {
+        "key_columns": [k[0] for k in keys if len(k) == 1],
+        "composite_keys": [k for k in keys if len(k) > 1],
+        "ts_columns": [col for col, t in columns if duckdb_kind(t) == "timestamp"],
+        "fk": fk,
+    }
+
+
+class SpecRegistry:
+    """
+    Table specs by name, declared in YAML and/or discovered from the catalog.
+
+    Declared entries are only turned into TableSpecs when first looked up.
+    Warehouse tables matching the `include` patterns (and not `exclude` or
+    the profiler's own dq_* tables) are discovered on lookup as well; an
+    entry with `discover: true` is discovered and then overridden by its
+    declared fields. Discovered specs are cached in dq_spec_discovery
+    against the table's catalog version (a hash of its definition), so a
+    table is only introspected again after its definition changes; a
+    long-lived registry rebuilds such a spec on its next lookup.
+
+        discover:
+          include: ["fact_*", "dim_*"]
+        tables:
+          fact_orders:
+            tags: [finance]
+            column_tags: {amount: [money]}
+            key_columns: [order_id]
+            ts_columns: [order_ts]
+            fk: {customer_id: [dim_customers, customer_id]}
+    """
+
+    def __init__(
+        self,
+        entries: Optional[Dict[str, Dict[str, Any]]] = None,
+        con: Optional[DuckDBConnector] = None,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+    ):
+        self.entries = dict(entries or {})
+        self.con = con
+        self.include = list(include)
+        self.exclude = list(exclude) + list(INTERNAL_TABLES)
+        self._index: Dict[str, TableSpec] = {}
+        # catalog version each discovered spec in _index was built from
+        self._versions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_yaml(cls, path: Path, con: Optional[DuckDBConnector] = None) -> "SpecRegistry":
+        with open(path, encoding="utf-8") as f:
+            doc = yaml.load(f, Loader=_Loader) or {}
+        discover = doc.get("discover") or {}
+        return cls(
+            {name: entry or {} for name, entry in (doc.get("tables") or {}).items()},
+            con=con,
+            include=discover.get("include") or [],
+            exclude=discover.get("exclude") or [],
+        )
+
+    @classmethod
+    def from_specs(
+        cls, specs: Sequence[TableSpec], con: Optional[DuckDBConnector] = None
+    ) -> "SpecRegistry":
+        reg = cls({s.name: spec_to_dict(s) for s in specs}, con=con)
+        reg._index.update({s.name: s for s in specs})
+        return reg
+
+    def _discoverable(self, name: str) -> bool:
+        if any(fnmatch.fnmatchcase(name, p) for p in self.exclude):
+            return False
+        return any(fnmatch.fnmatchcase(name, p) for p in self.include)
+
+    def names(self) -> List[str]:
+        """Declared tables, then discoverable warehouse tables (names only, no introspection)."""
+        out = list(self.entries)
+        if self.con is not None and self.include:
+            with self.con.connect() as c:
+                rows = c.execute(
+                    "SELECT table_name FROM duckdb_tables() "
+                    "WHERE database_name = current_database() "
+                    "AND schema_name = current_schema() ORDER BY table_name;"
+                ).fetchall()
+            out += [t for (t,) in rows if t not in self.entries and self._discoverable(t)]
+        return out
+
+    def tags(self, name: str) -> List[str]:
+        """Tags declared for `name` (discovered tables have none)."""
+        return list((self.entries.get(name) or {}).get("tags") or [])
+
+    def column_tags(self, name: str) -> Dict[str, List[str]]:
+        """Declared tags of `name`'s columns, by column."""
+        declared = (self.entries.get(name) or {}).get("column_tags") or {}
+        return {col: list(tags) for col, tags in declared.items()}
+
+    def get(self, name: str) -> Optional[TableSpec]:
+        found = self.specs([name], missing_ok=True)
+        return found[0] if found else None
+
+    def __getitem__(self, name: str) -> TableSpec:
+        spec = self.get(name)
+        if spec is None:
+            raise KeyError(name)
+        return spec
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def specs(
+        self, names: Optional[Sequence[str]] = None, missing_ok: bool = False
+    ) -> List[TableSpec]:
+        """Specs of `names` (default: `names()`), building or discovering only those."""
+        names = self.names() if names is None else list(names)
+        with self._lock:
+            self._expire(names)
+            todo = [n for n in dict.fromkeys(names) if n not in self._index]
+            wanted = [
+                n
+                for n in todo
+                if (self.entries.get(n) or {}).get("discover")
+                or (n not in self.entries and self._discoverable(n))
+            ]
+            discovered = self._discover(wanted) if wanted else {}
+            for n in todo:
+                if n in self.entries:
+                    entry = {k: v for k, v in self.entries[n].items() if k != "discover"}
+                    self._index[n] = spec_from_dict(n, {**discovered.get(n, {}), **entry})
+                elif n in discovered:
+                    self._index[n] = spec_from_dict(n, discovered[n])
+        missing = [n for n in names if n not in self._index]
+        if missing and not missing_ok:
+            raise KeyError(f"no table spec for {missing}")
+        return [self._index[n] for n in names if n in self._index]
+
+    def parents(self, specs: Sequence[TableSpec]) -> List[TableSpec]:
+        """Specs of the FK parents of `specs` that are not among them (unknown tables skipped)."""
+        have = {s.name for s in specs}
+        names = dict.fromkeys(rt for s in specs for rt, _ in s.fk.values() if rt not in have)
+        return self.specs(list(names), missing_ok=True)
+
+    def _expire(self, names: Sequence[str]) -> None:
+        """Drop built specs of discovered tables whose definition changed since."""
+        known = [n for n in names if n in self._versions]
+        if not known or self.con is None:
+            return
+        with self.con.connect() as c:
+            current = catalog_versions(c, known)
+        for n in known:
+            if current.get(n) != self._versions[n]:
+                self._index.pop(n, None)
+                del self._versions[n]
+
+    def _discover(self, names: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        if self.con is None:
+            return {}
+        out: Dict[str, Dict[str, Any]] = {}
+        with self.con.connect() as c:
+            versions = catalog_versions(c, names)
+            if not versions:
+                return out
+            writable = not self.con.read_only
+            if writable:
+                c.execute(DISCOVERY_SQL)
+            cached: Dict[str, Tuple[str, str]] = {}
+            has_cache = writable or bool(
+                c.execute(
+                    "SELECT 1 FROM duckdb_tables() WHERE table_name = 'dq_spec_discovery';"
+                ).fetchone()
+            )
+            if has_cache:
+                rows = c.execute(
+                    "SELECT table_name, catalog_version, spec_json FROM dq_spec_discovery "
+                    "WHERE table_name IN (SELECT unnest(?));",
+                    (list(versions),),
+                ).fetchall()
+                cached = {t: (v, js) for t, v, js in rows}
+            fresh: List[Tuple[str, str, str]] = []
+            self._versions.update(versions)
+            for t, version in versions.items():
+                if t in cached and cached[t][0] == version:
+                    out[t] = json.loads(cached[t][1])
+                    continue
+                out[t] = discover_spec(c, t)
+                fresh.append((t, version, json.dumps(out[t], sort_keys=True)))
+            if fresh and writable:
+                c.execute(
+                    "DELETE FROM dq_spec_discovery WHERE table_name IN (SELECT unnest(?));",
+                    ([t for t, _, _ in fresh],),
+                )
+                c.executemany(
+                    "INSERT INTO dq_spec_discovery VALUES (?, ?, ?, NOW());", fresh
+                )
+        return out
+
+
+def default_registry(con: Optional[DuckDBConnector] = None) -> SpecRegistry:
+    """The registry in config/tables.yml, or the built-in e-commerce specs without one."""
+    if PATHS.table_registry.exists():
+        return SpecRegistry.from_yaml(PATHS.table_registry, con)
+    return SpecRegistry.from_specs(E_COMMERCE_SPECS, con)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from dqa.profiling.profiler import TableSpec
+
+# Per-column profiling policies: skip entirely, null rate only, or every metric.
+COLUMN_POLICIES = ("skip", "nulls", "full")
+SAMPLING_METHODS = ("bernoulli", "reservoir", "stratified")
+DEFAULT_SAMPLE_ROWS = 100_000
+
+
+@dataclass(frozen=True)
+class SamplingSpec:
+    """
+    Table-level sampling for column metrics. Tables with more than `rows`
+    rows are profiled on a sample of about `rows` rows: "bernoulli" and
+    "reservoir" use DuckDB's USING SAMPLE, "stratified" keeps the same
+    fraction of every day of `stratify_by` (at least one row per day), so
+    sparse days are not lost. Row counts, freshness, key and FK checks
+    always read the full table.
+    """
+
+    method: str = "reservoir"
+    rows: int = DEFAULT_SAMPLE_ROWS
+    stratify_by: Optional[str] = None
+    seed: int = 42
+
+    def __post_init__(self) -> None:
+        if self.method not in SAMPLING_METHODS:
+            raise ValueError(f"method must be one of {SAMPLING_METHODS}, got {self.method!r}")
+        if self.rows < 1:
+            raise ValueError(f"rows must be positive, got {self.rows}")
+        if self.method == "stratified" and not self.stratify_by:
+            raise ValueError("stratified sampling needs a stratify_by ts column")
+
+
+def resolve_policies(spec: "TableSpec", columns: Sequence[str]) -> Dict[str, str]:
+    """Policy of each of `columns` (spec override, else the spec default)."""
+    out: Dict[str, str] = {}
+    for x in columns:
+        policy = spec.column_policies.get(x, spec.default_policy)
+        if policy not in COLUMN_POLICIES:
+            raise ValueError(f"column policy must be one of {COLUMN_POLICIES}, got {policy!r}")
+        out[x] = policy
+    return out
+
+
+def z_score(confidence: float) -> float:
+    return NormalDist().inv_cdf(0.5 + confidence / 2.0)
+
+
+def wilson_interval(successes: int, n: int, confidence: float) -> Tuple[float, float]:
+    """Wilson score interval of a proportion estimated from `n` sampled rows."""
+    if n <= 0:
+        return 0.0, 1.0
+    z = z_score(confidence)
+    p = successes / n
+    denom = 1.0 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def quantile_rank_interval(q: float, n: int, confidence: float) -> Tuple[float, float]:
+    """
+    Distribution-free interval, as probabilities, of the sample quantiles
+    that bracket the population q-quantile (normal approximation of the
+    binomial order-statistic ranks).
+    """
+    if n <= 0:
+        return 0.0, 1.0
+    half = z_score(confidence) * math.sqrt(q * (1 - q) / n)
+    return max(0.0, q - half), min(1.0, q + half)
+
+
+def gee_distinct(
+    distinct: int, singletons: int, sample_n: int, population_n: int
+) -> Tuple[int, int, int]:
+    """
+    Guaranteed-Error Estimator of a column's distinct count from a sample
+    (Charikar et al., 2000): values seen once are scaled by sqrt(N/n). The
+    estimate is within a sqrt(N/n) ratio of the truth, which bounds the
+    interval. Returns (estimate, low, high).
+    """
+    if sample_n <= 0 or population_n <= sample_n:
+        return distinct, distinct, distinct
+    ratio = math.sqrt(population_n / sample_n)
+    est = ratio * singletons + (distinct - singletons)
+    low = max(distinct, int(est / ratio))
+    high = min(population_n, int(math.ceil(est * ratio)))
+    return int(round(min(max(est, low), high))), low, high
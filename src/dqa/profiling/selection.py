@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import fnmatch
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from dqa.connectors.sources import relation_sql
+from dqa.profiling.sql_profiler import describe_columns
+
+if TYPE_CHECKING:
+    from dqa.profiling.profiler import TableSpec
+    from dqa.profiling.registry import SpecRegistry
+
+TAG_PREFIX = "tag:"
+
+
+@dataclass(frozen=True)
+class Selector:
+    """
+    One table or column selector:
+
+        fact_*                 tables matching a glob
+        tag:finance            tables tagged `finance`
+        fact_orders.amount     columns matching a glob in the matching tables
+        tag:finance.tag:money  columns tagged `money` in tables tagged `finance`
+    """
+
+    text: str
+    table: str
+    column: Optional[str] = None
+
+    def matches_table(self, name: str, tags: Sequence[str]) -> bool:
+        return _matches(self.table, name, tags)
+
+    def matches_column(self, name: str, tags: Sequence[str]) -> bool:
+        return self.column is None or _matches(self.column, name, tags)
+
+
+def _matches(pattern: str, name: str, tags: Sequence[str]) -> bool:
+    if pattern.startswith(TAG_PREFIX):
+        return pattern[len(TAG_PREFIX) :] in tags
+    return fnmatch.fnmatchcase(name, pattern)
+
+
+def parse_selector(text: str) -> Selector:
+    table, dot, column = text.strip().partition(".")
+    for part in [table] + ([column] if dot else []):
+        if not part or part == TAG_PREFIX:
+            raise ValueError(f"invalid selector {text!r}")
+    return Selector(text, table, column if dot else None)
+
+
+@dataclass(frozen=True)
+class Selection:
+    """
+    Tables of a targeted run, in registry order. Tables in `columns` only
+    get column metrics for those columns; their key, FK and freshness
+    checks still run. `parents` are the FK parents added to the selection.
+    """
+
+    tables: List[str]
+    columns: Dict[str, List[str]] = field(default_factory=dict)
+    parents: List[str] = field(default_factory=list)
+
+    def narrow(self, spec: "TableSpec") -> "TableSpec":
+        """`spec` with every unselected column skipped (sql engine only)."""
+        cols = self.columns.get(spec.name)
+        if cols is None:
+            return spec
+        policies = {x: spec.column_policies.get(x, spec.default_policy) for x in cols}
+        return replace(spec, column_policies=policies, default_policy="skip")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"tables": self.tables, "columns": self.columns, "parents": self.parents}
+
+
+def select_tables(
+    registry: "SpecRegistry", selectors: Sequence[str], parents: bool = False
+) -> Selection:
+    """
+    Resolve `selectors` (see Selector) against `registry`; no selectors
+    select every table. A selector matching nothing is an error, so a
+    mistyped selector never turns into an empty run. A table selected
+    whole by one selector and by columns by another is profiled whole.
+    With `parents`, the FK parents of the selected tables (transitively)
+    are added whole, so their keys are checked in the same run.
+    """
+    names = registry.names()
+    if not selectors:
+        return Selection(names)
+    whole: set = set()
+    columns: Dict[str, Dict[str, None]] = {}
+    for sel in [parse_selector(s) for s in selectors]:
+        matched = [n for n in names if sel.matches_table(n, registry.tags(n))]
+        if sel.column is None:
+            whole.update(matched)
+        else:
+            for name, cols in _columns(registry, matched).items():
+                tags = registry.column_tags(name)
+                picked = [x for x in cols if sel.matches_column(x, tags.get(x, ()))]
+                if picked:
+                    columns.setdefault(name, {}).update(dict.fromkeys(picked))
+            matched = [n for n in matched if n in columns]
+        if not matched:
+            raise ValueError(f"selector {sel.text!r} matches no table or column")
+
+    selected = whole | set(columns)
+    added: List[str] = []
+    if parents:
+        todo = [n for n in names if n in selected]
+        while todo:
+            for rt, _ in registry[todo.pop()].fk.values():
+                if rt not in selected and rt in names:
+                    selected.add(rt)
+                    added.append(rt)
+                    todo.append(rt)
+    return Selection(
+        [n for n in names if n in selected],
+        {n: list(cols) for n, cols in columns.items() if n not in whole and n not in added},
+        [n for n in names if n in added],
+    )
+
+
+def _declared_columns(registry: "SpecRegistry", spec: "TableSpec") -> List[str]:
+    cols = [*spec.key_columns, *(x for k in spec.composite_keys for x in k), *spec.ts_columns]
+    cols += [*spec.fk, *registry.column_tags(spec.name), *spec.column_policies]
+    return list(dict.fromkeys(cols))
+
+
+def _columns(registry: "SpecRegistry", tables: Sequence[str]) -> Dict[str, List[str]]:
+    """
+    Column names of `tables`: from the warehouse for tables that exist
+    there, else the columns their spec and column tags name.
+    """
+    specs = registry.specs(tables)
+    if registry.con is None:
+        return {s.name: _declared_columns(registry, s) for s in specs}
+    with registry.con.connect() as c:
+        existing = {r[0] for r in c.execute("SELECT table_name FROM duckdb_tables();").fetchall()}
+        return {
+            s.name: list(describe_columns(c, relation_sql(c, s.name, s)))
+            if s.name in existing or s.source is not None
+            else _declared_columns(registry, s)
+            for s in specs
+        }
@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import glob
+import heapq
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+import duckdb
+
+from dqa.connectors.duckdb_conn import DuckDBConnector, DuckDBSettings
+from dqa.connectors.sources import TableSource, relation_sql
+from dqa.profiling.parallel import ParallelConfig, profile_tables_parallel
+from dqa.profiling.sql_profiler import ACCURACY_MODES, describe_columns
+from dqa.reporting.run_log import RUNS_SQL
+
+if TYPE_CHECKING:
+    from dqa.profiling.profiler import TableSpec
+
+# Profiling throughput of one shard process, in cells (rows x columns) per
+# second, used until a finished sharded run has been recorded in dq_runs.
+DEFAULT_CELLS_PER_SECOND = 20_000_000
+# Fixed cost per shard (process start-up, imports, connection).
+SHARD_OVERHEAD_SECONDS = 2.0
+# Rough bytes per CSV cell, for row estimates of CSV sources.
+_CSV_BYTES_PER_CELL = 8
+
+
+@dataclass(frozen=True)
+class TableCost:
+    table: str
+    rows: int
+    columns: int
+
+    @property
+    def cells(self) -> int:
+        # empty or unknown tables still cost a few queries
+        return max(1, self.rows) * max(1, self.columns)
+
+
+class ShardError(RuntimeError):
+    """Raised when shards still fail after their retries; finished shards stay checkpointed."""
+
+    def __init__(self, failed: Dict[int, str]):
+        self.failed = failed
+        super().__init__(
+            f"{len(failed)} shard(s) failed: "
+            + "; ".join(f"#{i}: {err}" for i, err in sorted(failed.items()))
+        )
+
+
+@dataclass
+class ShardedProfiles:
+    """Merged result of a sharded profiling run, in spec order."""
+
+    profiles: Dict[str, Dict[str, Any]]
+    timings: Dict[str, float]
+    costs: Dict[str, TableCost]
+    shards: List[Dict[str, Any]] = field(default_factory=list)
+
+    def cells_per_second(self) -> Optional[float]:
+        """Measured throughput per shard process over the shards run this time."""
+        ran = [s for s in self.shards if not s["resumed"] and s["seconds"] > 0]
+        busy = sum(s["seconds"] for s in ran)
+        return sum(s["cells"] for s in ran) / busy if busy else None
+
+
+def _source_rows(c: duckdb.DuckDBPyConnection, name: str, source: TableSource) -> int:
+    if source.kind == "parquet":
+        row = c.execute(
+            "SELECT sum(num_rows) FROM parquet_file_metadata(?);", (source.path,)
+        ).fetchone()
+        return int(row[0] or 0)
+    if source.kind == "duckdb":
+        row = c.execute(
+            "SELECT estimated_size FROM duckdb_tables() "
+            "WHERE database_name = ? AND table_name = ?;",
+            (source.alias, source.table or name),
+        ).fetchone()
+        return int(row[0]) if row and row[0] else 0
+    # csv has no row metadata; judge by file size
+    return sum(os.path.getsize(p) for p in glob.glob(source.path)) // _CSV_BYTES_PER_CELL
+
+
+def estimate_costs(
+    c: duckdb.DuckDBPyConnection, specs: Sequence["TableSpec"]
+) -> Dict[str, TableCost]:
+    """
+    Rows x columns per spec table from catalog statistics (duckdb_tables,
+    Parquet footers), without scanning any data.
+    """
+    stats = {
+        r[0]: (int(r[1] or 0), int(r[2] or 0))
+        for r in c.execute(
+            "SELECT table_name, estimated_size, column_count FROM duckdb_tables() "
+            "WHERE database_name = current_database();"
+        ).fetchall()
+    }
+    out: Dict[str, TableCost] = {}
+    for s in specs:
+        if s.source is None:
+            rows, columns = stats.get(s.name, (0, 0))
+        else:
+            columns = len(describe_columns(c, relation_sql(c, s.name, s)))
+            rows = _source_rows(c, s.name, s.source) // (columns if s.source.kind == "csv" else 1)
+        out[s.name] = TableCost(s.name, rows, columns)
+    return out
+
+
+def _lpt(loads: Sequence[Tuple[str, int]], bins: int) -> Tuple[List[List[str]], List[int]]:
+    """Longest-processing-time-first bin assignment; deterministic on ties."""
+    groups: List[List[str]] = [[] for _ in range(bins)]
+    totals = [0] * bins
+    heap = [(0, b) for b in range(bins)]
+    for name, load in sorted(loads, key=lambda x: (-x[1], x[0])):
+        total, i = heapq.heappop(heap)
+        groups[i].append(name)
+        totals[i] = total + load
+        heapq.heappush(heap, (totals[i], i))
+    return groups, totals
+
+
+def plan_shards(costs: Dict[str, TableCost], shards: int) -> List[List[str]]:
+    """
+    Split tables into at most `shards` groups of similar total cost. Each
+    group keeps the caller's table order; empty groups are dropped.
+    """
+    order = {name: i for i, name in enumerate(costs)}
+    bins = max(1, min(shards, len(costs)))
+    groups, _ = _lpt([(n, c.cells) for n, c in costs.items()], bins)
+    return [sorted(g, key=order.__getitem__) for g in groups if g]
+
+
+def estimate_sla(
+    costs: Dict[str, TableCost],
+    shards: int,
+    workers: int,
+    cells_per_second: float = DEFAULT_CELLS_PER_SECOND,
+    sla_seconds: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Wall time of a sharded run under the cost model: shard costs are
+    scheduled onto `workers` processes, each profiling `cells_per_second`.
+    With `sla_seconds`, also reports whether it fits and the fewest shards
+    (at one process each) that would.
+    """
+
+    def makespan(n_shards: int, n_workers: int) -> float:
+        plan = plan_shards(costs, n_shards)
+        loads = [(str(i), sum(costs[t].cells for t in g)) for i, g in enumerate(plan)]
+        groups, totals = _lpt(loads, max(1, min(n_workers, len(plan))))
+        per_worker = [
+            t / cells_per_second + SHARD_OVERHEAD_SECONDS * len(g)
+            for g, t in zip(groups, totals, strict=True)
+        ]
+        return max(per_worker, default=0.0)
+
+    seconds = makespan(shards, workers)
+    out: Dict[str, Any] = {
+        "tables": len(costs),
+        "cells": sum(c.cells for c in costs.values()),
+        "shards": len(plan_shards(costs, shards)),
+        "workers": workers,
+        "cells_per_second": cells_per_second,
+        "estimated_seconds": round(seconds, 1),
+    }
+    if sla_seconds is not None:
+        out["sla_seconds"] = sla_seconds
+        out["fits"] = seconds <= sla_seconds
+        # makespan shrinks as shards are added, so bisect for the smallest fit
+        lo, hi = 1, max(1, len(costs))
+        if makespan(hi, hi) > sla_seconds:
+            out["shards_needed"] = None
+        else:
+            while lo < hi:
+                mid = (lo + hi) // 2
+                lo, hi = (lo, mid) if makespan(mid, mid) <= sla_seconds else (mid + 1, hi)
+            out["shards_needed"] = lo
+    return out
+
+
+def calibrated_throughput(con: DuckDBConnector, last: int = 5) -> float:
+    """
+    Median cells/second per shard process over the last `last` sharded runs
+    recorded in dq_runs, or DEFAULT_CELLS_PER_SECOND before the first one.
+    """
+    with con.connect() as c:
+        c.execute(RUNS_SQL)
+        rows = c.execute(
+            "SELECT v FROM (SELECT created_at, TRY_CAST(json_extract(summary_json, "
+            "'$.sharding.cells_per_second') AS DOUBLE) AS v FROM dq_runs) "
+            "WHERE v > 0 ORDER BY created_at DESC LIMIT ?;",
+            (last,),
+        ).fetchall()
+    if not rows:
+        return float(DEFAULT_CELLS_PER_SECOND)
+    values = sorted(r[0] for r in rows)
+    return float(values[len(values) // 2])
+
+
+def _profile_shard(
+    db_path: str,
+    settings: DuckDBSettings,
+    specs: List["TableSpec"],
+    engine: str,
+    accuracy: str,
+    threads: int,
+    referenced: List["TableSpec"],
+) -> Dict[str, Any]:
+    """
+    Process-pool entry point: profile one shard over a read-only connection.
+    `referenced` are the specs of the shard's FK parents profiled elsewhere.
+    """
+    t0 = time.perf_counter()
+    with DuckDBConnector(Path(db_path), read_only=True, settings=settings) as con:
+        profiles, timings = profile_tables_parallel(
+            con,
+            specs,
+            ParallelConfig(max_workers=threads),
+            engine=engine,
+            accuracy=accuracy,
+            referenced=referenced,
+        )
+    return {"profiles": profiles, "timings": timings, "seconds": time.perf_counter() - t0}
+
+
+def _load_checkpoint(path: Path, tables: List[str]) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return data if data.get("tables") == tables else None
+
+
+def profile_tables_sharded(
+    con: DuckDBConnector,
+    specs: Sequence["TableSpec"],
+    shards: int = 4,
+    workers: Optional[int] = None,
+    accuracy: str = "exact",
+    retries: int = 1,
+    checkpoint_dir: Optional[Path] = None,
+    threads_per_shard: Optional[int] = None,
+) -> ShardedProfiles:
+    """
+    Profile `specs` in cost-balanced shards on a pool of `workers` processes,
+    each with its own read-only DuckDB connection (sql engine).
+
+    The plan and every finished shard are written to `checkpoint_dir`; a
+    later call with the same directory reuses the plan and only runs the
+    shards without a checkpoint. A failing shard is retried up to `retries`
+    times; if it still fails, ShardError is raised after the others finish.
+    Profiles and timings are merged in `specs` order.
+    """
+    if accuracy not in ACCURACY_MODES:
+        raise ValueError(f"accuracy must be one of {ACCURACY_MODES}, got {accuracy!r}")
+    by_name = {s.name: s for s in specs}
+
+    def parents(tables: List[str]) -> List["TableSpec"]:
+        names = dict.fromkeys(rt for t in tables for rt, _ in by_name[t].fk.values())
+        return [by_name[n] for n in names if n in by_name and n not in tables]
+
+    with con.connect() as c:
+        costs = estimate_costs(c, specs)
+
+    plan: Optional[List[List[str]]] = None
+    if checkpoint_dir is not None:
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        plan_path = checkpoint_dir / "plan.json"
+        if plan_path.exists():
+            stored = json.loads(plan_path.read_text(encoding="utf-8"))
+            if sorted(t for g in stored for t in g) == sorted(by_name):
+                plan = stored
+    if plan is None:
+        plan = plan_shards(costs, shards)
+        if checkpoint_dir is not None:
+            (checkpoint_dir / "plan.json").write_text(json.dumps(plan), encoding="utf-8")
+
+    workers = max(1, min(workers or len(plan), len(plan)))
+    threads = threads_per_shard or max(1, (os.cpu_count() or 1) // workers)
+    settings = DuckDBSettings(threads=threads)
+
+    results: Dict[int, Dict[str, Any]] = {}
+    attempts = dict.fromkeys(range(len(plan)), 0)
+    resumed = set()
+    for i, tables in enumerate(plan):
+        if checkpoint_dir is not None:
+            done = _load_checkpoint(checkpoint_dir / f"shard-{i:04d}.json", tables)
+            if done is not None:
+                results[i] = done
+                resumed.add(i)
+
+    # the shard processes need the file lock, so release any connection we hold
+    con.close()
+    failed: Dict[int, str] = {}
+    pending = [i for i in range(len(plan)) if i not in results]
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+
+        def submit(i: int) -> Future:
+            attempts[i] += 1
+            return pool.submit(
+                _profile_shard,
+                str(con.db_path),
+                settings,
+                [by_name[t] for t in plan[i]],
+                "sql",
+                accuracy,
+                threads,
+                parents(plan[i]),
+            )
+
+        running = {submit(i): i for i in pending}
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                i = running.pop(fut)
+                try:
+                    out = fut.result()
+                except Exception as e:  # any shard failure is retried
+                    if attempts[i] <= retries:
+                        running[submit(i)] = i
+                    else:
+                        failed[i] = f"{type(e).__name__}: {e}"
+                    continue
+                out["tables"] = plan[i]
+                results[i] = out
+                if checkpoint_dir is not None:
+                    path = checkpoint_dir / f"shard-{i:04d}.json"
+                    path.write_text(json.dumps(out, default=str), encoding="utf-8")
+    if failed:
+        raise ShardError(failed)
+
+    profiles: Dict[str, Dict[str, Any]] = {}
+    timings: Dict[str, float] = {}
+    for i in range(len(plan)):
+        profiles.update(results[i]["profiles"])
+        timings.update(results[i]["timings"])
+    shard_info = [
+        {
+            "shard": i,
+            "tables": len(tables),
+            "cells": sum(costs[t].cells for t in tables),
+            "seconds": round(float(results[i]["seconds"]), 4),
+            "attempts": attempts[i],
+            "resumed": i in resumed,
+        }
+        for i, tables in enumerate(plan)
+    ]
+    return ShardedProfiles(
+        profiles={s.name: profiles[s.name] for s in specs},
+        timings={s.name: timings[s.name] for s in specs},
+        costs=costs,
+        shards=shard_info,
+    )
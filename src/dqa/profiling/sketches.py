@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import base64
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# HyperLogLog precision: 2**12 registers, ~1.6% relative standard error.
+HLL_PRECISION = 12
+# t-digest compression (delta). Larger keeps more centroids and tighter tails.
+TDIGEST_COMPRESSION = 200
+# Confidence level that recorded error bounds hold at, and its two-sided z-score.
+ERROR_CONFIDENCE = 0.99
+_Z = 2.576
+
+
+class HyperLogLog:
+    """
+    Mergeable distinct-count sketch over 64-bit hashes.
+
+    Registers are indexed by the top `p` bits and store the position of the
+    lowest set bit of the remaining bits, so the same state can be built in
+    DuckDB (see `hll_registers_sql`) or in Python. Sketches built from
+    different hash functions must not be merged; `hash_fn` guards that.
+    """
+
+    def __init__(self, p: int = HLL_PRECISION, hash_fn: str = "duckdb"):
+        self.p = p
+        self.hash_fn = hash_fn
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    @property
+    def m(self) -> int:
+        return 1 << self.p
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        h = np.asarray(hashes, dtype=np.uint64)
+        if not len(h):
+            return
+        idx = (h >> np.uint64(64 - self.p)).astype(np.int64)
+        w = h & np.uint64((1 << (64 - self.p)) - 1)
+        rho = np.full(len(h), 64 - self.p + 1, dtype=np.uint8)
+        nz = w != 0
+        # w ^ (w - 1) == 2**rho - 1, where rho is the 1-based lowest set bit
+        low = w[nz] ^ (w[nz] - np.uint64(1))
+        rho[nz] = np.log2((low + np.uint64(1)).astype(np.float64)).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rho)
+
+    def set_registers(self, pairs: Iterable[Tuple[int, int]]) -> None:
+        for idx, rho in pairs:
+            if rho > self.registers[idx]:
+                self.registers[idx] = rho
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if (other.p, other.hash_fn) != (self.p, self.hash_fn):
+            raise ValueError("cannot merge HyperLogLog sketches with different p or hash_fn")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self) -> float:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)
+        return raw
+
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(self.m)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "p": self.p,
+            "hash_fn": self.hash_fn,
+            "registers": base64.b64encode(self.registers.tobytes()).decode("ascii"),
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "HyperLogLog":
+        out = cls(p=int(d["p"]), hash_fn=str(d["hash_fn"]))
+        out.registers = np.frombuffer(base64.b64decode(d["registers"]), dtype=np.uint8).copy()
+        return out
+
+
+def _k1(q: np.ndarray, delta: float) -> np.ndarray:
+    """t-digest k1 scale function: small centroids at the tails, large in the middle."""
+    return delta / (2 * math.pi) * np.arcsin(2 * np.clip(q, 0.0, 1.0) - 1)
+
+
+class TDigest:
+    """
+    Mergeable quantile sketch holding (mean, weight) centroids.
+
+    Centroids can come from DuckDB (see `tdigest_bucket_sql`), from raw
+    values via `update`, or from other digests via `merge`; all three are
+    re-compressed with the same k1 scale function.
+    """
+
+    def __init__(self, compression: float = TDIGEST_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0, dtype=np.float64)
+        self.weights = np.empty(0, dtype=np.float64)
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def _extend(self, means: np.ndarray, weights: np.ndarray, lo: float, hi: float) -> None:
+        self.means = np.concatenate([self.means, means])
+        self.weights = np.concatenate([self.weights, weights])
+        self.min = lo if self.min is None else min(self.min, lo)
+        self.max = hi if self.max is None else max(self.max, hi)
+        self._compress()
+
+    def update(self, values: Sequence[float]) -> None:
+        v = np.asarray(values, dtype=np.float64)
+        v = v[~np.isnan(v)]
+        if not len(v):
+            return
+        self._extend(v, np.ones(len(v)), float(v.min()), float(v.max()))
+
+    def add_centroids(
+        self,
+        centroids: Iterable[Tuple[float, float]],
+        lo: Optional[float] = None,
+        hi: Optional[float] = None,
+    ) -> None:
+        """Add pre-aggregated centroids; pass the exact `lo`/`hi` when known."""
+        cs = list(centroids)
+        if not cs:
+            return
+        arr = np.asarray(cs, dtype=np.float64)
+        lo = float(arr[:, 0].min()) if lo is None else float(lo)
+        hi = float(arr[:, 0].max()) if hi is None else float(hi)
+        self._extend(arr[:, 0], arr[:, 1], lo, hi)
+
+    def scale(self, factor: float) -> "TDigest":
+        """Reweight centroids, e.g. to extrapolate a digest built from a sample."""
+        self.weights = self.weights * float(factor)
+        return self
+
+    def rank_error(self, q: float) -> float:
+        """
+        Rank error bound at `q`: half the widest k1 centroid there, which
+        spans 2*pi*sqrt(q(1-q))/delta of the distribution.
+        """
+        return math.pi * math.sqrt(max(q * (1.0 - q), 0.0)) / self.compression
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        if other.min is not None:
+            self._extend(other.means, other.weights, other.min, other.max)
+        return self
+
+    def _compress(self) -> None:
+        if len(self.means) <= 1:
+            return
+        order = np.argsort(self.means, kind="stable")
+        means, weights = self.means[order], self.weights[order]
+        total = weights.sum()
+        mid = (np.cumsum(weights) - weights / 2) / total
+        # every output centroid spans at most one unit of k-space
+        bucket = np.floor(_k1(mid, self.compression) + self.compression / 4).astype(np.int64)
+        _, inv = np.unique(bucket, return_inverse=True)
+        w = np.bincount(inv, weights=weights)
+        self.means = np.bincount(inv, weights=means * weights) / w
+        self.weights = w
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.min is None or not len(self.means):
+            return None
+        if len(self.means) == 1:
+            return float(self.means[0])
+        total = self.weights.sum()
+        # centroid centres in rank space, anchored at the exact min and max
+        centres = np.cumsum(self.weights) - self.weights / 2
+        xs = np.concatenate([[0.0], centres, [total]])
+        ys = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * total, xs, ys))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "compression": self.compression,
+            "min": self.min,
+            "max": self.max,
+            "centroids": [
+                [float(m), float(w)] for m, w in zip(self.means, self.weights, strict=True)
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "TDigest":
+        out = cls(compression=float(d["compression"]))
+        cs = d.get("centroids") or []
+        if cs:
+            arr = np.asarray(cs, dtype=np.float64)
+            out.means, out.weights = arr[:, 0], arr[:, 1]
+        out.min, out.max = d.get("min"), d.get("max")
+        return out
+
+
+def sample_rank_error(n: int, confidence: float = ERROR_CONFIDENCE) -> float:
+    """
+    Dvoretzky-Kiefer-Wolfowitz bound: with probability `confidence`, every
+    quantile rank and value frequency estimated from `n` uniform samples is
+    off by at most this fraction of the population.
+    """
+    if n <= 0:
+        return 1.0
+    return math.sqrt(math.log(2.0 / (1.0 - confidence)) / (2.0 * n))
+
+
+def error_bounds(
+    hll: Dict[str, HyperLogLog],
+    digests: Dict[str, TDigest],
+    top_k_errors: Dict[str, int],
+    sample_errors: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    The "accuracy" block of an approximate profile. `sample_errors` is the
+    extra rank error per column whose sketches were built from a sample.
+    `p99_bounds` is the value interval the true p99 falls in; the anomaly
+    detectors compare those instead of the point estimates.
+    """
+    rel = max((h.relative_error() for h in hll.values()), default=0.0)
+    rank_error: Dict[str, float] = {}
+    p99_bounds: Dict[str, List[float]] = {}
+    for x, td in digests.items():
+        if td.min is None:
+            continue
+        err = td.rank_error(0.99) + (sample_errors or {}).get(x, 0.0)
+        rank_error[x] = err
+        p99_bounds[x] = [td.quantile(max(0.0, 0.99 - err)), td.quantile(min(1.0, 0.99 + err))]
+    return {
+        "mode": "approximate",
+        "confidence": ERROR_CONFIDENCE,
+        "distinct_rel_error": _Z * rel,
+        "quantile_rank_error": rank_error,
+        "p99_bounds": p99_bounds,
+        "top_k_count_error": dict(top_k_errors),
+    }
+
+
+def hll_registers_sql(hash_expr: str, p: int = HLL_PRECISION) -> Tuple[str, str]:
+    """SQL expressions for (register index, rho) of a UBIGINT hash expression."""
+    low_bits = 64 - p
+    w = f"({hash_expr} & ((1::UBIGINT << {low_bits}) - 1))"
+    idx = f"({hash_expr} >> {low_bits})"
+    rho = f"(CASE WHEN {w} = 0 THEN {low_bits + 1} ELSE bit_count(xor({w}, {w} - 1)) END)"
+    return idx, rho
+
+
+def tdigest_bucket_sql(rank_expr: str, count_expr: str, delta: float = TDIGEST_COMPRESSION) -> str:
+    """SQL expression assigning each ranked value to a k1-scaled t-digest centroid."""
+    q = f"(({rank_expr} - 0.5) / {count_expr})"
+    return f"floor({delta} / (2 * pi()) * asin(2 * {q} - 1) + {delta / 4})"
+
+
+def merge_top_counts(parts: Iterable[Dict[str, int]], k: int) -> List[Dict[str, Any]]:
+    """Sum per-partition heavy-hitter counts and keep the k largest."""
+    total: Dict[str, int] = {}
+    for p in parts:
+        for v, n in p.items():
+            total[v] = total.get(v, 0) + int(n)
+    top = sorted(total.items(), key=lambda kv: (-kv[1], kv[0]))[:k]
+    return [{"value": v, "count": n} for v, n in top]
+
+
+class SpaceSaving:
+    """
+    Mergeable heavy-hitters summary with at most `capacity` counters.
+
+    Counts are upper bounds and `errors` bound their overestimate; any value
+    not tracked occurred at most `floor` times. Batches are folded in with a
+    vectorized merge, so updates cost one value_counts per batch.
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.floor = 0
+
+    def update(self, values: Iterable[Any]) -> None:
+        vc = pd.Series(values, dtype=object).dropna().astype(str).value_counts()
+        other = SpaceSaving(self.capacity)
+        other.counts = {str(k): int(v) for k, v in vc.head(self.capacity).items()}
+        other.errors = dict.fromkeys(other.counts, 0)
+        other.floor = int(vc.iloc[self.capacity]) if len(vc) > self.capacity else 0
+        self.merge(other)
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        keys = set(self.counts) | set(other.counts)
+        counts = {
+            k: self.counts.get(k, self.floor) + other.counts.get(k, other.floor) for k in keys
+        }
+        errors = {
+            k: self.errors.get(k, self.floor) + other.errors.get(k, other.floor) for k in keys
+        }
+        ranked = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        kept, dropped = ranked[: self.capacity], ranked[self.capacity :]
+        self.floor = max(self.floor + other.floor, dropped[0][1] if dropped else 0)
+        self.counts = dict(kept)
+        self.errors = {k: errors[k] for k, _ in kept}
+        return self
+
+    def scale(self, factor: float) -> "SpaceSaving":
+        """Extrapolate counts (and their error bounds), e.g. from a sample."""
+        f = float(factor)
+        self.counts = {k: int(round(n * f)) for k, n in self.counts.items()}
+        self.errors = {k: int(math.ceil(e * f)) for k, e in self.errors.items()}
+        self.floor = int(math.ceil(self.floor * f))
+        return self
+
+    def top(self, k: int) -> List[Dict[str, Any]]:
+        ranked = sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))[:k]
+        return [{"value": v, "count": int(n)} for v, n in ranked]
+
+    def max_error(self) -> int:
+        return max([self.floor, *self.errors.values()])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "floor": self.floor,
+            "items": [[v, self.counts[v], self.errors[v]] for v in self.counts],
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "SpaceSaving":
+        out = cls(capacity=int(d["capacity"]))
+        out.floor = int(d["floor"])
+        for v, n, e in d.get("items", []):
+            out.counts[str(v)] = int(n)
+            out.errors[str(v)] = int(e)
+        return out
+
+
+class BloomFilter:
+    """Bit-array Bloom filter over 64-bit hashes (double hashing)."""
+
+    def __init__(
+        self, expected_items: int, fp_rate: float = 0.01, max_bytes: Optional[int] = None
+    ):
+        n = max(1, int(expected_items))
+        bits = int(math.ceil(-n * math.log(fp_rate) / (math.log(2) ** 2)))
+        if max_bytes is not None:
+            bits = min(bits, max_bytes * 8)
+        self.m = max(64, bits)
+        self.k = max(1, int(round(self.m / n * math.log(2))))
+        self.bits = np.zeros((self.m + 7) // 8, dtype=np.uint8)
+
+    def _positions(self, hashes: np.ndarray) -> np.ndarray:
+        h = np.asarray(hashes, dtype=np.uint64)
+        h1 = (h & np.uint64(0xFFFFFFFF)).astype(np.uint64)
+        h2 = (h >> np.uint64(32)) | np.uint64(1)
+        i = np.arange(self.k, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + i * h2[None, :]) % np.uint64(self.m)).astype(np.int64)
+
+    def add_and_check(self, hashes: np.ndarray) -> np.ndarray:
+        """Insert `hashes`; True where a hash was (probably) seen before or earlier in the batch."""
+        h = np.asarray(hashes, dtype=np.uint64)
+        if not len(h):
+            return np.zeros(0, dtype=bool)
+        pos = self._positions(h)
+        seen = np.all((self.bits[pos >> 3] >> (pos & 7).astype(np.uint8)) & 1, axis=0)
+        _, first = np.unique(h, return_index=True)
+        in_batch = np.ones(len(h), dtype=bool)
+        in_batch[first] = False
+        np.bitwise_or.at(self.bits, pos.ravel() >> 3, (1 << (pos.ravel() & 7)).astype(np.uint8))
+        return seen | in_batch
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.bits.nbytes)
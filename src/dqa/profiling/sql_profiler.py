@@ -0,0 +1,714 @@
+from __future__ import annotations
+
+import uuid
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import duckdb
+
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.connectors.sources import relation_sql, spec_relations
+from dqa.profiling.sampling import (
+    gee_distinct,
+    quantile_rank_interval,
+    resolve_policies,
+    wilson_interval,
+)
+from dqa.profiling.sketches import (
+    ERROR_CONFIDENCE,
+    HyperLogLog,
+    SpaceSaving,
+    TDigest,
+    error_bounds,
+    hll_registers_sql,
+    sample_rank_error,
+)
+
+if TYPE_CHECKING:
+    from dqa.profiling.profiler import TableSpec
+    from dqa.profiling.sampling import SamplingSpec
+
+TOP_K = 10
+QUANTILES = (0.50, 0.95, 0.99)
+ACCURACY_MODES = ("exact", "approximate")
+# Reservoir size that approximate quantiles and top-k are estimated from.
+APPROX_SAMPLE_ROWS = 100_000
+_SAMPLE_SEED = 42
+# Offending keys reported per FK violation.
+FK_SAMPLE_KEYS = 5
+# Duplicated keys reported per key.
+KEY_SAMPLE_KEYS = 5
+
+# (table, column, ref_table, ref_column)
+FkCheck = Tuple[str, str, str, str]
+
+# DuckDB GROUPING() returns a BIGINT bitmask, so top-k grouping sets are chunked.
+_MAX_GROUPING_COLUMNS = 32
+
+_NUMERIC_PREFIXES = (
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "UHUGEINT",
+    "FLOAT", "DOUBLE", "DECIMAL", "REAL",
+)
+_TIMESTAMP_PREFIXES = ("TIMESTAMP", "DATE")
+
+
+def _q(ident: str) -> str:
+    return '"' + ident.replace('"', '""') + '"'
+
+
+def duckdb_kind(column_type: str) -> str:
+    """Map a DuckDB column type to the profiler's numeric/timestamp/categorical kinds."""
+    t = column_type.upper()
+    if t.startswith(_NUMERIC_PREFIXES):
+        return "numeric"
+    if t.startswith(_TIMESTAMP_PREFIXES):
+        return "timestamp"
+    return "categorical"
+
+
+def describe_columns(c: duckdb.DuckDBPyConnection, table: str) -> Dict[str, str]:
+    rows = c.execute(f"DESCRIBE SELECT * FROM {table};").fetchall()
+    return {str(r[0]): str(r[1]) for r in rows}
+
+
+def compile_aggregate_query(
+    table: str,
+    col_types: Dict[str, str],
+    ts_columns: Sequence[str],
+    approximate: bool = False,
+    nulls_only: Sequence[str] = (),
+) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Compile one aggregate SELECT covering row count, null/distinct counts,
+    numeric stats and freshness. Returns the SQL and the (column, metric)
+    label of every output position. `ts_columns` must be timestamp columns.
+    With `approximate`, distinct counts and quantiles are left out; they
+    come from sketches instead. Columns in `nulls_only` only get their
+    non-null count.
+    """
+    exprs: List[str] = ["count(*)"]
+    labels: List[Tuple[str, str]] = [("", "row_count")]
+
+    for c, kind in col_types.items():
+        qc = _q(c)
+        exprs.append(f"count({qc})")
+        labels.append((c, "non_null"))
+        if c in nulls_only:
+            continue
+        if not approximate:
+            exprs.append(f"count(DISTINCT {qc})")
+            labels.append((c, "distinct"))
+        if kind == "numeric":
+            v = f"{qc}::DOUBLE"
+            exprs += [f"min({v})", f"max({v})", f"avg({v})", f"stddev_pop({v})"]
+            labels += [(c, "min"), (c, "max"), (c, "mean"), (c, "std")]
+            if not approximate:
+                qs = ", ".join(str(q) for q in QUANTILES)
+                exprs.append(f"quantile_cont({v}, [{qs}])")
+                labels.append((c, "quantiles"))
+
+    for ts in ts_columns:
+        exprs.append(f"max({_q(ts)})::TIMESTAMP")
+        labels.append((ts, "freshness"))
+
+    sql = "SELECT\n  " + ",\n  ".join(exprs) + f"\nFROM {table};"
+    return sql, labels
+
+
+def compile_top_k_query(table: str, columns: Sequence[str], k: int = TOP_K) -> str:
+    """
+    Top-k value counts for several columns in one scan, via GROUPING SETS.
+    Each output row carries the GROUPING() bitmask identifying its column.
+    """
+    cols = [_q(c) for c in columns]
+    n = len(cols)
+    gids = [(2**n - 1) - 2 ** (n - 1 - i) for i in range(n)]
+    keep = " OR ".join(
+        f"(_gid = {g} AND {qc} IS NOT NULL)" for g, qc in zip(gids, cols, strict=True)
+    )
+    sets = ", ".join(f"({qc})" for qc in cols)
+    return f"""
+    WITH g AS (
+      SELECT GROUPING({", ".join(cols)}) AS _gid, {", ".join(cols)}, count(*) AS _n
+      FROM {table}
+      GROUP BY GROUPING SETS ({sets})
+    )
+    SELECT _gid, {", ".join(cols)}, _n
+    FROM g
+    WHERE {keep}
+    QUALIFY row_number() OVER (PARTITION BY _gid ORDER BY _n DESC, {", ".join(cols)}) <= {k}
+    ORDER BY _gid, _n DESC, {", ".join(cols)};
+    """
+
+
+def compile_sample_query(
+    table: str, select: str, sampling: "SamplingSpec", row_count: int
+) -> str:
+    """SELECT `select` over a sample of about `sampling.rows` of `row_count` rows."""
+    if sampling.method == "reservoir":
+        return (
+            f"SELECT {select} FROM {table} "
+            f"USING SAMPLE reservoir({sampling.rows} ROWS) REPEATABLE ({sampling.seed})"
+        )
+    percent = min(100.0, 100.0 * sampling.rows / max(1, row_count))
+    if sampling.method == "bernoulli":
+        return (
+            f"SELECT {select} FROM {table} "
+            f"USING SAMPLE {percent!r} PERCENT (bernoulli, {sampling.seed})"
+        )
+    day = f"date_trunc('day', _t.{_q(sampling.stratify_by)})"
+    # rows are ranked within their day by a seeded hash of the whole row
+    return f"""
+    SELECT {select} FROM {table} AS _t
+    QUALIFY row_number() OVER (PARTITION BY {day} ORDER BY hash(_t, {sampling.seed}))
+            <= ceil({percent / 100.0!r} * count(*) OVER (PARTITION BY {day}))
+    """
+
+
+def key_label(columns: Sequence[str]) -> str:
+    """Name of a (possibly composite) key in profiles and findings."""
+    return "+".join(columns)
+
+
+def compile_key_query(
+    table: str, keys: Sequence[Sequence[str]], sample_keys: int = KEY_SAMPLE_KEYS
+) -> Tuple[str, List[str], Dict[int, int]]:
+    """
+    Duplicate check of every key of a table in one scan: a GROUPING SETS
+    aggregation with one hash table per key, keeping only groups seen more
+    than once. Yields (grouping id, duplicate rows, duplicate groups, key
+    columns..., group rows) for up to `sample_keys` largest groups per key.
+    Returns the SQL, the grouped columns and the key index per grouping id.
+    """
+    cols = list(dict.fromkeys(x for k in keys for x in k))
+    n = len(cols)
+    gid_to_key = {
+        sum(2 ** (n - 1 - j) for j, x in enumerate(cols) if x not in k): i
+        for i, k in enumerate(keys)
+    }
+    sets = ", ".join("(" + ", ".join(_q(x) for x in k) + ")" for k in keys)
+    grouped = ", ".join(_q(x) for x in cols)
+    sql = f"""
+    WITH _dup AS (
+      SELECT GROUPING({grouped}) AS _gid, {grouped}, count(*) AS _n
+      FROM {table}
+      GROUP BY GROUPING SETS ({sets})
+      HAVING count(*) > 1
+    )
+    SELECT _gid, sum(_n) OVER _w, count(*) OVER _w, {grouped}, _n
+    FROM _dup
+    WINDOW _w AS (PARTITION BY _gid)
+    QUALIFY row_number() OVER (PARTITION BY _gid ORDER BY _n DESC, {grouped})
+            <= {max(1, sample_keys)}
+    ORDER BY _gid, _n DESC, {grouped};
+    """
+    return sql, cols, gid_to_key
+
+
+def run_key_checks(
+    c: duckdb.DuckDBPyConnection,
+    relation: str,
+    keys: Sequence[Sequence[str]],
+    row_count: int,
+    sample_keys: int = KEY_SAMPLE_KEYS,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Duplicates per key, by `key_label`: columns, duplicate rows (rows whose
+    key occurs more than once), duplicate groups, their rate over
+    `row_count` and the most repeated keys (strings; lists for composite
+    keys). NULL key values group together, as in pandas' duplicated().
+    """
+    out = {
+        key_label(k): {
+            "columns": list(k),
+            "duplicate_rows": 0,
+            "duplicate_groups": 0,
+            "duplicate_rate": 0.0,
+            "sample_keys": [],
+        }
+        for k in keys
+    }
+    # GROUPING() is a BIGINT bitmask: keep each query within its width
+    batch: List[Sequence[str]] = []
+    batches: List[List[Sequence[str]]] = [batch]
+    for k in keys:
+        if len(set(x for b in batch for x in b) | set(k)) > _MAX_GROUPING_COLUMNS and batch:
+            batch = []
+            batches.append(batch)
+        batch.append(k)
+    for chunk in batches:
+        if not chunk:
+            continue
+        sql, cols, gid_to_key = compile_key_query(relation, chunk, sample_keys)
+        pos = {x: j for j, x in enumerate(cols)}
+        for row in c.execute(sql).fetchall():
+            key = chunk[gid_to_key[int(row[0])]]
+            info = out[key_label(key)]
+            info["duplicate_rows"] = int(row[1])
+            info["duplicate_groups"] = int(row[2])
+            info["duplicate_rate"] = int(row[1]) / row_count if row_count else 0.0
+            values = [None if row[3 + pos[x]] is None else str(row[3 + pos[x]]) for x in key]
+            info["sample_keys"].append(values[0] if len(key) == 1 else values)
+    return out
+
+
+def compile_fk_query(
+    checks: Sequence[FkCheck],
+    sample_keys: int = FK_SAMPLE_KEYS,
+    relations: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    One batched anti-join over FK checks (table, column, ref_table, ref_column).
+    Each referenced key set is built once as a materialized CTE and probed
+    by every column that references it. Yields (check index, bad rows,
+    offending key, its rows) for up to `sample_keys` most frequent
+    offending keys per check; checks without violations yield no rows.
+    `relations` maps table names to the FROM items to read (see
+    `relation_sql`); unmapped tables are read by name.
+    """
+    rel = relations or {}
+    refs: Dict[Tuple[str, str], str] = {}
+    ctes: List[str] = []
+    for _, _, rt, rc in checks:
+        if (rt, rc) not in refs:
+            name = refs[(rt, rc)] = f"_ref{len(refs)}"
+            ctes.append(
+                f"{name} AS MATERIALIZED "
+                f"(SELECT DISTINCT {_q(rc)} AS _k FROM {rel.get(rt, rt)} "
+                f"WHERE {_q(rc)} IS NOT NULL)"
+            )
+    branches = [
+        f"SELECT {i} AS _i, _t.{_q(col)}::VARCHAR AS _v FROM {rel.get(t, t)} AS _t "
+        f"ANTI JOIN {refs[(rt, rc)]} AS _r ON _t.{_q(col)} = _r._k "
+        f"WHERE _t.{_q(col)} IS NOT NULL"
+        for i, (t, col, rt, rc) in enumerate(checks)
+    ]
+    return f"""
+    WITH {", ".join(ctes)},
+    _bad AS (
+      {" UNION ALL ".join(branches)}
+    ),
+    _per_key AS (SELECT _i, _v, count(*) AS _n FROM _bad GROUP BY _i, _v)
+    SELECT _i, sum(_n) OVER (PARTITION BY _i) AS _bad_rows, _v, _n
+    FROM _per_key
+    QUALIFY row_number() OVER (PARTITION BY _i ORDER BY _n DESC, _v) <= {max(1, sample_keys)}
+    ORDER BY _i, _n DESC, _v;
+    """
+
+
+def run_fk_checks(
+    c: duckdb.DuckDBPyConnection,
+    checks: Sequence[FkCheck],
+    row_counts: Dict[str, int],
+    sample_keys: int = FK_SAMPLE_KEYS,
+    relations: Optional[Dict[str, str]] = None,
+) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    FK violations keyed by (table, column): bad rows, bad rate and sample
+    offending keys. `relations` holds the FROM item of every table not read
+    from the warehouse (see `spec_relations`).
+    """
+    out: Dict[Tuple[str, str], Dict[str, Any]] = {
+        (t, col): {"bad_rows": 0, "bad_rate": 0.0, "sample_keys": []} for t, col, _, _ in checks
+    }
+    if not checks:
+        return out
+    relations = dict(relations or {})
+    for t, _, rt, _ in checks:
+        for name in (t, rt):
+            relations.setdefault(name, name)
+    sql = compile_fk_query(checks, sample_keys, relations)
+    for i, bad, key, _ in c.execute(sql).fetchall():
+        t, col = checks[i][0], checks[i][1]
+        info = out[(t, col)]
+        info["bad_rows"] = int(bad)
+        info["bad_rate"] = int(bad) / row_counts[t] if row_counts.get(t) else 0.0
+        if len(info["sample_keys"]) < sample_keys:
+            info["sample_keys"].append(key)
+    return out
+
+
+def run_key_fk_checks(
+    c: duckdb.DuckDBPyConnection,
+    table: str,
+    spec: "TableSpec",
+    columns: Sequence[str],
+    row_count: int,
+    relation: Optional[str] = None,
+    available: Optional[Sequence[str]] = None,
+    relations: Optional[Dict[str, str]] = None,
+) -> Tuple[Dict[str, float], Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """
+    Key duplicate rates, key duplicate details (see `run_key_checks`) and FK
+    violations for the spec columns present in `columns`. A composite key
+    runs where its first column is in `columns` and all of its columns are
+    in `available` (default: `columns`), so column groups check it once.
+    `relation` is the FROM item of `table` when it is not a warehouse table,
+    `relations` those of referenced tables that are not.
+    """
+    relation = relation or table
+    have = set(columns if available is None else available)
+    key_dupes: Dict[str, float] = {}
+    key_info: Dict[str, Dict[str, Any]] = {}
+    fk_violations: Dict[str, Dict[str, Any]] = {}
+    if not row_count:
+        return key_dupes, key_info, fk_violations
+    keys = [k for k in spec.keys if k[0] in columns and have.issuperset(k)]
+    if keys:
+        key_info = run_key_checks(c, relation, keys, row_count)
+        key_dupes = {label: info["duplicate_rate"] for label, info in key_info.items()}
+    checks = [(table, col, rt, rc) for col, (rt, rc) in spec.fk.items() if col in columns]
+    relations = {**(relations or {}), table: relation}
+    found = run_fk_checks(c, checks, {table: row_count}, relations=relations)
+    for (_, col), info in found.items():
+        fk_violations[col] = info
+    return key_dupes, key_info, fk_violations
+
+
+def hll_sketches(
+    c: duckdb.DuckDBPyConnection, table: str, columns: Sequence[str]
+) -> Dict[str, HyperLogLog]:
+    """HyperLogLog sketches for `columns`, built in one scan of at most 2**p groups per column."""
+    out = {x: HyperLogLog() for x in columns}
+    if not columns:
+        return out
+    hashed = ", ".join(
+        f"CASE WHEN {_q(x)} IS NOT NULL THEN hash({_q(x)}) END AS {_q(x)}" for x in columns
+    )
+    idx, rho = hll_registers_sql("_v")
+    sql = f"""
+    SELECT _col, {idx} AS _i, max({rho}) AS _r
+    FROM (
+      UNPIVOT (SELECT {hashed} FROM {table})
+      ON {", ".join(_q(x) for x in columns)} INTO NAME _col VALUE _v
+    )
+    GROUP BY _col, _i;
+    """
+    for col, i, r in c.execute(sql).fetchall():
+        out[col].set_registers([(int(i), int(r))])
+    return out
+
+
+def _approximate_sketches(
+    c: duckdb.DuckDBPyConnection,
+    table: str,
+    col_types: Dict[str, str],
+    metrics: Dict[Tuple[str, str], Any],
+    row_count: int,
+) -> Tuple[
+    Dict[str, HyperLogLog], Dict[str, TDigest], Dict[str, SpaceSaving], Dict[str, float]
+]:
+    """
+    Distinct-count sketches over the full table, plus quantile and top-k
+    sketches from a reservoir sample of at most APPROX_SAMPLE_ROWS rows,
+    extrapolated to the table. Also returns each sampled column's rank
+    error, which depends on how many non-null values the sample holds.
+    """
+    hll = hll_sketches(c, table, list(col_types))
+    numeric = [x for x, k in col_types.items() if k == "numeric"]
+    categorical = [x for x, k in col_types.items() if k == "categorical"]
+    digests = {x: TDigest() for x in numeric}
+    heavy = {x: SpaceSaving() for x in categorical}
+    sample_errors: Dict[str, float] = {}
+    cols = [x for x in numeric + categorical if metrics[(x, "non_null")]]
+    if not cols:
+        return hll, digests, heavy, sample_errors
+
+    sampled = row_count > APPROX_SAMPLE_ROWS
+    using = f" USING SAMPLE reservoir({APPROX_SAMPLE_ROWS} ROWS) REPEATABLE ({_SAMPLE_SEED})"
+    sql = f"SELECT {', '.join(_q(x) for x in cols)} FROM {table}"
+    sample = c.execute(sql + (using if sampled else "") + ";").fetchdf()
+
+    for x in cols:
+        vals = sample[x].dropna()
+        if not len(vals):
+            # too sparse to show up in the shared sample: sample its non-null rows alone
+            vals = c.execute(
+                f"SELECT {_q(x)} FROM (SELECT {_q(x)} FROM {table} WHERE {_q(x)} IS NOT NULL)"
+                f"{using};"
+            ).fetchdf()[x]
+        non_null = int(metrics[(x, "non_null")])
+        sample_errors[x] = sample_rank_error(len(vals)) if len(vals) < non_null else 0.0
+        if x in digests:
+            td = digests[x]
+            td.update(vals.to_numpy(dtype="float64"))
+            td.scale(non_null / len(vals))
+            # anchor the tails at the exact extremes from the aggregate pass
+            td.min, td.max = float(metrics[(x, "min")]), float(metrics[(x, "max")])
+        else:
+            heavy[x].update(vals.astype(str))
+            heavy[x].scale(non_null / len(vals))
+    return hll, digests, heavy, sample_errors
+
+
+@contextmanager
+def _sample_source(
+    c: duckdb.DuckDBPyConnection,
+    table: str,
+    columns: Sequence[str],
+    sampling: Optional["SamplingSpec"],
+    row_count: int,
+) -> Iterator[str]:
+    """`table`, or a temp table holding a sample of `columns` when sampling applies."""
+    if sampling is None or row_count <= sampling.rows:
+        yield table
+        return
+    name = f"_dq_sample_{uuid.uuid4().hex[:12]}"
+    select = ", ".join(_q(x) for x in columns) or "NULL AS _none"
+    c.execute(
+        f"CREATE TEMP TABLE {name} AS {compile_sample_query(table, select, sampling, row_count)};"
+    )
+    try:
+        yield name
+    finally:
+        c.execute(f"DROP TABLE IF EXISTS {name};")
+
+
+def _sample_bounds(
+    c: duckdb.DuckDBPyConnection,
+    sample: str,
+    col_types: Dict[str, str],
+    full_types: Dict[str, str],
+    metrics: Dict[Tuple[str, str], Any],
+    population: int,
+) -> Tuple[Dict[str, Any], Dict[str, int]]:
+    """
+    Confidence intervals of sample-based metrics: Wilson intervals for null
+    rates, order-statistic intervals for p99 and GEE bounds for distinct
+    counts (whose estimates are returned too).
+    """
+    n = int(metrics[("", "row_count")])
+    nulls = {
+        x: list(wilson_interval(n - int(metrics[(x, "non_null")]), n, ERROR_CONFIDENCE))
+        for x in col_types
+    }
+    numeric = [x for x, k in full_types.items() if k == "numeric" and metrics[(x, "non_null")]]
+    p99: Dict[str, List[float]] = {}
+    if numeric:
+        exprs = []
+        for x in numeric:
+            lo, hi = quantile_rank_interval(0.99, int(metrics[(x, "non_null")]), ERROR_CONFIDENCE)
+            exprs.append(f"quantile_cont({_q(x)}::DOUBLE, [{lo!r}, {hi!r}])")
+        row = c.execute(f"SELECT {', '.join(exprs)} FROM {sample};").fetchone()
+        p99 = {x: [float(v) for v in bounds] for x, bounds in zip(numeric, row, strict=True)}
+
+    distinct: Dict[str, List[int]] = {}
+    estimates: Dict[str, int] = {}
+    cols = [x for x in full_types if metrics[(x, "non_null")]]
+    if cols:
+        # values seen exactly once in the sample, per column
+        sql = f"""
+        SELECT _col, count(*) FILTER (WHERE _n = 1)
+        FROM (
+          SELECT _col, _v, count(*) AS _n
+          FROM (
+            UNPIVOT (SELECT {", ".join(f"{_q(x)}::VARCHAR AS {_q(x)}" for x in cols)}
+                     FROM {sample})
+            ON {", ".join(_q(x) for x in cols)} INTO NAME _col VALUE _v
+          )
+          GROUP BY _col, _v
+        )
+        GROUP BY _col;
+        """
+        singletons = dict(c.execute(sql).fetchall())
+        for x in cols:
+            non_null = int(metrics[(x, "non_null")])
+            est, lo, hi = gee_distinct(
+                int(metrics[(x, "distinct")]),
+                int(singletons.get(x, 0)),
+                non_null,
+                int(round(population * non_null / n)),
+            )
+            estimates[x] = est
+            distinct[x] = [lo, hi]
+    bounds = {
+        "mode": "sampled",
+        "confidence": ERROR_CONFIDENCE,
+        "null_rate_bounds": nulls,
+        "p99_bounds": p99,
+        "distinct_bounds": distinct,
+    }
+    return bounds, estimates
+
+
+def profile_relation(
+    c: duckdb.DuckDBPyConnection,
+    table: str,
+    spec: "TableSpec",
+    columns: Optional[Sequence[str]] = None,
+    accuracy: str = "exact",
+    relations: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Profile `table` on an open DuckDB connection or cursor. Only aggregates
+    are fetched. `columns` restricts column-level metrics to a subset; key,
+    FK and freshness checks are only run for columns inside that subset.
+    With `spec.source`, the rows are read from that source in place;
+    `relations` does the same for FK parents (see `spec_relations`).
+
+    With `accuracy="approximate"`, distinct counts come from HyperLogLog and
+    quantiles/top-k from t-digest/Space-Saving over a reservoir sample, so
+    no per-column sort or full hash table is built. Row counts, null rates,
+    min/max/mean/std, key and FK checks stay exact. The profile then carries
+    an "accuracy" block with the error bounds and the serialized sketches.
+
+    `spec.column_policies` skip columns or limit them to null rates. With
+    `spec.sampling`, column metrics of large tables are computed exactly on
+    a sample (the accuracy mode is moot there): null rates, mean/std and
+    quantiles are sample estimates, distinct counts GEE estimates and top-k
+    counts are scaled to the table. The "accuracy" block then holds their
+    confidence intervals. Row count, freshness, key and FK checks always
+    read the whole table.
+    """
+    if accuracy not in ACCURACY_MODES:
+        raise ValueError(f"accuracy must be one of {ACCURACY_MODES}, got {accuracy!r}")
+    relation = relation_sql(c, table, spec)
+    all_types = describe_columns(c, relation)
+    names = list(all_types) if columns is None else [x for x in all_types if x in columns]
+    policies = resolve_policies(spec, names)
+    col_types = {x: duckdb_kind(all_types[x]) for x in names if policies[x] != "skip"}
+    full_types = {x: k for x, k in col_types.items() if policies[x] == "full"}
+    nulls_only = [x for x in col_types if x not in full_types]
+    ts_columns = [
+        ts for ts in spec.ts_columns if ts in names and duckdb_kind(all_types[ts]) == "timestamp"
+    ]
+
+    full: Dict[Tuple[str, str], Any] = {}
+    population: Optional[int] = None
+    if spec.sampling is not None:
+        # exact row count and freshness; the sample only feeds column metrics
+        sql, labels = compile_aggregate_query(relation, {}, ts_columns)
+        full = dict(zip(labels, c.execute(sql).fetchone(), strict=True))
+        population = int(full[("", "row_count")])
+
+    with _sample_source(c, relation, list(col_types), spec.sampling, population or 0) as source:
+        sampled = source != relation
+        approximate = accuracy == "approximate" and not sampled
+        agg_sql, labels = compile_aggregate_query(
+            source, col_types, [] if sampled else ts_columns, approximate, nulls_only
+        )
+        values = c.execute(agg_sql).fetchone()
+        metrics: Dict[Tuple[str, str], Any] = {**full, **dict(zip(labels, values, strict=True))}
+        sample_rows = int(metrics[("", "row_count")])
+        row_count = population if population is not None else sample_rows
+
+        null_rates = {
+            x: ((sample_rows - metrics[(x, "non_null")]) / sample_rows if sample_rows else 0.0)
+            for x in col_types
+        }
+        bounds: Dict[str, Any] = {}
+        if approximate:
+            hll, digests, heavy, sample_errors = _approximate_sketches(
+                c, source, full_types, metrics, row_count
+            )
+            distinct_counts = {
+                x: min(int(round(hll[x].estimate())), int(metrics[(x, "non_null")]))
+                for x in full_types
+            }
+            for x, td in digests.items():
+                if td.min is not None:
+                    metrics[(x, "quantiles")] = [td.quantile(q) for q in QUANTILES]
+        elif sampled:
+            bounds, distinct_counts = _sample_bounds(
+                c, source, col_types, full_types, metrics, row_count
+            )
+            for x in full_types:
+                distinct_counts.setdefault(x, 0)
+        else:
+            distinct_counts = {x: int(metrics[(x, "distinct")]) for x in full_types}
+
+        numeric_stats: Dict[str, Dict[str, float]] = {}
+        for x, kind in full_types.items():
+            if kind == "numeric" and sample_rows and metrics[(x, "non_null")]:
+                p50, p95, p99 = metrics[(x, "quantiles")]
+                numeric_stats[x] = {
+                    "min": float(metrics[(x, "min")]),
+                    "max": float(metrics[(x, "max")]),
+                    "mean": float(metrics[(x, "mean")]),
+                    "std": float(metrics[(x, "std")] or 0.0),
+                    "p50": float(p50),
+                    "p95": float(p95),
+                    "p99": float(p99),
+                }
+
+        categorical_top: Dict[str, List[Dict[str, Any]]] = {}
+        cat_cols = [x for x, kind in full_types.items() if kind == "categorical"]
+        if approximate and row_count:
+            categorical_top = {x: heavy[x].top(TOP_K) for x in cat_cols}
+        elif sample_rows:
+            scale = row_count / sample_rows
+            for i in range(0, len(cat_cols), _MAX_GROUPING_COLUMNS):
+                chunk = cat_cols[i : i + _MAX_GROUPING_COLUMNS]
+                n = len(chunk)
+                gid_to_pos = {(2**n - 1) - 2 ** (n - 1 - j): j for j in range(n)}
+                for x in chunk:
+                    categorical_top[x] = []
+                for row in c.execute(compile_top_k_query(source, chunk)).fetchall():
+                    pos = gid_to_pos[int(row[0])]
+                    categorical_top[chunk[pos]].append(
+                        {"value": str(row[1 + pos]), "count": int(round(int(row[-1]) * scale))}
+                    )
+
+    freshness: Dict[str, Any] = {}
+    if row_count:
+        for ts in spec.ts_columns:
+            if (ts, "freshness") in metrics:
+                mx = metrics[(ts, "freshness")]
+                freshness[ts] = str(mx) if mx is not None else None
+
+    # key and FK checks always run on the full table, whatever the column policy
+    key_dupes, key_info, fk_violations = run_key_fk_checks(
+        c, table, spec, names, row_count, relation, list(all_types), relations
+    )
+
+    out: Dict[str, Any] = {
+        "table": table,
+        "row_count": row_count,
+        "null_rates": null_rates,
+        "distinct_counts": distinct_counts,
+        "key_duplicate_rates": key_dupes,
+        "key_duplicates": key_info,
+        "numeric_stats": numeric_stats,
+        "categorical_top": categorical_top,
+        "freshness": freshness,
+        "fk_violations": fk_violations,
+    }
+    if sampled:
+        out["accuracy"] = bounds
+        out["accuracy"]["sample"] = {
+            "method": spec.sampling.method,
+            "rows": sample_rows,
+            "fraction": sample_rows / row_count if row_count else 1.0,
+        }
+    if approximate:
+        out["accuracy"] = error_bounds(
+            hll,
+            digests,
+            {
+                x: ss.max_error()
+                + int(sample_errors.get(x, 0.0) * metrics[(x, "non_null")])
+                for x, ss in heavy.items()
+            },
+            sample_errors,
+        )
+        out["accuracy"]["sample_rows"] = min(row_count, APPROX_SAMPLE_ROWS)
+        out["sketches"] = {
+            "hll": {x: h.to_dict() for x, h in hll.items()},
+            "tdigest": {x: td.to_dict() for x, td in digests.items()},
+            "space_saving": {x: ss.to_dict() for x, ss in heavy.items()},
+        }
+    return out
+
+
+def profile_table_sql(
+    con: DuckDBConnector,
+    table: str,
+    spec: "TableSpec",
+    accuracy: str = "exact",
+    referenced: Sequence["TableSpec"] = (),
+) -> Dict[str, Any]:
+    """Push-down profiling: compile `spec` into a few aggregate queries on one connection."""
+    with con.connect() as c:
+        relations = spec_relations(c, referenced)
+        return profile_relation(c, table, spec, accuracy=accuracy, relations=relations)
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.connectors.sources import relation_sql, spec_relations
+from dqa.profiling.sketches import (
+    BloomFilter,
+    HyperLogLog,
+    SpaceSaving,
+    TDigest,
+    error_bounds,
+)
+from dqa.profiling.sql_profiler import (
+    KEY_SAMPLE_KEYS,
+    TOP_K,
+    _q,
+    describe_columns,
+    duckdb_kind,
+    key_label,
+    run_key_checks,
+    run_key_fk_checks,
+)
+
+if TYPE_CHECKING:
+    from dqa.profiling.profiler import TableSpec
+
+DEFAULT_BATCH_SIZE = 65_536
+# per key: Bloom filter bits, and as much again for the hashes it flags
+DEFAULT_BLOOM_MAX_BYTES = 8 << 20
+_VECTOR_SIZE = 2048  # DuckDB rows per vector
+
+# A row check returns a boolean Series, True where the row passes.
+RowCheck = Callable[[pd.DataFrame], pd.Series]
+
+
+def iter_batches(
+    c: duckdb.DuckDBPyConnection, sql: str, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a query result as pandas batches of about `batch_size` rows.
+    Uses an Arrow RecordBatchReader when pyarrow is installed, DuckDB's
+    native chunked fetch otherwise; the full result is never materialized.
+    """
+    res = c.execute(sql)
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        vectors = max(1, batch_size // _VECTOR_SIZE)
+        while True:
+            df = res.fetch_df_chunk(vectors)
+            if not len(df):
+                return
+            yield df
+    else:
+        for rb in res.fetch_record_batch(batch_size):
+            yield rb.to_pandas()
+
+
+def _hash(values: pd.Series | pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+
+
+class Moments:
+    """Running count/mean/variance, combined per batch with Chan's parallel Welford update."""
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: np.ndarray) -> None:
+        nb = len(values)
+        if not nb:
+            return
+        mb = float(values.mean())
+        m2b = float(((values - mb) ** 2).sum())
+        n = self.n + nb
+        delta = mb - self.mean
+        self.mean += delta * nb / n
+        self.m2 += m2b + delta * delta * self.n * nb / n
+        self.n = n
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / self.n)) if self.n > 1 else 0.0
+
+
+def profile_table_streaming(
+    con: DuckDBConnector,
+    table: str,
+    spec: "TableSpec",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    row_checks: Optional[Dict[str, RowCheck]] = None,
+    bloom_max_bytes: int = DEFAULT_BLOOM_MAX_BYTES,
+    referenced: Sequence["TableSpec"] = (),
+) -> Dict[str, Any]:
+    with con.connect() as c:
+        return profile_relation_streaming(
+            c, table, spec, batch_size, row_checks, bloom_max_bytes, spec_relations(c, referenced)
+        )
+
+
+def profile_relation_streaming(
+    c: duckdb.DuckDBPyConnection,
+    table: str,
+    spec: "TableSpec",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    row_checks: Optional[Dict[str, RowCheck]] = None,
+    bloom_max_bytes: int = DEFAULT_BLOOM_MAX_BYTES,
+    relations: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    """
+    Row-level profiling in fixed-size batches with bounded memory.
+
+    Each batch updates running accumulators (null counts, Welford moments,
+    t-digest, HyperLogLog, Space-Saving top-k) and a Bloom filter of row
+    hashes per key (composite keys hash all their columns); only keys the
+    filter flags are re-counted exactly in a second pass over the key
+    columns. Each filter and its flagged hashes are held to
+    `bloom_max_bytes`, whatever the row count; a key whose flagged hashes
+    outgrow that (a saturated filter) is checked with a push-down GROUP BY
+    instead. `row_checks` are arbitrary Python checks run
+    on every batch. Distinct counts, quantiles and top-k are approximate.
+    FK checks stay push-down joins, reading parents from `relations`.
+    """
+    row_checks = row_checks or {}
+    relation = relation_sql(c, table, spec)
+    col_types = {x: duckdb_kind(t) for x, t in describe_columns(c, relation).items()}
+    expected_rows = int(c.execute(f"SELECT count(*) FROM {relation};").fetchone()[0])
+    keys = [k for k in spec.keys if set(k) <= set(col_types)]
+
+    non_null = dict.fromkeys(col_types, 0)
+    hll = {x: HyperLogLog(hash_fn="pandas") for x in col_types}
+    moments = {x: Moments() for x, k in col_types.items() if k == "numeric"}
+    digests = {x: TDigest() for x in moments}
+    lo: Dict[str, float] = {}
+    hi: Dict[str, float] = {}
+    heavy = {x: SpaceSaving() for x, k in col_types.items() if k == "categorical"}
+    latest: Dict[str, Any] = {}
+    blooms = {k: BloomFilter(expected_rows, max_bytes=bloom_max_bytes) for k in keys}
+    candidates: Dict[tuple, List[np.ndarray]] = {k: [] for k in keys}
+    max_candidates = max(1, bloom_max_bytes // 8)
+    pushed_down: List[tuple] = []
+    failed = dict.fromkeys(row_checks, 0)
+
+    row_count = 0
+    batches = 0
+    for df in iter_batches(c, f"SELECT * FROM {relation}", batch_size):
+        batches += 1
+        row_count += len(df)
+        for x, kind in col_types.items():
+            s = df[x]
+            vals = s[s.notna()]
+            non_null[x] += len(vals)
+            if not len(vals):
+                continue
+            hll[x].add_hashes(_hash(vals))
+            if kind == "numeric":
+                arr = vals.to_numpy(dtype=np.float64)
+                moments[x].update(arr)
+                digests[x].update(arr)
+                lo[x] = min(lo.get(x, np.inf), float(arr.min()))
+                hi[x] = max(hi.get(x, -np.inf), float(arr.max()))
+            elif kind == "categorical":
+                heavy[x].update(vals.astype(str))
+            else:
+                mx = vals.max()
+                latest[x] = mx if x not in latest else max(latest[x], mx)
+        for k in keys:
+            if k in pushed_down:
+                continue
+            h = _hash(df[list(k)])
+            flagged = blooms[k].add_and_check(h)
+            if flagged.any():
+                candidates[k].append(np.unique(h[flagged]))
+                if sum(len(a) for a in candidates[k]) > max_candidates:
+                    candidates[k] = [np.unique(np.concatenate(candidates[k]))]
+                    if len(candidates[k][0]) > max_candidates:
+                        candidates[k] = []
+                        pushed_down.append(k)
+        for name, check in row_checks.items():
+            failed[name] += int((~check(df).astype(bool)).sum())
+
+    # second pass: exact occurrence counts for Bloom-flagged keys only,
+    # keeping one value tuple per candidate for the sample keys
+    cand = {k: np.unique(np.concatenate(v)) for k, v in candidates.items() if v}
+    occurrences: Dict[tuple, Dict[int, int]] = {k: {} for k in keys}
+    examples: Dict[tuple, Dict[int, tuple]] = {k: {} for k in keys}
+    if cand:
+        cols = ", ".join(_q(x) for x in dict.fromkeys(x for k in cand for x in k))
+        for df in iter_batches(c, f"SELECT {cols} FROM {relation}", batch_size):
+            for k, ck in cand.items():
+                h = _hash(df[list(k)])
+                hit = np.flatnonzero(np.isin(h, ck))
+                vals, first, counts = np.unique(h[hit], return_index=True, return_counts=True)
+                occ, ex = occurrences[k], examples[k]
+                rows = df[list(k)].iloc[hit[first]].itertuples(index=False, name=None)
+                for v, n, row in zip(vals.tolist(), counts.tolist(), rows, strict=True):
+                    occ[v] = occ.get(v, 0) + n
+                    ex.setdefault(v, row)
+    key_info: Dict[str, Dict[str, Any]] = {}
+    if row_count:
+        for k in keys:
+            dup = sorted(
+                ((n, v) for v, n in occurrences[k].items() if n > 1), key=lambda x: -x[0]
+            )
+            samples = [
+                [None if pd.isna(x) else str(x) for x in examples[k][v]]
+                for _, v in dup[:KEY_SAMPLE_KEYS]
+            ]
+            rows_dup = sum(n for n, _ in dup)
+            key_info[key_label(k)] = {
+                "columns": list(k),
+                "duplicate_rows": rows_dup,
+                "duplicate_groups": len(dup),
+                "duplicate_rate": rows_dup / row_count,
+                "sample_keys": [x[0] if len(k) == 1 else x for x in samples],
+            }
+        if pushed_down:
+            key_info.update(run_key_checks(c, relation, pushed_down, row_count))
+            key_info = {key_label(k): key_info[key_label(k)] for k in keys}
+    key_dupes = {label: info["duplicate_rate"] for label, info in key_info.items()}
+
+    fk_cols = [x for x in spec.fk if x in col_types]
+    _, _, fk_violations = run_key_fk_checks(
+        c, table, spec, fk_cols, row_count, relation, relations=relations
+    )
+
+    numeric_stats: Dict[str, Dict[str, float]] = {}
+    for x, m in moments.items():
+        if m.n:
+            td = digests[x]
+            numeric_stats[x] = {
+                "min": lo[x],
+                "max": hi[x],
+                "mean": m.mean,
+                "std": m.std,
+                "p50": td.quantile(0.50),
+                "p95": td.quantile(0.95),
+                "p99": td.quantile(0.99),
+            }
+
+    freshness: Dict[str, Any] = {}
+    if row_count:
+        for ts in spec.ts_columns:
+            if ts in col_types:
+                freshness[ts] = str(latest[ts]) if ts in latest else None
+
+    out: Dict[str, Any] = {
+        "table": table,
+        "row_count": row_count,
+        "null_rates": {
+            x: ((row_count - n) / row_count if row_count else 0.0) for x, n in non_null.items()
+        },
+        "distinct_counts": {
+            x: min(int(round(h.estimate())), non_null[x]) for x, h in hll.items()
+        },
+        "key_duplicate_rates": key_dupes,
+        "key_duplicates": key_info,
+        "numeric_stats": numeric_stats,
+        "categorical_top": {x: ss.top(TOP_K) for x, ss in heavy.items()} if row_count else {},
+        "freshness": freshness,
+        "fk_violations": fk_violations,
+        "streaming": {
+            "batch_size": batch_size,
+            "batches": batches,
+            "bloom_bytes": {key_label(k): b.nbytes for k, b in blooms.items()},
+            "keys_pushed_down": [key_label(k) for k in pushed_down],
+        },
+        "accuracy": error_bounds(
+            hll, digests, {x: ss.max_error() for x, ss in heavy.items()}
+        ),
+        "sketches": {
+            "hll": {x: h.to_dict() for x, h in hll.items()},
+            "tdigest": {x: td.to_dict() for x, td in digests.items()},
+            "space_saving": {x: ss.to_dict() for x, ss in heavy.items()},
+        },
+    }
+    if row_checks:
+        out["custom_checks"] = {
+            name: {"failed_rows": n, "fail_rate": (n / row_count if row_count else 0.0)}
+            for name, n in failed.items()
+        }
+    return out
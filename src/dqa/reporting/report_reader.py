@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+RECORD_TYPES = ("run", "finding", "profile", "trace")
+CHUNK_BYTES = 64 * 1024
+# report_writer puts "type" first, compact; other lines are parsed to find it
+TYPE_PREFIX = '{"type":"'
+
+
+def etag(path: Path) -> str:
+    """Weak ETag of a report file; reports are written once, atomically."""
+    st = path.stat()
+    return f'W/"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def iter_chunks(path: Path, chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_bytes):
+            yield chunk
+
+
+def iter_records(
+    path: Path,
+    types: Optional[Sequence[str]] = None,
+    tables: Optional[Sequence[str]] = None,
+    severities: Optional[Sequence[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    NDJSON report records matching every given filter, read line by line.
+    `tables` applies to finding/profile records, `severities` to findings.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            rec: Optional[Dict[str, Any]] = None
+            if line.startswith(TYPE_PREFIX):
+                # skip other kinds unparsed
+                kind = line[len(TYPE_PREFIX) : line.index('"', len(TYPE_PREFIX))]
+            else:
+                rec = json.loads(line)
+                kind = rec.get("type")
+            if types and kind not in types:
+                continue
+            if rec is None:
+                rec = json.loads(line)
+            if tables and kind in ("finding", "profile") and rec["table"] not in tables:
+                continue
+            if severities and (kind != "finding" or rec["severity"] not in severities):
+                continue
+            yield rec
+
+
+def iter_ndjson(records: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode records back to NDJSON in chunks of roughly CHUNK_BYTES."""
+    buf: List[str] = []
+    size = 0
+    for rec in records:
+        line = json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n"
+        buf.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield "".join(buf).encode("utf-8")
+            buf, size = [], 0
+    if buf:
+        yield "".join(buf).encode("utf-8")
+
+
+def read_header(path: Path) -> Dict[str, Any]:
+    """The `run` record at the top of a report's NDJSON."""
+    with open(path, encoding="utf-8") as f:
+        return json.loads(f.readline())
+
+
+def page_findings(
+    path: Path,
+    tables: Optional[Sequence[str]] = None,
+    severities: Optional[Sequence[str]] = None,
+    offset: int = 0,
+    limit: int = 100,
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    One page of matching findings and the offset of the next page (None on
+    the last one). Stops reading as soon as the page is full.
+    """
+    found = iter_records(path, ("finding",), tables, severities)
+    page = list(islice(found, offset, offset + limit + 1))
+    if len(page) > limit:
+        return page[:limit], offset + limit
+    return page, None
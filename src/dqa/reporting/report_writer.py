@@ -1,51 +1,149 @@
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Any, Dict, List
+import json
+import os
 from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional
 
 from dqa.anomaly.detector import Finding
 
 
+def _record(f: IO[str], record: Dict[str, Any]) -> None:
+    f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str))
+    f.write("\n")
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(", ", ": "), default=str)
+
+
+def records_path(report_path: Path) -> Path:
+    """NDJSON records written next to a Markdown report."""
+    return report_path.with_suffix(".ndjson")
+
+
 def write_markdown_report(
     run_id: str,
     snapshot_name: str,
     findings: List[Finding],
     profiles_today: Dict[str, Dict[str, Any]],
     out_dir: Path,
+    trace: Optional[Dict[str, Any]] = None,
+    selection: Optional[Dict[str, Any]] = None,
 ) -> Path:
+    """
+    Write the Markdown report and its NDJSON records (`records_path`)
+    table by table, without building either document in memory.
+
+    NDJSON lines are a `run` header (finding counts by severity and table),
+    then one `finding` per finding, one `profile` summary per table and a
+    final `trace`. Both files appear atomically once complete. A targeted
+    run's `selection` (see dqa.profiling.selection) goes into the header.
+    """
     out_dir.mkdir(parents=True, exist_ok=True)
     fp = out_dir / f"run_{run_id}.md"
+    rp = records_path(fp)
 
     by_table: Dict[str, List[Finding]] = {}
+    by_severity: Dict[str, int] = {}
     for f in findings:
         by_table.setdefault(f.table, []).append(f)
+        by_severity[f.severity] = by_severity.get(f.severity, 0) + 1
+    created = datetime.now().isoformat(timespec="seconds")
+
+    md_tmp, nd_tmp = fp.with_suffix(".md.tmp"), rp.with_suffix(".ndjson.tmp")
+    with open(md_tmp, "w", encoding="utf-8") as md, open(nd_tmp, "w", encoding="utf-8") as nd:
+        md.write("# DataQualityAgent Report\n\n")
+        md.write(f"- **Run ID:** `{run_id}`\n")
+        md.write(f"- **Snapshot:** `{snapshot_name}`\n")
+        if selection is not None:
+            md.write(f"- **Tables:** {', '.join(f'`{t}`' for t in selection['tables'])}\n")
+        md.write(f"- **Created:** {created}\n\n")
+        md.write("---\n\n")
+        header = {
+            "type": "run",
+            "run_id": run_id,
+            "snapshot": snapshot_name,
+            "created": created,
+            "findings": len(findings),
+            "by_severity": by_severity,
+            "by_table": {t: len(fl) for t, fl in by_table.items()},
+            "tables": len(profiles_today),
+        }
+        if selection is not None:
+            header["selection"] = selection
+        _record(nd, header)
+
+        if not findings:
+            md.write("✅ No anomalies detected.\n\n")
+        else:
+            md.write(f"## Findings ({len(findings)})\n\n")
+            for table, flist in by_table.items():
+                md.write(f"### {table}\n\n")
+                for f in flist:
+                    md.write(f"- **{f.severity}** `{f.kind}` — {f.message}\n")
+                    _record(
+                        nd,
+                        {
+                            "type": "finding",
+                            "table": f.table,
+                            "severity": f.severity,
+                            "kind": f.kind,
+                            "message": f.message,
+                            "details": f.details,
+                        },
+                    )
+                md.write("\n")
+
+        md.write("---\n\n")
+        md.write("## Profiles (high level)\n\n")
+        for table, prof in profiles_today.items():
+            summary = {
+                "row_count": prof.get("row_count"),
+                "key_duplicate_rates": prof.get("key_duplicate_rates", {}),
+                "fk_violations": prof.get("fk_violations", {}),
+                "freshness": prof.get("freshness", {}),
+            }
+            md.write(f"### {table}\n\n")
+            md.write(f"- Row count: **{summary['row_count']}**\n")
+            md.write(f"- Key dup rates: `{_compact(summary['key_duplicate_rates'])}`\n")
+            md.write(f"- FK violations: `{_compact(summary['fk_violations'])}`\n")
+            md.write(f"- Freshness: `{_compact(summary['freshness'])}`\n\n")
+            _record(nd, {"type": "profile", "table": table, **summary})
 
-    lines: List[str] = []
-    lines.append("# DataQualityAgent Report\n\n")
-    lines.append(f"- **Run ID:** `{run_id}`\n")
-    lines.append(f"- **Snapshot:** `{snapshot_name}`\n")
-    lines.append(f"- **Created:** {datetime.now().isoformat(timespec='seconds')}\n\n")
-    lines.append("---\n\n")
-
-    if not findings:
-        lines.append("✅ No anomalies detected.\n\n")
-    else:
-        lines.append(f"## Findings ({len(findings)})\n\n")
-        for table, flist in by_table.items():
-            lines.append(f"### {table}\n\n")
-            for f in flist:
-                lines.append(f"- **{f.severity}** `{f.kind}` — {f.message}\n")
-            lines.append("\n")
-
-    lines.append("---\n\n")
-    lines.append("## Profiles (high level)\n\n")
-    for table, prof in profiles_today.items():
-        lines.append(f"### {table}\n\n")
-        lines.append(f"- Row count: **{prof.get('row_count')}**\n")
-        lines.append(f"- Key dup rates: `{prof.get('key_duplicate_rates', {})}`\n")
-        lines.append(f"- FK violations: `{prof.get('fk_violations', {})}`\n")
-        lines.append(f"- Freshness: `{prof.get('freshness', {})}`\n\n")
-
-    fp.write_text("".join(lines), encoding="utf-8")
+        if trace:
+            md.writelines(_timing_lines(trace))
+            _record(nd, {"type": "trace", **trace})
+
+    os.replace(nd_tmp, rp)
+    os.replace(md_tmp, fp)
     return fp
+
+
+def _timing_lines(trace: Dict[str, Any], slow_queries: int = 5) -> List[str]:
+    """Stage and slow-query summary of a `Tracer.summary()`."""
+    q = trace.get("queries", {})
+    lines = ["---\n\n", "## Run timings\n\n"]
+    lines.append(
+        f"- Queries: **{q.get('count', 0)}** in {q.get('seconds', 0.0):.3f}s "
+        f"({q.get('rows', 0)} rows fetched)\n\n"
+    )
+    lines.append("| Stage | Calls | Seconds | Queries | Query seconds |\n")
+    lines.append("|---|---:|---:|---:|---:|\n")
+    for name, st in trace.get("stages", {}).items():
+        lines.append(
+            f"| {name} | {st['count']} | {st['seconds']:.3f} | {st['queries']} "
+            f"| {st['query_seconds']:.3f} |\n"
+        )
+    slow = trace.get("slow_queries", [])[:slow_queries]
+    if slow:
+        lines.append(f"\n### Slowest queries ({len(slow)})\n\n")
+        for sq in slow:
+            sql = sq["sql"] if len(sq["sql"]) <= 120 else sq["sql"][:117] + "..."
+            lines.append(
+                f"- {sq['seconds']:.3f}s, {sq['rows'] if sq['rows'] is not None else '-'} rows, "
+                f"in `{sq['span']}`: `{sql}`\n"
+            )
+    lines.append("\n")
+    return lines
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Optional
+
+from dqa.connectors.duckdb_conn import DuckDBConnector
+
+RUNS_SQL = """
+CREATE TABLE IF NOT EXISTS dq_runs (
+  run_id VARCHAR,
+  snapshot_name VARCHAR,
+  created_at TIMESTAMP,
+  summary_json VARCHAR
+);
+"""
+
+
+def save_run(
+    con: DuckDBConnector, run_id: str, snapshot_name: str, summary: Dict[str, Any]
+) -> None:
+    """Record a finished run (summary and trace) in dq_runs."""
+    with con.connect() as c:
+        c.execute(RUNS_SQL)
+        c.execute(
+            "INSERT INTO dq_runs VALUES (?, ?, NOW(), ?);",
+            (run_id, snapshot_name, json.dumps(summary, ensure_ascii=False, default=str)),
+        )
+
+
+def load_run(con: DuckDBConnector, run_id: str) -> Optional[Dict[str, Any]]:
+    with con.connect() as c:
+        c.execute(RUNS_SQL)
+        row = c.execute(
+            "SELECT summary_json FROM dq_runs WHERE run_id = ? "
+            "ORDER BY created_at DESC LIMIT 1;",
+            (run_id,),
+        ).fetchone()
+    return json.loads(row[0]) if row else None
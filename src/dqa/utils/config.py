@@ -8,6 +8,9 @@ ROOT = Path(__file__).resolve().parents[3]
 class Paths:
     db_path: Path = ROOT / "data" / "warehouse.duckdb"
     generated_dbt_schema: Path = ROOT / "generated" / "dbt" / "models" / "schema.yml"
+    generated_dbt_models_dir: Path = ROOT / "generated" / "dbt" / "models"
     generated_reports_dir: Path = ROOT / "generated" / "reports"
+    generated_shards_dir: Path = ROOT / "generated" / "shards"
+    table_registry: Path = ROOT / "config" / "tables.yml"
 
 PATHS = Paths()
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import duckdb
+
+# Query records kept per trace for the slow-query summary; totals cover every query.
+MAX_QUERY_RECORDS = 10_000
+SLOW_QUERIES = 10
+_SQL_PREVIEW_CHARS = 2_000
+_READ_ONLY_PREFIXES = ("SELECT", "WITH", "FROM", "DESCRIBE")
+
+
+@dataclass
+class Span:
+    id: int
+    name: str
+    parent: Optional[int]
+    start: float  # seconds since the trace started
+    seconds: Optional[float] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class QueryRecord:
+    sql: str
+    params: Any
+    span: Optional[int]
+    seconds: float = 0.0
+    rows: Optional[int] = None
+    plan: Optional[str] = None
+
+
+_TRACER: ContextVar[Optional["Tracer"]] = ContextVar("dqa_tracer", default=None)
+_SPAN: ContextVar[Optional[int]] = ContextVar("dqa_span", default=None)
+
+
+class Tracer:
+    """
+    Collects nested stage spans and per-query timings for one run.
+
+    Spans nest through a context variable, so worker threads that run in a
+    copy of the submitting context (see `propagate`) attach to the right
+    parent. Queries are recorded by `TracedConnection`; each is attributed
+    to the innermost open span.
+    """
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self.queries: List[QueryRecord] = []
+        self.query_count = 0
+        self.query_seconds = 0.0
+        self.query_rows = 0
+        self._span_queries: Dict[Optional[int], List[float]] = {}
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Span]:
+        with self._lock:
+            start = time.perf_counter() - self._t0
+            s = Span(len(self.spans), name, _SPAN.get(), start, attrs=attrs)
+            self.spans.append(s)
+        token = _SPAN.set(s.id)
+        t0 = time.perf_counter()
+        try:
+            yield s
+        finally:
+            s.seconds = time.perf_counter() - t0
+            _SPAN.reset(token)
+
+    def query(self, sql: str, params: Any = None) -> QueryRecord:
+        rec = QueryRecord(sql=sql, params=params, span=_SPAN.get())
+        with self._lock:
+            self.query_count += 1
+            self._span_queries.setdefault(rec.span, [0, 0.0])[0] += 1
+            if len(self.queries) < MAX_QUERY_RECORDS:
+                self.queries.append(rec)
+        return rec
+
+    def observe(self, rec: QueryRecord, seconds: float, rows: Optional[int] = None) -> None:
+        """Add execute/fetch time (and fetched rows) to a query."""
+        with self._lock:
+            rec.seconds += seconds
+            self.query_seconds += seconds
+            self._span_queries[rec.span][1] += seconds
+            if rows is not None:
+                rec.rows = (rec.rows or 0) + rows
+                self.query_rows += rows
+
+    def slowest(self, n: int = SLOW_QUERIES) -> List[QueryRecord]:
+        with self._lock:
+            return sorted(self.queries, key=lambda r: r.seconds, reverse=True)[:n]
+
+    def explain_slowest(self, c: duckdb.DuckDBPyConnection, n: int) -> int:
+        """
+        Re-run the `n` slowest read-only queries under EXPLAIN ANALYZE and
+        attach the plans. Returns how many were explained.
+        """
+        with self._lock:
+            reads = [
+                r for r in self.queries if r.sql.lstrip().upper().startswith(_READ_ONLY_PREFIXES)
+            ]
+        done = 0
+        for rec in sorted(reads, key=lambda r: r.seconds, reverse=True)[:n]:
+            try:
+                rows = c.execute(f"EXPLAIN ANALYZE {rec.sql}", rec.params).fetchall()
+            except duckdb.Error as e:
+                # e.g. the table was dropped or reseeded since
+                rec.plan = f"EXPLAIN ANALYZE failed: {e}"
+                continue
+            rec.plan = "\n".join(str(r[-1]) for r in rows)
+            done += 1
+        return done
+
+    def summary(self, slow_queries: int = SLOW_QUERIES) -> Dict[str, Any]:
+        """
+        JSON-friendly digest: spans, per-stage totals over finished spans and
+        the slowest queries.
+        """
+        names = {s.id: s.name for s in self.spans}
+        stages: Dict[str, Dict[str, Any]] = {}
+        for s in self.spans:
+            if s.seconds is None:
+                continue  # still open
+            st = stages.setdefault(s.name, {"count": 0, "seconds": 0.0, "queries": 0})
+            count, secs = self._span_queries.get(s.id, (0, 0.0))
+            st["count"] += 1
+            st["seconds"] = round(st["seconds"] + (s.seconds or 0.0), 6)
+            st["queries"] += count
+            st["query_seconds"] = round(st.get("query_seconds", 0.0) + secs, 6)
+        return {
+            "spans": [
+                {
+                    "name": s.name,
+                    "parent": names.get(s.parent) if s.parent is not None else None,
+                    "start": round(s.start, 6),
+                    "seconds": None if s.seconds is None else round(s.seconds, 6),
+                    **({"attrs": s.attrs} if s.attrs else {}),
+                }
+                for s in self.spans
+            ],
+            "stages": stages,
+            "queries": {
+                "count": self.query_count,
+                "seconds": round(self.query_seconds, 6),
+                "rows": self.query_rows,
+                "recorded": len(self.queries),
+            },
+            "slow_queries": [
+                {
+                    "sql": " ".join(r.sql.split())[:_SQL_PREVIEW_CHARS],
+                    "seconds": round(r.seconds, 6),
+                    "rows": r.rows,
+                    "span": names.get(r.span) if r.span is not None else None,
+                    **({"plan": r.plan} if r.plan else {}),
+                }
+                for r in self.slowest(slow_queries)
+            ],
+        }
+
+
+class TracedConnection:
+    """
+    Wraps a DuckDB connection or cursor and times every statement (execute
+    plus fetch) into a Tracer. Everything else is delegated unchanged.
+    """
+
+    def __init__(self, con: duckdb.DuckDBPyConnection, tracer: Tracer):
+        self._con = con
+        self._tracer = tracer
+        self._last: Optional[QueryRecord] = None
+
+    def _run(self, method: str, sql: str, parameters: Any) -> "TracedConnection":
+        rec = self._tracer.query(sql, parameters)
+        t0 = time.perf_counter()
+        try:
+            getattr(self._con, method)(sql, parameters)
+        finally:
+            self._tracer.observe(rec, time.perf_counter() - t0)
+        self._last = rec
+        return self
+
+    def execute(self, query: str, parameters: Any = None) -> "TracedConnection":
+        return self._run("execute", query, parameters)
+
+    def executemany(self, query: str, parameters: Any = None) -> "TracedConnection":
+        return self._run("executemany", query, parameters)
+
+    def _fetch(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        t0 = time.perf_counter()
+        out = getattr(self._con, method)(*args, **kwargs)
+        if self._last is not None:
+            rows = (0 if out is None else 1) if method == "fetchone" else len(out)
+            self._tracer.observe(self._last, time.perf_counter() - t0, rows)
+        return out
+
+    def fetchone(self) -> Any:
+        return self._fetch("fetchone")
+
+    def fetchall(self) -> Any:
+        return self._fetch("fetchall")
+
+    def fetchmany(self, *args: Any, **kwargs: Any) -> Any:
+        return self._fetch("fetchmany", *args, **kwargs)
+
+    def fetchdf(self, *args: Any, **kwargs: Any) -> Any:
+        return self._fetch("fetchdf", *args, **kwargs)
+
+    def fetch_df_chunk(self, *args: Any, **kwargs: Any) -> Any:
+        return self._fetch("fetch_df_chunk", *args, **kwargs)
+
+    def cursor(self) -> "TracedConnection":
+        return TracedConnection(self._con.cursor(), self._tracer)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._con, name)
+
+    def __enter__(self) -> "TracedConnection":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._con.__exit__(*exc)
+
+
+def current_tracer() -> Optional[Tracer]:
+    return _TRACER.get()
+
+
+@contextmanager
+def tracing(tracer: Tracer) -> Iterator[Tracer]:
+    """Make `tracer` the active tracer for spans and new connections."""
+    token = _TRACER.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _TRACER.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """Span on the active tracer; a no-op when nothing is being traced."""
+    tracer = _TRACER.get()
+    if tracer is None:
+        yield None
+        return
+    with tracer.span(name, **attrs) as s:
+        yield s
+
+
+def propagate(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """`fn` bound to a copy of the current context, for running on a worker thread."""
+    return functools.partial(copy_context().run, fn)
+
+
+def traced(con: duckdb.DuckDBPyConnection) -> duckdb.DuckDBPyConnection:
+    """`con` wrapped for the active tracer, or unchanged when not tracing."""
+    tracer = _TRACER.get()
+    if tracer is None or isinstance(con, TracedConnection):
+        return con
+    return TracedConnection(con, tracer)  # type: ignore[return-value]
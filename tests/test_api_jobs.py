@@ -0,0 +1,66 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+import dqa.api.main as api
+from dqa.api.jobs import JobManager
+
+
+def _wait(client, run_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        body = client.get(f"/dq/runs/{run_id}").json()
+        if body["status"] in ("succeeded", "failed"):
+            return body
+        time.sleep(0.02)
+    raise AssertionError("job did not finish")
+
+
+def test_run_endpoint_returns_immediately_and_deduplicates(monkeypatch):
+    release = threading.Event()
+
+    def fake_run(
+        target, incremental, baseline_window, accuracy, con, cache, registry, tracer, run_id,
+        progress,
+    ):
+        progress("profile")
+        release.wait(5)
+        return {"run_id": run_id, "target": target, "findings_count": 0}
+
+    monkeypatch.setattr(api, "run", fake_run)
+    with TestClient(api.app) as client:
+        first = client.post("/dq/run?target=bad_day")
+        assert first.status_code == 202
+        second = client.post("/dq/run?target=bad_day").json()
+        assert second["deduplicated"] and second["run_id"] == first.json()["run_id"]
+
+        release.set()
+        body = _wait(client, second["run_id"])
+        assert body["status"] == "succeeded"
+        assert body["result"]["run_id"] == body["run_id"]
+        assert client.get("/dq/runs/missing").status_code == 404
+
+
+def test_jobs_on_one_warehouse_run_serially_and_failures_are_reported():
+    jobs = JobManager(max_workers=4)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def work(run_id, progress, n):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        if n == 2:
+            raise ValueError("boom")
+        return {"n": n}
+
+    submitted = [jobs.submit(("w", n), "w.duckdb", work, {"n": n})[0] for n in range(3)]
+    jobs.shutdown(wait=True)
+
+    assert peak[0] == 1
+    assert [j.status for j in submitted] == ["succeeded", "succeeded", "failed"]
+    assert "boom" in submitted[2].error
@@ -0,0 +1,57 @@
+import duckdb
+
+from dqa.anomaly.batch import detect_anomalies_batch
+from dqa.anomaly.detector import detect_anomalies
+from dqa.profiling.profiler import TableSpec
+from dqa.profiling.sketches import HyperLogLog, SpaceSaving, TDigest
+from dqa.profiling.sql_profiler import APPROX_SAMPLE_ROWS, profile_relation
+
+
+def test_approximate_profile_stays_within_recorded_bounds():
+    c = duckdb.connect()
+    c.execute(
+        f"""
+        CREATE TABLE t AS
+        SELECT 'O' || i::VARCHAR AS order_id,
+               (i * 7919 % 100003)::DOUBLE AS amount,
+               ['paid', 'paid', 'paid', 'refunded', 'failed'][1 + i % 5] AS status
+        FROM range({APPROX_SAMPLE_ROWS * 3}) r(i);
+        """
+    )
+    spec = TableSpec(name="t", key_columns=["order_id"], ts_columns=[], fk={})
+    exact = profile_relation(c, "t", spec)
+    approx = profile_relation(c, "t", spec, accuracy="approximate")
+
+    acc = approx["accuracy"]
+    assert acc["mode"] == "approximate"
+    assert approx["row_count"] == exact["row_count"]
+    assert approx["key_duplicate_rates"] == exact["key_duplicate_rates"]
+    for col, n in exact["distinct_counts"].items():
+        assert abs(approx["distinct_counts"][col] - n) <= acc["distinct_rel_error"] * n
+    lo, hi = acc["p99_bounds"]["amount"]
+    assert lo <= exact["numeric_stats"]["amount"]["p99"] <= hi
+    top_exact = {t["value"]: t["count"] for t in exact["categorical_top"]["status"]}
+    for t in approx["categorical_top"]["status"]:
+        assert abs(t["count"] - top_exact[t["value"]]) <= acc["top_k_count_error"]["status"]
+
+    # sketches round-trip through JSON-able dicts and stay mergeable
+    sk = approx["sketches"]
+    hll = HyperLogLog.from_dict(sk["hll"]["order_id"])
+    merged = HyperLogLog.from_dict(sk["hll"]["order_id"]).merge(hll)
+    assert merged.estimate() == hll.estimate()
+    td = TDigest.from_dict(sk["tdigest"]["amount"])
+    assert td.quantile(0.99) == approx["numeric_stats"]["amount"]["p99"]
+    assert SpaceSaving.from_dict(sk["space_saving"]["status"]).top(1)[0]["value"] == "paid"
+
+
+def test_detectors_widen_p99_threshold_by_error_bounds():
+    base = {"table": "t", "row_count": 100, "numeric_stats": {"amount": {"p99": 10.0}}}
+    today = {"table": "t", "row_count": 100, "numeric_stats": {"amount": {"p99": 52.0}}}
+    assert [f.kind for f in detect_anomalies(today, base)] == ["P99_JUMP"]
+
+    # the same point estimates, but the bounds admit a jump below 5x
+    approx_today = {**today, "accuracy": {"p99_bounds": {"amount": [45.0, 60.0]}}}
+    assert detect_anomalies(approx_today, base) == []
+    assert detect_anomalies_batch([(approx_today, base), (today, base)]) == (
+        detect_anomalies(approx_today, base) + detect_anomalies(today, base)
+    )
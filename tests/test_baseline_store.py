@@ -0,0 +1,90 @@
+import json
+import math
+
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.profiling.baseline_store import (
+    export_profiles_parquet,
+    flatten_profile,
+    load_metric_history,
+    load_profiles,
+    median_profile,
+    save_profiles,
+    table_fingerprints,
+)
+from dqa.profiling.profiler import TableSpec
+
+SPEC = TableSpec("t", key_columns=["id"], ts_columns=[], fk={})
+
+
+def _profile(rows: int, p99: float):
+    return {"table": "t", "row_count": rows, "numeric_stats": {"x": {"p99": p99}}}
+
+
+def test_baselines_are_versioned_and_keyed_by_schema_fingerprint(tmp_path):
+    con = DuckDBConnector(tmp_path / "w.duckdb")
+    con.exec("CREATE TABLE t (id INTEGER, x DOUBLE);")
+    fps = table_fingerprints(con, [SPEC])
+
+    for rows, p99 in [(100, 1.0), (110, 9.0), (120, 2.0)]:
+        save_profiles(con, "baseline", {"t": _profile(rows, p99)}, fps)
+
+    assert load_profiles(con, "baseline", fps)["t"]["row_count"] == 120
+    rolled = load_profiles(con, "baseline", fps, window=3)["t"]
+    assert rolled["row_count"] == 110
+    assert rolled["numeric_stats"]["x"]["p99"] == 2.0
+
+    # a schema change makes the stored baseline stale
+    con.exec("ALTER TABLE t ADD COLUMN y VARCHAR;")
+    assert load_profiles(con, "baseline", table_fingerprints(con, [SPEC])) == {}
+
+
+def test_median_profile_keeps_non_numeric_values_from_newest():
+    out = median_profile(
+        [
+            {"table": "t", "freshness": {"ts": "b"}, "row_count": 5},
+            {"table": "t", "freshness": {"ts": "a"}, "row_count": 1},
+        ]
+    )
+    assert out == {"table": "t", "freshness": {"ts": "b"}, "row_count": 3}
+
+
+def test_profiles_round_trip_through_long_format_and_migrate_json(tmp_path):
+    con = DuckDBConnector(tmp_path / "w.duckdb")
+    legacy = {
+        "table": "t",
+        "row_count": 100,
+        "null_rates": {"x": 0.25},
+        "numeric_stats": {"x": {"p99": 9.5, "mean": float("nan")}},
+        "categorical_top": {"y": [["a", 3], ["b", 1]]},
+        "freshness": {"ts": None},
+        "fk_violations": {},
+    }
+    # rows written by releases that stored one JSON document per profile
+    con.exec(
+        "CREATE TABLE dq_profiles (snapshot_name VARCHAR, table_name VARCHAR, "
+        "profile_json VARCHAR, created_at TIMESTAMP);"
+    )
+    with con.connect() as c:
+        c.execute(
+            "INSERT INTO dq_profiles VALUES ('baseline', 't', ?, NOW());", (json.dumps(legacy),)
+        )
+
+    loaded = load_profiles(con, "baseline")["t"]
+    assert list(loaded) == list(legacy)
+    assert math.isnan(loaded["numeric_stats"]["x"].pop("mean"))
+    assert loaded == {**legacy, "numeric_stats": {"x": {"p99": 9.5}}}
+
+    save_profiles(con, "baseline", {"t": _profile(120, 2.0)}, {})
+    history = load_metric_history(con, "t", "numeric_stats", "x", "p99")
+    assert history["version"].tolist() == [1, 2]
+    assert history["value"].tolist() == [9.5, 2.0]
+
+    out = export_profiles_parquet(con, tmp_path / "profiles")
+    with con.connect() as c:
+        n, days = c.execute(
+            "SELECT count(*), count(DISTINCT profile_date) "
+            "FROM read_parquet(?, hive_partitioning = true);",
+            (str(out / "profile_date=*" / "*.parquet"),),
+        ).fetchone()
+    assert n == len(flatten_profile(legacy)) + len(flatten_profile(_profile(120, 2.0)))
+    assert days == 1
@@ -0,0 +1,42 @@
+import random
+
+from dqa.anomaly.batch import detect_anomalies_batch
+from dqa.anomaly.detector import detect_anomalies
+
+
+def _random_profile(rng: random.Random, table: str):
+    cols = [f"c{i}" for i in range(6)]
+    profile = {
+        "table": table,
+        "row_count": rng.choice([0, 100, 120, 200, 1000]),
+        "key_duplicate_rates": {"id": rng.choice([0.0, 0.0, 0.01])},
+        "null_rates": {c: rng.choice([0.0, 0.001, 0.01, 0.03, 0.2]) for c in cols},
+        "numeric_stats": {
+            c: {"p99": rng.choice([0.0, 1.0, 4.0, 50.0])} for c in cols if rng.random() < 0.7
+        },
+        "fk_violations": {
+            "c0": {"bad_rows": 3, "bad_rate": rng.choice([0.0, 0.003])},
+        },
+    }
+    # sampled/approximate profiles carry error bounds for some columns
+    if rng.random() < 0.3:
+        profile["accuracy"] = {
+            "null_rate_bounds": {"c1": [0.0, rng.choice([0.01, 0.05])]},
+            "p99_bounds": {c: [0.5, 60.0] for c in profile["numeric_stats"] if c == "c2"},
+        }
+    return profile
+
+
+def test_batch_detector_matches_per_table_detector():
+    rng = random.Random(11)
+    pairs = [
+        (_random_profile(rng, f"t{i % 40}"), _random_profile(rng, f"t{i % 40}"))
+        for i in range(400)
+    ]
+
+    expected = []
+    for today, base in pairs:
+        expected.extend(detect_anomalies(today, base))
+
+    assert expected
+    assert detect_anomalies_batch(pairs) == expected
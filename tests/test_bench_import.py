@@ -0,0 +1,29 @@
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.bench_import import BUDGETS, HEAVY, check
+from dqa.utils.config import ROOT
+
+
+def test_api_import_defers_heavy_dependencies():
+    # a fresh interpreter, so modules imported by other tests do not count
+    _, deferred = BUDGETS["dqa.api.main"]
+    code = (
+        "import json, sys; import dqa.api.main; "
+        f"print(json.dumps([m for m in {list(HEAVY)!r} if m in sys.modules]))"
+    )
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(ROOT / "src"), str(ROOT), env.get("PYTHONPATH", "")])
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    assert [m for m in json.loads(out.stdout) if m in deferred] == []
+
+
+def test_import_check_reports_budget_and_deferred_imports():
+    assert check({"import_ms": 2.0, "heavy": ["pandas"]}, 1.0, ("pandas",)) == [
+        "2.0ms > 1.0ms",
+        "imports pandas",
+    ]
@@ -0,0 +1,23 @@
+from benchmarks.bench_pipeline import compare
+
+
+def _suite(**stages):
+    return {
+        "results": [
+            {"stage": s, "scale": 1.0, "seconds": sec, "peak_rss_mb": rss}
+            for s, (sec, rss) in stages.items()
+        ]
+    }
+
+
+def test_compare_flags_slowdowns_and_memory_growth_but_not_timer_noise():
+    base = _suite(seed=(1.0, 100.0), profile=(2.0, 100.0), detect=(1e-5, 100.0), fk=(1.0, 100))
+    current = _suite(seed=(1.1, 100.0), profile=(3.0, 100.0), detect=(1e-4, 100.0), api=(1, 1))
+
+    report = compare(base, current)
+    assert report["compared"] == 3
+    assert [r["stage"] for r in report["regressions"]] == ["profile"]
+    assert report["missing"] == [{"stage": "fk", "scale": 1.0}]
+
+    fat = _suite(seed=(1.0, 200.0))
+    assert [r["stage"] for r in compare(base, fat)["regressions"]] == ["seed"]
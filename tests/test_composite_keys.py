@@ -0,0 +1,47 @@
+from dqa.anomaly.batch import detect_anomalies_batch
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.dbtgen.schema_generator import generate_dbt_schema
+from dqa.profiling.parallel import ParallelConfig, profile_tables_parallel
+from dqa.profiling.profiler import PROFILE_ENGINES, TableSpec, profile_table
+
+
+def test_composite_key_is_checked_once_and_the_same_by_every_engine(tmp_path):
+    con = DuckDBConnector(tmp_path / "w.duckdb")
+    # 1000 (order_id, line_no) lines; (7, 1) three times and (8, 2) twice
+    con.exec(
+        """
+        CREATE TABLE order_lines AS
+        SELECT range // 4 AS order_id, range % 4 AS line_no, range AS line_id, 1.5 AS amount
+        FROM range(1000)
+        UNION ALL SELECT 7, 1, 5000, 2.0 UNION ALL SELECT 7, 1, 5001, 2.0
+        UNION ALL SELECT 8, 2, 5002, 2.0;
+        """
+    )
+    spec = TableSpec(
+        "order_lines",
+        key_columns=["line_id", "order_id"],
+        ts_columns=[],
+        fk={},
+        composite_keys=[("order_id", "line_no")],
+    )
+    for engine in PROFILE_ENGINES:
+        p = profile_table(con, "order_lines", spec, engine=engine)
+        info = p["key_duplicates"]["order_id+line_no"]
+        assert (info["duplicate_rows"], info["duplicate_groups"]) == (5, 2), engine
+        assert info["sample_keys"][0] == ["7", "1"], engine
+        assert p["key_duplicate_rates"]["line_id"] == 0.0, engine
+        assert p["key_duplicates"]["order_id"]["duplicate_groups"] == 250, engine
+        if engine == "sql":
+            sql_keys = p["key_duplicates"]
+
+    # column groups: the key spans two groups and is still checked once
+    profiles, _ = profile_tables_parallel(con, [spec], ParallelConfig(column_group_size=1))
+    assert profiles["order_lines"]["key_duplicates"] == sql_keys
+
+    findings = detect_anomalies_batch([(profiles["order_lines"], profiles["order_lines"])])
+    (dup,) = [f for f in findings if f.details["column"] == "order_id+line_no"]
+    assert dup.details["columns"] == ["order_id", "line_no"]
+    assert dup.details["duplicate_groups"] == 2
+    model = generate_dbt_schema([dup])["models"][0]
+    combination = {"combination_of_columns": ["order_id", "line_no"]}
+    assert model["tests"] == [{"dbt_utils.unique_combination_of_columns": combination}]
@@ -0,0 +1,54 @@
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.datagen.warehouse import BAD_DAY_RATES, TABLES, seed_warehouse
+
+
+def _checksums(con):
+    return {
+        t: con.fetchdf(f"SELECT count(*) AS n, sum(hash({t}))::VARCHAR AS h FROM {t};")
+        .iloc[0]
+        .tolist()
+        for t in TABLES
+    }
+
+
+def test_seeder_is_deterministic_and_chunking_invariant(tmp_path):
+    con = DuckDBConnector(tmp_path / "w.duckdb")
+    counts = seed_warehouse(con, "bad_day", scale=0.5)
+    first = _checksums(con)
+    seed_warehouse(con, "bad_day", scale=0.5, chunk_rows=777)
+    assert _checksums(con) == first
+    assert counts["dim_customers"] == 1000
+    assert counts["fact_orders"] > 4000
+
+    seed_warehouse(con, "bad_day", scale=0.5, seed=8)
+    assert _checksums(con) != first
+
+
+def test_bad_day_anomalies_scale_with_the_data(tmp_path):
+    con = DuckDBConnector(tmp_path / "w.duckdb")
+    base = seed_warehouse(con, "baseline", scale=25)
+    bad = seed_warehouse(con, "bad_day", scale=25)
+    n = base["fact_orders"]
+
+    dups = bad["fact_orders"] - n
+    assert abs(dups - BAD_DAY_RATES["duplicate_orders"] * n) < 0.25 * BAD_DAY_RATES[
+        "duplicate_orders"
+    ] * n
+
+    row = con.fetchdf(
+        """
+        SELECT count(*) FILTER (WHERE o.customer_id IS NULL) AS null_rows,
+               count(*) FILTER (WHERE o.customer_id IS NOT NULL AND c.customer_id IS NULL)
+                 AS fk_rows
+        FROM fact_orders o LEFT JOIN dim_customers c USING (customer_id);
+        """
+    ).iloc[0]
+    total = bad["fact_orders"]
+    for metric, rate in (("null_rows", "null_customer"), ("fk_rows", "fk_break")):
+        expected = BAD_DAY_RATES[rate] * total
+        assert abs(row[metric] - expected) < 0.25 * expected
+
+    orphans = con.fetchdf(
+        "SELECT count(*) AS n FROM fact_payments p ANTI JOIN fact_orders o USING (order_id);"
+    )["n"][0]
+    assert orphans == bad["fact_payments"] - base["fact_payments"] > 0
@@ -0,0 +1,74 @@
+import yaml
+
+from dqa.anomaly.detector import Finding
+from dqa.dbtgen.schema_generator import generate_dbt_schema, write_schema_files
+
+
+def finding(kind, column, **details):
+    return Finding("WARN", "fact_orders", kind, "", {"column": column, **details})
+
+
+def test_generated_tests_are_deduplicated():
+    schema = generate_dbt_schema(
+        [
+            finding("DUPLICATE_KEY", "order_id"),
+            finding("DUPLICATE_KEY", "order_id"),
+            finding("NULL_SPIKE", "customer_id"),
+            finding("NULL_SPIKE", "customer_id"),
+            finding("P99_JUMP", "amount", today_p99=100.0),
+            finding("P99_JUMP", "amount", today_p99=200.0),
+        ]
+    )
+    (model,) = schema["models"]
+    tests = {c["name"]: c["tests"] for c in model["columns"]}
+    assert tests["order_id"] == ["unique"]
+    assert tests["customer_id"] == ["not_null"]
+    assert tests["amount"] == [{"accepted_range": {"min_value": 0, "max_value": 240.0}}]
+
+
+def test_schema_files_merge_with_earlier_tests_and_skip_unchanged(tmp_path):
+    legacy = {
+        "version": 2,
+        "models": [
+            {"name": "fact_orders", "columns": [{"name": "status", "tests": ["not_null"]}]},
+            {"name": "dim_customers", "columns": [{"name": "email", "tests": ["unique"]}]},
+        ],
+    }
+    (tmp_path / "schema.yml").write_text(yaml.safe_dump(legacy, sort_keys=False))
+
+    schema = generate_dbt_schema([finding("NULL_SPIKE", "customer_id")])
+    written = write_schema_files(schema, tmp_path)
+    assert sorted(p.name for p in written) == ["dim_customers.yml", "fact_orders.yml"]
+    assert not (tmp_path / "schema.yml").exists()
+
+    orders = yaml.safe_load((tmp_path / "fact_orders.yml").read_text())["models"][0]
+    assert {c["name"]: c["tests"] for c in orders["columns"]} == {
+        "status": ["not_null"],
+        "order_id": ["unique"],
+        "customer_id": ["not_null"],
+    }
+
+    # same findings again: nothing to write
+    assert write_schema_files(schema, tmp_path) == []
+    # a new finding on a model adds to its file only
+    more = generate_dbt_schema(
+        [finding("DUPLICATE_KEY", "order_id+line_no", columns=["order_id", "line_no"])]
+    )
+    assert [p.name for p in write_schema_files(more, tmp_path)] == ["fact_orders.yml"]
+    orders = yaml.safe_load((tmp_path / "fact_orders.yml").read_text())["models"][0]
+    assert orders["tests"] == [
+        {
+            "dbt_utils.unique_combination_of_columns": {
+                "combination_of_columns": ["order_id", "line_no"]
+            }
+        }
+    ]
+    assert "order_id+line_no" not in {c["name"] for c in orders["columns"]}
+
+
+def test_schema_file_without_models_is_rewritten(tmp_path):
+    (tmp_path / "fact_orders.yml").write_text("version: 2\nmodels: []\n")
+    schema = generate_dbt_schema([finding("NULL_SPIKE", "customer_id")])
+    assert [p.name for p in write_schema_files(schema, tmp_path)] == ["fact_orders.yml"]
+    orders = yaml.safe_load((tmp_path / "fact_orders.yml").read_text())["models"][0]
+    assert {c["name"]: c["tests"] for c in orders["columns"]}["customer_id"] == ["not_null"]
@@ -0,0 +1,71 @@
+import gc
+import threading
+
+import duckdb
+import pytest
+from fastapi.testclient import TestClient
+
+from dqa.connectors.duckdb_conn import DuckDBConnector, DuckDBSettings
+
+
+def test_persistent_mode_reuses_per_thread_cursors(tmp_path):
+    con = DuckDBConnector(
+        tmp_path / "w.duckdb", persistent=True, settings=DuckDBSettings(threads=2)
+    )
+    con.exec("CREATE TABLE t AS SELECT range AS id FROM range(10);")
+    assert con.cursor() is con.cursor()
+    assert int(con.fetchdf("SELECT current_setting('threads') AS n;")["n"].iloc[0]) == 2
+
+    other = []
+    th = threading.Thread(target=lambda: other.append(con.cursor()))
+    th.start()
+    th.join()
+    assert other[0] is not con.cursor()
+    # the cursor of a finished thread goes with it
+    del th
+    gc.collect()
+    assert len(con._cursors) == 1
+
+    # close releases the file; the next statement reopens lazily
+    con.close()
+    assert int(con.fetchdf("SELECT count(*) AS n FROM t;")["n"].iloc[0]) == 10
+    con.close()
+
+
+def test_read_only_connector_rejects_writes(tmp_path):
+    db = tmp_path / "w.duckdb"
+    DuckDBConnector(db).exec("CREATE TABLE t (id INTEGER);")
+    ro = DuckDBConnector(db).for_profiling()
+    assert ro.read_only
+    with pytest.raises(duckdb.Error):
+        ro.exec("INSERT INTO t VALUES (1);")
+
+
+def test_api_lifespan_closes_connection():
+    from dqa.api.main import app
+
+    with TestClient(app) as client:
+        assert client.get("/").status_code == 200
+        con = app.state.worker.con
+        assert con.persistent
+    assert con._root is None
+
+
+def test_api_prewarm_keeps_connection_and_specs_loaded(monkeypatch):
+    from dqa.api.main import app
+
+    monkeypatch.setenv("DQA_PREWARM", "1")
+    with TestClient(app):
+        worker = app.state.worker
+        assert worker._con is not None and worker._cache is not None
+        registry = worker.registry
+        assert set(registry._index) == set(registry.names())
+        assert worker.registry is registry
+
+
+def test_api_cache_stats_do_not_load_the_pipeline():
+    from dqa.api.main import app
+
+    with TestClient(app) as client:
+        assert client.get("/dq/cache").json() is None
+        assert app.state.worker._cache is None and app.state.worker._con is None
@@ -0,0 +1,45 @@
+import duckdb
+
+from dqa.profiling.fk_validation import fk_graph, validate_foreign_keys
+from dqa.profiling.profiler import TableSpec
+from dqa.profiling.sql_profiler import compile_fk_query
+
+
+def test_fk_stage_shares_key_sets_and_reports_sample_keys():
+    c = duckdb.connect()
+    c.execute(
+        """
+        CREATE TABLE dim AS SELECT i AS id FROM range(100) r(i);
+        CREATE TABLE a AS SELECT i % 110 AS dim_id FROM range(1000) r(i);
+        CREATE TABLE b AS
+          SELECT CASE WHEN i % 50 = 0 THEN 999 WHEN i % 7 = 0 THEN NULL ELSE i % 100 END AS dim_id,
+                 i % 100 AS other_id
+          FROM range(500) r(i);
+        """
+    )
+    specs = [
+        TableSpec("dim", key_columns=["id"], ts_columns=[], fk={}),
+        TableSpec("a", key_columns=[], ts_columns=[], fk={"dim_id": ("dim", "id")}),
+        TableSpec(
+            "b",
+            key_columns=[],
+            ts_columns=[],
+            fk={"dim_id": ("dim", "id"), "other_id": ("dim", "id")},
+        ),
+    ]
+    graph = fk_graph(specs)
+    assert graph == {("dim", "id"): [("a", "dim_id"), ("b", "dim_id"), ("b", "other_id")]}
+    checks = [(t, col, "dim", "id") for t, col in graph[("dim", "id")]]
+    assert compile_fk_query(checks).count("AS MATERIALIZED") == 1
+
+    rows = {s.name: c.execute(f"SELECT count(*) FROM {s.name}").fetchone()[0] for s in specs}
+    out = validate_foreign_keys(c, specs, rows, sample_keys=3)
+
+    assert out["dim"] == {}
+    # a: values 100..109 never exist in dim, each appears 9 times over 1000 rows
+    assert out["a"]["dim_id"]["bad_rows"] == 90
+    assert out["a"]["dim_id"]["bad_rate"] == 90 / 1000
+    assert out["a"]["dim_id"]["sample_keys"] == ["100", "101", "102"]
+    # b: NULLs are not violations; 999 appears once every 50 rows
+    assert out["b"]["dim_id"] == {"bad_rows": 10, "bad_rate": 10 / 500, "sample_keys": ["999"]}
+    assert out["b"]["other_id"] == {"bad_rows": 0, "bad_rate": 0.0, "sample_keys": []}
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.datagen.warehouse import seed_warehouse
+from dqa.profiling.profiler import E_COMMERCE_SPECS, profile_table
+from dqa.profiling.sketches import HyperLogLog, TDigest
+
+
+def seed(tmp_path, mode: str) -> DuckDBConnector:
+    con = DuckDBConnector(tmp_path / "warehouse.duckdb")
+    seed_warehouse(con, mode)
+    return con
+
+
+def test_sketches_merge_and_roundtrip():
+    values = np.random.default_rng(7).normal(100, 20, 50_000)
+    a, b = np.array_split(values, 2)
+
+    ha, hb = HyperLogLog(hash_fn="pandas"), HyperLogLog(hash_fn="pandas")
+    ha.add_hashes(pd.util.hash_array(np.arange(0, 30_000)))
+    hb.add_hashes(pd.util.hash_array(np.arange(20_000, 50_000)))
+    merged = HyperLogLog.from_dict(ha.to_dict()).merge(hb)
+    assert merged.estimate() == pytest.approx(50_000, rel=0.05)
+    with pytest.raises(ValueError):
+        merged.merge(HyperLogLog(hash_fn="duckdb"))
+
+    ta, tb = TDigest(), TDigest()
+    ta.update(a)
+    tb.update(b)
+    td = TDigest.from_dict(ta.to_dict()).merge(tb)
+    for q in (0.5, 0.95, 0.99):
+        assert td.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.01)
+
+
+def test_incremental_profile_merges_partitions_and_only_refreshes_new_days(tmp_path):
+    con = seed(tmp_path, "baseline")
+    spec = next(s for s in E_COMMERCE_SPECS if s.name == "fact_orders")
+
+    full = profile_table(con, spec.name, spec, engine="sql")
+    inc = profile_table(con, spec.name, spec, engine="incremental")
+    assert inc["incremental"]["since"] is None
+    assert inc["row_count"] == full["row_count"]
+    assert inc["null_rates"] == pytest.approx(full["null_rates"])
+    assert inc["freshness"] == full["freshness"]
+    assert inc["key_duplicate_rates"] == full["key_duplicate_rates"]
+    for c, n in full["distinct_counts"].items():
+        assert inc["distinct_counts"][c] == pytest.approx(n, rel=0.05)
+    for c, stats in full["numeric_stats"].items():
+        assert inc["numeric_stats"][c] == pytest.approx(stats, rel=0.02)
+
+    # a new day lands: only the watermark day and the new day are re-profiled
+    con.exec(
+        """
+        INSERT INTO fact_orders
+        SELECT 'N' || order_id, customer_id, order_ts + INTERVAL 3 DAY,
+               status, amount, currency, channel
+        FROM fact_orders LIMIT 500;
+        """
+    )
+    inc2 = profile_table(con, spec.name, spec, engine="incremental")
+    full2 = profile_table(con, spec.name, spec, engine="sql")
+    assert inc2["incremental"]["since"] is not None
+    assert inc2["incremental"]["partitions_refreshed"] < inc2["incremental"]["partitions_total"]
+    assert inc2["row_count"] == full2["row_count"]
+    assert inc2["freshness"] == full2["freshness"]
+    assert inc2["null_rates"] == pytest.approx(full2["null_rates"])
@@ -0,0 +1,52 @@
+import pytest
+
+from dqa.connectors.duckdb_conn import DuckDBConnector, DuckDBSettings
+from dqa.datagen.warehouse import seed_warehouse
+from dqa.profiling.parallel import ParallelConfig, profile_tables_parallel
+from dqa.profiling.profiler import E_COMMERCE_SPECS, TableSpec, profile_table
+
+
+def seed(tmp_path, mode: str) -> DuckDBConnector:
+    con = DuckDBConnector(tmp_path / "warehouse.duckdb")
+    seed_warehouse(con, mode)
+    return con
+
+
+def test_parallel_profiles_match_sequential_with_column_groups(tmp_path):
+    con = seed(tmp_path, "bad_day")
+    sequential = {s.name: profile_table(con, s.name, s) for s in E_COMMERCE_SPECS}
+
+    config = ParallelConfig(
+        max_workers=4, memory_budget_bytes=256 * 1024 * 1024, column_group_size=2
+    )
+    profiles, timings = profile_tables_parallel(con, E_COMMERCE_SPECS, config)
+
+    assert list(profiles) == [s.name for s in E_COMMERCE_SPECS]
+    assert set(timings) == set(profiles)
+    assert all(t >= 0 for t in timings.values())
+    for name, prof in sequential.items():
+        assert profiles[name]["row_count"] == prof["row_count"]
+        assert profiles[name]["distinct_counts"] == prof["distinct_counts"]
+        assert profiles[name]["null_rates"] == pytest.approx(prof["null_rates"])
+        assert profiles[name]["key_duplicate_rates"] == prof["key_duplicate_rates"]
+        assert profiles[name]["fk_violations"] == prof["fk_violations"]
+        assert profiles[name]["freshness"] == prof["freshness"]
+        assert profiles[name]["categorical_top"] == prof["categorical_top"]
+        for c, stats in prof["numeric_stats"].items():
+            assert profiles[name]["numeric_stats"][c] == pytest.approx(stats)
+
+
+def test_memory_budget_does_not_outlive_the_call_on_a_persistent_connection(tmp_path):
+    con = DuckDBConnector(
+        tmp_path / "w.duckdb", persistent=True, settings=DuckDBSettings(memory_limit="1GB")
+    )
+    con.exec("CREATE TABLE t AS SELECT range AS id FROM range(100);")
+    spec = TableSpec("t", key_columns=["id"], ts_columns=[], fk={})
+
+    def limit() -> str:
+        return con.cursor().execute("SELECT current_setting('memory_limit');").fetchone()[0]
+
+    before = limit()
+    profile_tables_parallel(con, [spec], ParallelConfig(memory_budget_bytes=64 * 1024 * 1024))
+    assert limit() == before
+    con.close()
@@ -0,0 +1,59 @@
+import time
+
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.profiling.cache import ProfileCache, profile_tables_cached
+from dqa.profiling.profiler import TableSpec
+
+SPECS = [
+    TableSpec("dim", key_columns=["id"], ts_columns=[], fk={}),
+    TableSpec("fact", key_columns=["fid"], ts_columns=["ts"], fk={"dim_id": ("dim", "id")}),
+]
+
+
+def test_cache_serves_unchanged_tables_and_invalidates_dependents(tmp_path):
+    con = DuckDBConnector(tmp_path / "w.duckdb")
+    con.exec(
+        """
+        CREATE TABLE dim AS SELECT i AS id, 'n' || i AS name FROM range(100) r(i);
+        CREATE TABLE fact AS
+          SELECT i AS fid, i % 120 AS dim_id, TIMESTAMP '2024-01-01' + to_minutes(i) AS ts
+          FROM range(1000) r(i);
+        """
+    )
+    cache = ProfileCache(con)
+
+    cold, _, served = profile_tables_cached(con, cache, SPECS)
+    assert served == []
+    t0 = time.perf_counter()
+    warm, timings, served = profile_tables_cached(con, cache, SPECS)
+    assert time.perf_counter() - t0 < 1.0
+    assert served == ["dim", "fact"] and timings == {}
+    assert warm == cold
+    assert cache.stats.to_dict()["hits"] == 2 and cache.stats.misses == 2
+
+    # an in-place update keeps row count and max ts, but the checksum changes;
+    # fact's FK check depends on dim, so both are re-profiled
+    con.exec("UPDATE dim SET id = id + 1000 WHERE id = 5;")
+    after, _, served = profile_tables_cached(con, cache, SPECS)
+    assert served == []
+    assert (
+        after["fact"]["fk_violations"]["dim_id"]["bad_rows"]
+        > cold["fact"]["fk_violations"]["dim_id"]["bad_rows"]
+    )
+
+
+def test_cache_evicts_least_recently_used_and_expired_entries(tmp_path):
+    con = DuckDBConnector(tmp_path / "w.duckdb")
+    con.exec(
+        "CREATE TABLE dim AS SELECT i AS id FROM range(10) r(i);"
+        "CREATE TABLE fact AS SELECT i AS fid, i AS dim_id, NULL::TIMESTAMP AS ts "
+        "FROM range(10) r(i);"
+    )
+    cache = ProfileCache(con, max_entries=1)
+    profile_tables_cached(con, cache, SPECS)
+    assert cache.stats.evictions == 1
+    assert con.fetchdf("SELECT count(*) AS n FROM dq_profile_cache;")["n"][0] == 1
+
+    expired = ProfileCache(con, ttl_seconds=0)
+    _, _, served = profile_tables_cached(con, expired, SPECS)
+    assert served == [] and expired.stats.evictions >= 1
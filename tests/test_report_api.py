@@ -0,0 +1,61 @@
+import json
+
+from fastapi.testclient import TestClient
+
+import dqa.api.main as api
+from dqa.anomaly.detector import Finding
+from dqa.reporting.report_reader import iter_records
+from dqa.reporting.report_writer import write_markdown_report
+from dqa.utils.config import Paths
+
+
+def test_report_is_streamed_with_etag_and_findings_are_filterable(tmp_path, monkeypatch):
+    findings = [
+        Finding(sev, f"t{i % 3}", "NULL_SPIKE", f"finding {i}", {"column": "c"})
+        for i, sev in enumerate(["CRITICAL", "WARN"] * 150)
+    ]
+    profiles = {f"t{i}": {"row_count": i, "freshness": {"ts": "2026-01-01"}} for i in range(3)}
+    write_markdown_report("r1", "bad_day", findings, profiles, tmp_path, trace=None)
+    monkeypatch.setattr(api, "PATHS", Paths(generated_reports_dir=tmp_path))
+
+    with TestClient(api.app) as client:
+        md = client.get("/dq/report/r1", headers={"Accept-Encoding": "gzip"})
+        assert md.status_code == 200
+        assert md.headers["content-encoding"] == "gzip"
+        assert md.text.startswith("# DataQualityAgent Report")
+        assert "- **CRITICAL** `NULL_SPIKE` — finding 0" in md.text
+        not_modified = client.get("/dq/report/r1", headers={"If-None-Match": md.headers["etag"]})
+        assert not_modified.status_code == 304
+
+        page = client.get("/dq/report/r1/findings?severity=CRITICAL&table=t0&limit=20").json()
+        assert page["summary"]["by_severity"] == {"CRITICAL": 150, "WARN": 150}
+        assert len(page["items"]) == 20 and page["next_offset"] == 20
+        assert {(f["severity"], f["table"]) for f in page["items"]} == {("CRITICAL", "t0")}
+        last = client.get(
+            "/dq/report/r1/findings?severity=CRITICAL&table=t0&offset=40&limit=20"
+        ).json()
+        assert len(last["items"]) == 10 and last["next_offset"] is None
+
+        records = client.get("/dq/report/r1/records?type=profile&table=t2")
+        assert [json.loads(line) for line in records.text.splitlines()] == [
+            {"type": "profile", "table": "t2", "row_count": 2, "key_duplicate_rates": {},
+             "fk_violations": {}, "freshness": {"ts": "2026-01-01"}}
+        ]
+        assert client.get("/dq/report/r1/findings?severity=INFO").status_code == 400
+        assert client.get("/dq/report/missing/records").status_code == 404
+
+    # the raw NDJSON holds the same findings as the Markdown
+    raw = (tmp_path / "run_r1.ndjson").read_bytes()
+    assert sum(1 for line in raw.splitlines() if b'"type":"finding"' in line) == 300
+
+
+def test_records_are_filtered_by_type_whatever_the_key_order(tmp_path):
+    path = tmp_path / "run_r1.ndjson"
+    lines = [
+        {"type": "finding", "table": "t0", "severity": "WARN"},
+        {"table": "t1", "severity": "CRITICAL", "type": "finding"},
+        {"table": "t1", "type": "profile", "row_count": 1},
+    ]
+    path.write_text("".join(json.dumps(x) + "\n" for x in lines), encoding="utf-8")
+    assert list(iter_records(path, ("finding",), severities=("CRITICAL",))) == [lines[1]]
+    assert list(iter_records(path, ("profile",))) == [lines[2]]
@@ -0,0 +1,91 @@
+from dqa.anomaly.batch import detect_anomalies_batch
+from dqa.anomaly.detector import detect_anomalies
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.profiling.profiler import TableSpec, profile_table
+from dqa.profiling.sampling import SamplingSpec
+from dqa.profiling.sql_profiler import compile_sample_query
+
+ROWS = 200_000
+
+
+def _seed(con):
+    # 2% null amounts, one duplicated id, one orphan FK, and a sparse last day
+    con.exec(
+        f"""
+        CREATE TABLE dim AS SELECT i AS id FROM range(1000) r(i);
+        CREATE TABLE events AS
+          SELECT CASE WHEN i = 7 THEN 8 ELSE i END AS id,
+                 CASE WHEN i = 11 THEN 5000 ELSE i % 1000 END AS dim_id,
+                 CASE WHEN i % 50 = 0 THEN NULL ELSE (i % 997)::DOUBLE END AS amount,
+                 'c' || (i % 7) AS kind,
+                 'x' || i AS payload,
+                 TIMESTAMP '2024-01-01' + to_seconds(
+                   CASE WHEN i < 10 THEN 3 * 86400 + i ELSE i % (3 * 86400) END) AS ts
+          FROM range({ROWS}) r(i);
+        """
+    )
+
+
+def test_policies_and_sampling_keep_full_data_checks_exact(tmp_path):
+    con = DuckDBConnector(tmp_path / "w.duckdb")
+    _seed(con)
+    spec = TableSpec(
+        "events",
+        key_columns=["id"],
+        ts_columns=["ts"],
+        fk={"dim_id": ("dim", "id")},
+        column_policies={"payload": "skip", "kind": "nulls", "amount": "full"},
+        default_policy="nulls",
+        sampling=SamplingSpec(method="bernoulli", rows=5_000),
+    )
+    prof = profile_table(con, "events", spec)
+
+    assert prof["row_count"] == ROWS
+    assert set(prof["null_rates"]) == {"id", "dim_id", "amount", "kind", "ts"}
+    assert set(prof["distinct_counts"]) == {"amount"} and set(prof["numeric_stats"]) == {"amount"}
+    assert prof["categorical_top"] == {}
+    # one duplicate and one orphan in 200k rows: only a full scan finds them
+    assert prof["key_duplicate_rates"]["id"] == 2 / ROWS
+    assert prof["fk_violations"]["dim_id"]["bad_rows"] == 1
+    assert prof["freshness"]["ts"] == "2024-01-04 00:00:09"
+
+    acc = prof["accuracy"]
+    assert acc["mode"] == "sampled" and 3_000 < acc["sample"]["rows"] < 7_000
+    lo, hi = acc["null_rate_bounds"]["amount"]
+    assert lo <= 0.02 <= hi
+    lo, hi = acc["p99_bounds"]["amount"]
+    assert lo <= 986 <= hi
+    lo, hi = acc["distinct_bounds"]["amount"]
+    assert lo <= 997 <= hi
+
+    stratified = TableSpec(
+        "events",
+        key_columns=[],
+        ts_columns=["ts"],
+        fk={},
+        sampling=SamplingSpec(method="stratified", rows=2_000, stratify_by="ts"),
+    )
+    prof = profile_table(con, "events", stratified)
+    assert prof["accuracy"]["sample"]["rows"] >= 2_000
+    # the 10-row last day is still represented in the sample
+    sql = compile_sample_query("events", "ts", stratified.sampling, ROWS)
+    days = con.fetchdf(f"SELECT count(DISTINCT ts::DATE) AS n FROM ({sql});")["n"][0]
+    assert days == 4
+
+
+def test_null_spike_rule_respects_sampling_intervals():
+    base = {"table": "t", "row_count": 100, "null_rates": {"c": 0.0}}
+    exact = {"table": "t", "row_count": 100, "null_rates": {"c": 0.021}}
+    sampled = {**exact, "accuracy": {"null_rate_bounds": {"c": [0.015, 0.028]}}}
+
+    assert [f.kind for f in detect_anomalies(exact, base)] == ["NULL_SPIKE"]
+    assert detect_anomalies(sampled, base) == []
+    assert detect_anomalies_batch([(sampled, base)]) == []
+
+    clear = {
+        **exact,
+        "null_rates": {"c": 0.2},
+        "accuracy": {"null_rate_bounds": {"c": [0.18, 0.22]}},
+    }
+    assert detect_anomalies_batch([(clear, base)]) == detect_anomalies(clear, base)
+    assert len(detect_anomalies(clear, base)) == 1
@@ -0,0 +1,71 @@
+import pytest
+
+import scripts.run_dq as run_dq
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.profiling.registry import SpecRegistry
+from dqa.profiling.selection import parse_selector, select_tables
+from dqa.reporting.run_log import load_run
+from dqa.utils.config import PATHS, Paths
+
+
+def test_selectors_resolve_globs_tags_columns_and_fk_parents(tmp_path):
+    con = DuckDBConnector(tmp_path / "w.duckdb")
+    con.exec(
+        """
+        CREATE TABLE dim_customers (customer_id VARCHAR, created_at TIMESTAMP);
+        CREATE TABLE fact_orders (order_id VARCHAR, customer_id VARCHAR, amount DOUBLE,
+                                  order_ts TIMESTAMP);
+        CREATE TABLE fact_payments (payment_id VARCHAR, order_id VARCHAR, amount DOUBLE,
+                                    payment_ts TIMESTAMP);
+        """
+    )
+    reg = SpecRegistry.from_yaml(PATHS.table_registry, con)
+
+    assert select_tables(reg, []).tables == reg.names()
+    assert select_tables(reg, ["fact_*"]).tables == ["fact_orders", "fact_payments"]
+    money = select_tables(reg, ["tag:finance.tag:money", "fact_orders.*_ts"])
+    assert money.columns == {"fact_orders": ["amount", "order_ts"], "fact_payments": ["amount"]}
+    spec = money.narrow(reg["fact_payments"])
+    assert spec.default_policy == "skip" and spec.column_policies == {"amount": "full"}
+    # a whole-table selector wins over a column selector on the same table
+    assert select_tables(reg, ["fact_orders.amount", "tag:orders"]).columns == {}
+
+    deps = select_tables(reg, ["fact_payments.amount"], parents=True)
+    assert deps.tables == ["dim_customers", "fact_orders", "fact_payments"]
+    assert deps.parents == ["dim_customers", "fact_orders"]
+    assert deps.columns == {"fact_payments": ["amount"]}
+
+    with pytest.raises(ValueError, match="matches no table"):
+        select_tables(reg, ["fact_order"])
+    with pytest.raises(ValueError, match="matches no table"):
+        select_tables(reg, ["dim_*.amount"])
+    with pytest.raises(ValueError, match="invalid selector"):
+        parse_selector("fact_orders.")
+
+
+def test_targeted_run_profiles_reports_and_writes_only_the_selection(tmp_path, monkeypatch):
+    paths = Paths(
+        generated_dbt_models_dir=tmp_path / "models",
+        generated_reports_dir=tmp_path / "reports",
+    )
+    monkeypatch.setattr(run_dq, "PATHS", paths)
+    con = DuckDBConnector(tmp_path / "w.duckdb")
+
+    out = run_dq.run("bad_day", con=con, scale=0.1, select=["fact_payments.amount"])
+    assert out["selection"] == {
+        "tables": ["fact_payments"],
+        "columns": {"fact_payments": ["amount"]},
+        "parents": [],
+    }
+    assert out["baseline_rebuilt"] == ["fact_payments"]
+    # the summary only carries stage seconds; the full trace stays in dq_runs
+    assert "trace" not in out and out["stage_seconds"]["profile"] > 0
+    assert load_run(con, out["run_id"])["trace"]["slow_queries"]
+    assert set(out["profile_seconds"]) == {"fact_payments"}
+    # orphaned payments are still caught: FK checks ignore column selectors
+    assert out["findings_count"] > 0
+    assert out["dbt_models_written"] == ["fact_payments.yml"]
+    assert [p.name for p in paths.generated_dbt_models_dir.glob("*.yml")] == ["fact_payments.yml"]
+    report = (paths.generated_reports_dir / f"run_{out['run_id']}.md").read_text()
+    assert "- **Tables:** `fact_payments`" in report
+    assert "### fact_orders" not in report
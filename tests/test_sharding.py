@@ -0,0 +1,55 @@
+import pytest
+
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.datagen.warehouse import seed_warehouse
+from dqa.profiling.parallel import profile_tables_parallel
+from dqa.profiling.profiler import E_COMMERCE_SPECS, TableSpec
+from dqa.profiling.sharding import (
+    ShardError,
+    TableCost,
+    estimate_sla,
+    plan_shards,
+    profile_tables_sharded,
+)
+
+
+def test_plan_balances_cost_and_keeps_spec_order():
+    costs = {
+        name: TableCost(name, rows, 10)
+        for name, rows in [("a", 900), ("b", 500), ("c", 400), ("d", 300), ("e", 100)]
+    }
+    plan = plan_shards(costs, 2)
+    assert plan == [["a", "d"], ["b", "c", "e"]]  # 12000 vs 10000 cells
+    assert plan_shards(costs, 10) == [["a"], ["b"], ["c"], ["d"], ["e"]]
+
+    est = estimate_sla(costs, 2, 2, cells_per_second=1000, sla_seconds=13)
+    assert est["shards"] == 2
+    assert est["estimated_seconds"] == 14.0  # 12000 cells / 1000/s + 2 s overhead
+    assert est["fits"] is False
+    assert est["shards_needed"] == 3
+
+
+def test_failed_shard_is_retried_alone_after_the_fix(tmp_path):
+    con = DuckDBConnector(tmp_path / "w.duckdb")
+    seed_warehouse(con, "bad_day", scale=0.05)
+    ghost = TableSpec("ghost", key_columns=["id"], ts_columns=[], fk={})
+    specs = list(E_COMMERCE_SPECS) + [ghost]
+    checkpoints = tmp_path / "shards"
+
+    with pytest.raises(ShardError) as err:
+        profile_tables_sharded(con, specs, shards=4, workers=2, checkpoint_dir=checkpoints)
+    assert len(err.value.failed) == 1
+    assert len(list(checkpoints.glob("shard-*.json"))) == 3
+
+    con.exec("CREATE TABLE ghost AS SELECT range AS id FROM range(10);")
+    out = profile_tables_sharded(con, specs, shards=4, workers=2, checkpoint_dir=checkpoints)
+    assert [s["resumed"] for s in out.shards].count(False) == 1
+    assert list(out.profiles) == [s.name for s in specs]
+    assert out.profiles["ghost"]["row_count"] == 10
+
+    expected, _ = profile_tables_parallel(con.for_profiling(), E_COMMERCE_SPECS)
+    for s in E_COMMERCE_SPECS:
+        got = out.profiles[s.name]
+        assert got["row_count"] == expected[s.name]["row_count"]
+        assert got["null_rates"] == pytest.approx(expected[s.name]["null_rates"])
+        assert got["fk_violations"] == expected[s.name]["fk_violations"]
@@ -1,25 +1,22 @@
-import subprocess
-import sys
-
+from dqa.anomaly.detector import detect_anomalies
 from dqa.connectors.duckdb_conn import DuckDBConnector
-from dqa.utils.config import PATHS
+from dqa.datagen.warehouse import seed_warehouse
 from dqa.profiling.profiler import E_COMMERCE_SPECS, profile_table
-from dqa.anomaly.detector import detect_anomalies
 
 
-def seed(mode: str):
-    subprocess.run([sys.executable, "scripts/seed_warehouse.py", "--mode", mode], check=True)
+def seed(tmp_path, mode: str) -> DuckDBConnector:
+    con = DuckDBConnector(tmp_path / "warehouse.duckdb")
+    seed_warehouse(con, mode)
+    return con
 
 
-def test_pipeline_detects_bad_day_findings():
+def test_pipeline_detects_bad_day_findings(tmp_path):
     # baseline profiles
-    seed("baseline")
-    con = DuckDBConnector(PATHS.db_path)
+    con = seed(tmp_path, "baseline")
     baseline = {s.name: profile_table(con, s.name, s) for s in E_COMMERCE_SPECS}
 
     # bad day profiles + compare
-    seed("bad_day")
-    con = DuckDBConnector(PATHS.db_path)
+    con = seed(tmp_path, "bad_day")
     findings = []
     for s in E_COMMERCE_SPECS:
         today = profile_table(con, s.name, s)
@@ -0,0 +1,64 @@
+import pytest
+
+import dqa.profiling.registry as registry
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.profiling.profiler import E_COMMERCE_SPECS
+from dqa.profiling.registry import SpecRegistry
+from dqa.utils.config import PATHS
+
+
+def test_yaml_registry_matches_builtin_specs_and_builds_lazily():
+    reg = SpecRegistry.from_yaml(PATHS.table_registry)
+    assert reg.names() == [s.name for s in E_COMMERCE_SPECS]
+    assert reg._index == {}
+    assert reg["fact_orders"] == E_COMMERCE_SPECS[1]
+    assert list(reg._index) == ["fact_orders"]
+    assert reg.specs() == E_COMMERCE_SPECS
+    assert reg.get("missing") is None
+    with pytest.raises(KeyError):
+        reg.specs(["missing"])
+
+
+def test_discovery_reads_the_catalog_and_is_cached_per_table_version(tmp_path, monkeypatch):
+    con = DuckDBConnector(tmp_path / "w.duckdb")
+    con.exec(
+        """
+        CREATE TABLE dim_stores (store_id INTEGER PRIMARY KEY, opened_on DATE);
+        CREATE TABLE fact_sales (
+          sale_id INTEGER, line_no INTEGER, store_id INTEGER, customer_id INTEGER,
+          sold_at TIMESTAMP, UNIQUE (sale_id, line_no)
+        );
+        CREATE TABLE dim_customers (customer_id INTEGER, email VARCHAR);
+        """
+    )
+    reg = SpecRegistry(
+        {"dim_customers": {"discover": True, "ts_columns": ["email"]}},
+        con=con,
+        include=["fact_*", "dim_*"],
+    )
+    assert reg.names() == ["dim_customers", "dim_stores", "fact_sales"]
+    sales = reg["fact_sales"]
+    assert sales.key_columns == [] and sales.composite_keys == [("sale_id", "line_no")]
+    assert sales.ts_columns == ["sold_at"]
+    assert sales.fk == {
+        "store_id": ("dim_stores", "store_id"),
+        "customer_id": ("dim_customers", "customer_id"),
+    }
+    assert reg["dim_stores"].key_columns == ["store_id"]
+    # declared fields override discovered ones
+    customers = reg["dim_customers"]
+    assert customers.key_columns == ["customer_id"] and customers.ts_columns == ["email"]
+
+    # a fresh registry reuses the cached discovery until a table changes
+    calls = []
+    discover = registry.discover_spec
+    monkeypatch.setattr(
+        registry, "discover_spec", lambda c, t: calls.append(t) or discover(c, t)
+    )
+    con.exec("ALTER TABLE dim_stores ADD COLUMN closed_at TIMESTAMP;")
+    again = SpecRegistry(con=con, include=["*"])
+    assert again.specs(["fact_sales", "dim_stores"])[0] == sales
+    assert calls == ["dim_stores"]
+    assert again["dim_stores"].ts_columns == ["opened_on", "closed_at"]
+    # a long-lived registry rebuilds specs of tables changed since it built them
+    assert reg["dim_stores"].ts_columns == ["opened_on", "closed_at"]
@@ -0,0 +1,35 @@
+import pytest
+
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.datagen.warehouse import seed_warehouse
+from dqa.profiling.profiler import E_COMMERCE_SPECS, profile_table
+
+
+def seed(tmp_path, mode: str) -> DuckDBConnector:
+    con = DuckDBConnector(tmp_path / "warehouse.duckdb")
+    seed_warehouse(con, mode)
+    return con
+
+
+def test_sql_engine_matches_pandas_engine(tmp_path):
+    con = seed(tmp_path, "bad_day")
+
+    for s in E_COMMERCE_SPECS:
+        sql = profile_table(con, s.name, s, engine="sql")
+        pdf = profile_table(con, s.name, s, engine="pandas")
+
+        assert sql["row_count"] == pdf["row_count"]
+        assert sql["distinct_counts"] == pdf["distinct_counts"]
+        assert sql["freshness"] == pdf["freshness"]
+        assert sql["null_rates"] == pytest.approx(pdf["null_rates"])
+        assert sql["key_duplicate_rates"] == pytest.approx(pdf["key_duplicate_rates"])
+        assert sql["fk_violations"] == pdf["fk_violations"]
+
+        assert sql["numeric_stats"].keys() == pdf["numeric_stats"].keys()
+        for c, stats in pdf["numeric_stats"].items():
+            assert sql["numeric_stats"][c] == pytest.approx(stats)
+
+        # value_counts breaks ties arbitrarily, so compare the count sequence
+        assert sql["categorical_top"].keys() == pdf["categorical_top"].keys()
+        for c, top in pdf["categorical_top"].items():
+            assert [t["count"] for t in sql["categorical_top"][c]] == [t["count"] for t in top]
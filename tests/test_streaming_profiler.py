@@ -0,0 +1,103 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.datagen.warehouse import seed_warehouse
+from dqa.profiling.profiler import E_COMMERCE_SPECS, TableSpec, profile_table
+from dqa.profiling.streaming import profile_table_streaming
+
+
+def seed(tmp_path, mode: str) -> DuckDBConnector:
+    con = DuckDBConnector(tmp_path / "warehouse.duckdb")
+    seed_warehouse(con, mode)
+    return con
+
+
+def test_streaming_profile_matches_push_down_profile(tmp_path):
+    con = seed(tmp_path, "bad_day")
+    for s in E_COMMERCE_SPECS:
+        full = profile_table(con, s.name, s, engine="sql")
+        streamed = profile_table_streaming(
+            con,
+            s.name,
+            s,
+            batch_size=1000,
+            row_checks={"has_table_key": lambda df, k=s.key_columns[0]: df[k].notna()},
+        )
+        assert streamed["streaming"]["batches"] >= full["row_count"] // 2048
+        assert streamed["row_count"] == full["row_count"]
+        assert streamed["null_rates"] == pytest.approx(full["null_rates"])
+        assert streamed["key_duplicate_rates"] == pytest.approx(full["key_duplicate_rates"])
+        assert streamed["fk_violations"] == full["fk_violations"]
+        assert streamed["freshness"] == full["freshness"]
+        assert streamed["custom_checks"]["has_table_key"]["failed_rows"] == round(
+            full["null_rates"][s.key_columns[0]] * full["row_count"]
+        )
+        for c, n in full["distinct_counts"].items():
+            assert streamed["distinct_counts"][c] == pytest.approx(n, rel=0.05)
+        for c, stats in full["numeric_stats"].items():
+            got = streamed["numeric_stats"][c]
+            for m in ("min", "max", "mean", "std"):
+                assert got[m] == pytest.approx(stats[m])
+            for m in ("p50", "p95", "p99"):
+                assert got[m] == pytest.approx(stats[m], rel=0.02)
+
+
+_RSS_PROBE = """
+import json, resource, sys
+from pathlib import Path
+from dqa.connectors.duckdb_conn import DuckDBConnector, DuckDBSettings
+from dqa.profiling.profiler import TableSpec
+from dqa.profiling.streaming import profile_table_streaming
+
+con = DuckDBConnector(Path(sys.argv[1]), settings=DuckDBSettings(memory_limit="64MB", threads=1))
+con.fetchdf("SELECT 1;")
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+prof = profile_table_streaming(
+    con, "big", TableSpec("big", key_columns=["id"], ts_columns=[], fk={}), batch_size=20_000
+)
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"rows": prof["row_count"], "batches": prof["streaming"]["batches"],
+                  "peak_growth_kb": after - before}))
+"""
+
+
+def test_streaming_peak_rss_is_bounded_by_batch_size(tmp_path):
+    db = tmp_path / "big.duckdb"
+    DuckDBConnector(db).exec(
+        "CREATE TABLE big AS SELECT range AS id, 'customer_' || (range % 100000) AS name, "
+        "random() * 100 AS amount FROM range(4000000);"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", _RSS_PROBE, str(db)], check=True, capture_output=True, text=True
+    )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    assert result["rows"] == 4_000_000
+    assert result["batches"] >= 200
+    # materializing the same table with fetchdf grows RSS by ~400 MB
+    assert result["peak_growth_kb"] < 100 * 1024
+
+
+def test_streaming_bloom_filter_is_capped_and_saturated_keys_are_pushed_down(tmp_path):
+    con = DuckDBConnector(tmp_path / "w.duckdb")
+    con.exec(
+        "CREATE TABLE t AS SELECT range AS id, range % 50000 AS grp FROM range(200000);"
+        "INSERT INTO t SELECT id, grp FROM t WHERE id % 1000 = 0;"
+    )
+    spec = TableSpec("t", key_columns=["id", "grp"], ts_columns=[], fk={})
+    exact = profile_table(con, "t", spec, engine="sql")["key_duplicates"]
+
+    capped = profile_table_streaming(con, "t", spec, batch_size=10_000, bloom_max_bytes=4096)
+    assert all(n <= 4096 for n in capped["streaming"]["bloom_bytes"].values())
+    assert "grp" in capped["streaming"]["keys_pushed_down"]
+    assert capped["key_duplicates"] == exact
+
+    # the Bloom path breaks ties among the most repeated keys arbitrarily
+    default = profile_table_streaming(con, "t", spec, batch_size=10_000)
+    assert default["streaming"]["keys_pushed_down"] == []
+    for label, info in exact.items():
+        got = dict(default["key_duplicates"][label], sample_keys=None)
+        assert got == dict(info, sample_keys=None)
@@ -0,0 +1,83 @@
+import duckdb
+import pytest
+
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.connectors.sources import TableSource
+from dqa.profiling.parallel import profile_tables_parallel
+from dqa.profiling.profiler import PROFILE_ENGINES, TableSpec, profile_table
+
+
+@pytest.fixture()
+def sources(tmp_path):
+    with duckdb.connect(str(tmp_path / "dims.duckdb")) as c:
+        c.execute("CREATE TABLE customers AS SELECT range AS customer_id FROM range(50);")
+    with duckdb.connect() as c:
+        c.execute(
+            f"""
+            COPY (
+              SELECT range AS order_id, range % 60 AS customer_id,
+                     TIMESTAMP '2026-01-01' + to_hours(range % 72) AS order_ts,
+                     strftime(TIMESTAMP '2026-01-01' + to_hours(range % 72), '%Y-%m-%d') AS day
+              FROM range(3000)
+            ) TO '{tmp_path / "orders"}' (FORMAT PARQUET, PARTITION_BY (day));
+            """
+        )
+    warehouse = DuckDBConnector(tmp_path / "w.duckdb")
+    warehouse.exec("CREATE TABLE other (x INTEGER);")
+    customers = TableSpec(
+        "src_customers",
+        key_columns=["customer_id"],
+        ts_columns=[],
+        fk={},
+        source=TableSource("duckdb", str(tmp_path / "dims.duckdb"), table="customers"),
+    )
+    orders = TableSpec(
+        "src_orders",
+        key_columns=["order_id"],
+        ts_columns=["order_ts"],
+        fk={"customer_id": ("src_customers", "customer_id")},
+        source=TableSource("parquet", str(tmp_path / "orders" / "*" / "*.parquet")),
+    )
+    return warehouse, customers, orders
+
+
+def test_parallel_profiling_reads_parquet_and_attached_sources_in_place(sources):
+    warehouse, customers, orders = sources
+    profiles, _ = profile_tables_parallel(warehouse.for_profiling(), [customers, orders])
+
+    assert profiles["src_customers"]["row_count"] == 50
+    p = profiles["src_orders"]
+    assert p["row_count"] == 3000
+    assert "day" in p["null_rates"]  # hive partition column
+    assert p["freshness"] == {"order_ts": "2026-01-03 23:00:00"}
+    assert p["fk_violations"]["customer_id"]["bad_rows"] == 500
+    # nothing was copied into the warehouse
+    with warehouse.connect() as c:
+        assert c.execute("SELECT table_name FROM duckdb_tables();").fetchall() == [("other",)]
+
+
+def test_every_engine_profiles_a_source_the_same_way(sources, tmp_path):
+    warehouse, customers, orders = sources
+    for engine in PROFILE_ENGINES:
+        con = warehouse if engine == "incremental" else warehouse.for_profiling()
+        p = profile_table(con, "src_orders", orders, engine=engine, referenced=[customers])
+        assert p["row_count"] == 3000, engine
+        assert p["key_duplicate_rates"] == {"order_id": 0.0}, engine
+        assert p["fk_violations"]["customer_id"]["bad_rows"] == 500, engine
+
+    # a filter on the partition column only reads the matching partitions
+    recent = TableSource(
+        "parquet", str(tmp_path / "orders" / "*" / "*.parquet"), where="day = '2026-01-03'"
+    )
+    spec = TableSpec("src_recent", ["order_id"], ["order_ts"], {}, source=recent)
+    assert profile_table(warehouse.for_profiling(), "src_recent", spec)["row_count"] == 984
+
+
+def test_fk_parents_outside_the_profiled_specs_are_passed_explicitly(sources):
+    warehouse, customers, orders = sources
+    con = warehouse.for_profiling()
+    profiles, _ = profile_tables_parallel(con, [orders], referenced=[customers])
+    assert profiles["src_orders"]["fk_violations"]["customer_id"]["bad_rows"] == 500
+    # building a spec registers nothing: an unnamed parent is a warehouse table
+    with pytest.raises(duckdb.CatalogException):
+        profile_tables_parallel(con, [orders])
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from dqa.anomaly.detector import Finding
+from dqa.anomaly.timeseries import MetricHistory, combine_findings, findings_from_scores
+from dqa.connectors.duckdb_conn import DuckDBConnector
+
+
+def _profile(rng, day: int, null_rate: float = 0.01):
+    # Saturdays carry 30% more rows, which a single-snapshot ratio rule flags
+    date = datetime(2026, 1, 1) + timedelta(days=day)
+    rows = 1_000 + int(rng.integers(-20, 20)) + (300 if date.weekday() == 5 else 0)
+    return {
+        "orders": {
+            "table": "orders",
+            "row_count": rows,
+            "null_rates": {"customer_id": null_rate + rng.uniform(0, 0.002)},
+            "numeric_stats": {"amount": {"p99": 100 + rng.normal(), "mean": 50 + rng.normal()}},
+        }
+    }
+
+
+def test_history_learns_weekly_pattern_and_flags_null_spike(tmp_path):
+    con = DuckDBConnector(tmp_path / "ts.duckdb")
+    history = MetricHistory(con)
+    rng = np.random.default_rng(0)
+    day0 = datetime(2026, 1, 1)
+    flagged_days = []
+    for d in range(35):
+        scores = history.observe(_profile(rng, d), f"r{d}", day0 + timedelta(days=d))
+        if findings_from_scores(scores):
+            flagged_days.append(d)
+    # the Saturday bump may surprise the EWMA early on, never once seasonal
+    assert all(d < 21 for d in flagged_days)
+
+    scores = history.observe(_profile(rng, 35, null_rate=0.2), "bad", day0 + timedelta(days=35))
+    findings = findings_from_scores(scores)
+    assert [(f.kind, f.severity, f.details["method"]) for f in findings] == [
+        ("NULL_RATE_ANOMALY", "CRITICAL", "seasonal")
+    ]
+
+    # stored model state equals a replay of the appended points
+    stored = history.load()
+    with con.connect() as c:
+        assert c.execute("SELECT count(*) FROM dq_metric_points").fetchone()[0] == 36 * 4
+        c.execute("DELETE FROM dq_metric_models")
+    replayed = history.load()
+    assert stored.keys == replayed.keys
+    assert np.allclose(stored.ewma, replayed.ewma)
+    assert np.array_equal(np.isnan(stored.ring), np.isnan(replayed.ring))
+    assert np.allclose(np.nan_to_num(stored.ring), np.nan_to_num(replayed.ring))
+
+
+def test_combine_findings_replaces_snapshot_drift_rules_once_ready(tmp_path):
+    history = MetricHistory(DuckDBConnector(tmp_path / "ts.duckdb"))
+    rng = np.random.default_rng(1)
+    day0 = datetime(2026, 1, 1)
+    for d in range(6):
+        scores = history.observe(_profile(rng, d), f"r{d}", day0 + timedelta(days=d))
+
+    snapshot = [
+        Finding("WARN", "orders", "ROW_COUNT_DRIFT", "drift", {"baseline": 1, "today": 2}),
+        Finding("CRITICAL", "orders", "DUPLICATE_KEY", "dups", {"column": "order_id"}),
+        Finding("CRITICAL", "orders", "NULL_SPIKE", "nulls", {"column": "customer_id"}),
+        Finding("CRITICAL", "orders", "NULL_SPIKE", "nulls", {"column": "email"}),
+    ]
+    kept = [(f.kind, f.details.get("column")) for f in combine_findings(snapshot, scores)]
+    # modelled metrics are judged by their history; email has none yet
+    assert kept == [("DUPLICATE_KEY", "order_id"), ("NULL_SPIKE", "email")]
+
+
+def test_observe_reads_and_writes_only_the_series_of_the_run(tmp_path):
+    history = MetricHistory(DuckDBConnector(tmp_path / "ts.duckdb"))
+    rng = np.random.default_rng(2)
+    day0 = datetime(2026, 1, 1)
+    for d in range(3):
+        both = {**_profile(rng, d), "users": {"table": "users", "row_count": 50}}
+        history.observe(both, f"r{d}", day0 + timedelta(days=d))
+    history.observe(_profile(rng, 3), "r3", day0 + timedelta(days=3))
+
+    models = history.load()
+    n = dict(zip(models.keys, models.n.tolist(), strict=True))
+    assert n[("users", "", "row_count")] == 3
+    assert n[("orders", "", "row_count")] == 4
+    assert history.load([("users", "", "row_count")]).keys == [("users", "", "row_count")]
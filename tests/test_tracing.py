@@ -0,0 +1,67 @@
+from fastapi.testclient import TestClient
+
+import dqa.api.main as api
+from dqa.connectors.duckdb_conn import DuckDBConnector
+from dqa.profiling.parallel import ParallelConfig, profile_tables_parallel
+from dqa.profiling.profiler import TableSpec
+from dqa.utils.tracing import Tracer, tracing
+
+SPECS = [
+    TableSpec("dim", key_columns=["id"], ts_columns=[], fk={}),
+    TableSpec("fact", key_columns=["fid"], ts_columns=[], fk={"dim_id": ("dim", "id")}),
+]
+
+
+def test_spans_nest_across_worker_threads_and_queries_are_timed(tmp_path):
+    con = DuckDBConnector(tmp_path / "w.duckdb")
+    con.exec(
+        "CREATE TABLE dim AS SELECT i AS id FROM range(50) r(i);"
+        "CREATE TABLE fact AS SELECT i AS fid, i % 60 AS dim_id FROM range(500) r(i);"
+    )
+    tracer = Tracer()
+    with tracing(tracer), tracer.span("profile"):
+        profile_tables_parallel(con, SPECS, ParallelConfig(max_workers=2))
+    # not traced once the context is left
+    con.fetchdf("SELECT 1;")
+
+    summary = tracer.summary()
+    relations = [s for s in summary["spans"] if s["name"] == "profile_relation"]
+    assert sorted(s["attrs"]["table"] for s in relations) == ["dim", "fact"]
+    assert all(s["parent"] == "profile" for s in relations)
+    assert summary["stages"]["profile_relation"]["queries"] > 0
+    assert summary["stages"]["fk_validation"]["queries"] > 0
+    assert summary["queries"]["count"] == sum(st["queries"] for st in summary["stages"].values())
+    assert summary["queries"]["rows"] > 0
+
+    with con.connect() as c:
+        assert tracer.explain_slowest(c, 1) == 1
+    assert "plan" in tracer.summary()["slow_queries"][0]
+
+
+def test_metrics_endpoint_exports_run_traces(monkeypatch):
+    def fake_run(
+        target, incremental, baseline_window, accuracy, con, cache, registry, tracer, run_id,
+        progress,
+    ):
+        trace = {
+            "stages": {"seed": {"count": 1, "seconds": 0.5, "queries": 3, "query_seconds": 0.4}},
+            "queries": {"count": 3, "seconds": 0.4, "rows": 5000123, "recorded": 3},
+        }
+        tracer.summary = lambda: trace
+        return {"run_id": run_id, "target": target, "findings_count": 2, "stage_seconds": {}}
+
+    monkeypatch.setattr(api, "run", fake_run)
+    with TestClient(api.app) as client:
+        run_id = client.post("/dq/run?target=bad_day").json()["run_id"]
+        api.app.state.jobs.shutdown(wait=True)
+        assert client.get(f"/dq/runs/{run_id}").json()["status"] == "succeeded"
+
+        resp = client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain")
+        body = resp.text
+        assert 'dqa_runs_total{target="bad_day"} 1' in body
+        assert 'dqa_stage_seconds_sum{stage="seed"} 0.5' in body
+        assert 'dqa_jobs{status="succeeded"} 1' in body
+        # counters keep every digit past 10^6
+        assert "dqa_query_rows_total 5000123" in body